@@ -18,6 +18,7 @@ import (
 	"flag"
 	"fmt"
 	"log"
+	"os"
 	"path/filepath"
 	"strconv"
 	"strings"
@@ -31,18 +32,75 @@ import (
 
 // Configurer satisfies the config.Configurer interface. It's the
 // language-specific configuration extension.
-type Configurer struct{}
+type Configurer struct {
+	// The value of the -python_parse_cache flag.
+	parseCacheFile string
+	// The cache of parsed Python files, or nil if the flag is not set.
+	parseCache *parseCache
+	// The deps check shared with the Resolver.
+	depsCheck *depsCheck
+}
 
 // RegisterFlags registers command-line flags used by the extension. This
 // method is called once with the root configuration when Gazelle
 // starts. RegisterFlags may set an initial values in Config.Exts. When flags
 // are set, they should modify these values.
-func (py *Configurer) RegisterFlags(fs *flag.FlagSet, cmd string, c *config.Config) {}
+func (py *Configurer) RegisterFlags(fs *flag.FlagSet, cmd string, c *config.Config) {
+	fs.StringVar(
+		&py.parseCacheFile,
+		"python_parse_cache",
+		"",
+		"path of a file used to cache the parsed Python files between runs. "+
+			"Relative paths are relative to the repository root.",
+	)
+	if py.depsCheck != nil {
+		fs.StringVar(
+			&py.depsCheck.reportFile,
+			"python_check_deps",
+			"",
+			"path of a file to write a JSON lines report of the py_* targets whose deps "+
+				"differ from the deps resolved from their imports, or '-' for stdout. "+
+				"Relative paths are relative to the repository root.",
+		)
+	}
+}
 
 // CheckFlags validates the configuration after command line flags are parsed.
 // This is called once with the root configuration when Gazelle starts.
 // CheckFlags may set default values in flags or make implied changes.
 func (py *Configurer) CheckFlags(fs *flag.FlagSet, c *config.Config) error {
+	if py.depsCheck != nil && py.depsCheck.reportFile != "" {
+		if py.depsCheck.reportFile == "-" {
+			py.depsCheck.out = os.Stdout
+		} else {
+			path := py.depsCheck.reportFile
+			if !filepath.IsAbs(path) {
+				path = filepath.Join(c.RepoRoot, path)
+			}
+			// The report is written while resolving the deps, which happens
+			// after DoneGeneratingRules, so the file is not kept open.
+			out, err := os.Create(path)
+			if err != nil {
+				return fmt.Errorf("failed to create the deps check report: %w", err)
+			}
+			if err := out.Close(); err != nil {
+				return fmt.Errorf("failed to create the deps check report: %w", err)
+			}
+			py.depsCheck.out = appendFile(path)
+		}
+	}
+	if py.parseCacheFile == "" {
+		return nil
+	}
+	path := py.parseCacheFile
+	if !filepath.IsAbs(path) {
+		path = filepath.Join(c.RepoRoot, path)
+	}
+	cache, err := loadParseCache(path, c.RepoRoot)
+	if err != nil {
+		return err
+	}
+	py.parseCache = cache
 	return nil
 }
 
@@ -0,0 +1,186 @@
+// Copyright 2025 The Bazel Authors. All rights reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package python
+
+import (
+	"encoding/json"
+	"fmt"
+	"io"
+	"os"
+	"sort"
+	"sync"
+
+	"github.com/bazelbuild/bazel-gazelle/label"
+	"github.com/bazelbuild/bazel-gazelle/rule"
+	bzl "github.com/bazelbuild/buildtools/build"
+	"github.com/emirpasic/gods/sets/treeset"
+)
+
+const (
+	// existingDepsKey is the attribute key used to pass the deps of the
+	// existing rule in the BUILD file to the Resolver step when checking deps.
+	existingDepsKey = "_gazelle_python_existing_deps"
+)
+
+// existingDeps are the deps of a rule as currently written in a BUILD file.
+type existingDeps struct {
+	// The deps as written in the BUILD file.
+	deps []string
+	// The deps marked with a '# keep' comment.
+	keep map[string]struct{}
+}
+
+// depsCheckResult is a single line of the deps check report. It describes a
+// target whose deps differ from the deps resolved from its imports.
+type depsCheckResult struct {
+	// The label of the target.
+	Label string `json:"label"`
+	// The resolved deps that are not in the BUILD file.
+	Missing []string `json:"missing,omitempty"`
+	// The deps in the BUILD file that are not resolved from any import and
+	// are not marked with '# keep'.
+	Extra []string `json:"extra,omitempty"`
+}
+
+// depsCheck compares the deps of the existing py_* targets with the deps
+// resolved from their imports and reports the targets that drifted as JSON
+// lines.
+type depsCheck struct {
+	// The value of the -python_check_deps flag.
+	reportFile string
+
+	mu  sync.Mutex
+	out io.Writer
+}
+
+// appendFile is an io.Writer that appends each write to the file at the
+// path and closes it again.
+type appendFile string
+
+func (f appendFile) Write(p []byte) (int, error) {
+	out, err := os.OpenFile(string(f), os.O_APPEND|os.O_WRONLY, 0)
+	if err != nil {
+		return 0, err
+	}
+	n, err := out.Write(p)
+	if closeErr := out.Close(); err == nil {
+		err = closeErr
+	}
+	return n, err
+}
+
+// enabled returns true if the deps check was requested.
+func (c *depsCheck) enabled() bool {
+	return c != nil && c.out != nil
+}
+
+// readExistingDeps returns the deps of the rule named name in the BUILD file f.
+// It returns false if the rule does not exist or its deps are not a plain
+// list of strings (e.g. a select), in which case they cannot be checked.
+func readExistingDeps(f *rule.File, name string) (*existingDeps, bool) {
+	if f == nil {
+		return &existingDeps{}, true
+	}
+	for _, r := range f.Rules {
+		if r.Name() != name {
+			continue
+		}
+		result := &existingDeps{keep: make(map[string]struct{})}
+		attr := r.Attr("deps")
+		if attr == nil {
+			return result, true
+		}
+		list, ok := attr.(*bzl.ListExpr)
+		if !ok {
+			return nil, false
+		}
+		for _, elem := range list.List {
+			str, ok := elem.(*bzl.StringExpr)
+			if !ok {
+				return nil, false
+			}
+			result.deps = append(result.deps, str.Value)
+			if rule.ShouldKeep(elem) {
+				result.keep[str.Value] = struct{}{}
+			}
+		}
+		return result, true
+	}
+	return &existingDeps{}, true
+}
+
+// normalizeDep returns dep relative to the package of from, so that deps
+// written in different forms (e.g. "//foo" and "//foo:foo") compare equal.
+func normalizeDep(dep string, from label.Label) string {
+	l, err := label.Parse(dep)
+	if err != nil {
+		return dep
+	}
+	if l.Repo == "" && !l.Relative {
+		l.Repo = from.Repo
+	}
+	return l.Rel(from.Repo, from.Pkg).String()
+}
+
+// check compares the resolved deps of r with the deps recorded from the BUILD
+// file and writes a report line if they differ.
+func (c *depsCheck) check(r *rule.Rule, resolved *treeset.Set, from label.Label) error {
+	existing, ok := r.PrivateAttr(existingDepsKey).(*existingDeps)
+	if !ok {
+		return nil
+	}
+	written := make(map[string]struct{}, len(existing.deps))
+	kept := make(map[string]struct{}, len(existing.keep))
+	for _, dep := range existing.deps {
+		written[normalizeDep(dep, from)] = struct{}{}
+	}
+	for dep := range existing.keep {
+		kept[normalizeDep(dep, from)] = struct{}{}
+	}
+
+	result := depsCheckResult{Label: from.String()}
+	it := resolved.Iterator()
+	resolvedDeps := make(map[string]struct{}, resolved.Size())
+	for it.Next() {
+		dep := normalizeDep(it.Value().(string), from)
+		resolvedDeps[dep] = struct{}{}
+		if _, ok := written[dep]; !ok {
+			result.Missing = append(result.Missing, dep)
+		}
+	}
+	for dep := range written {
+		_, isResolved := resolvedDeps[dep]
+		_, isKept := kept[dep]
+		if !isResolved && !isKept {
+			result.Extra = append(result.Extra, dep)
+		}
+	}
+	if len(result.Missing) == 0 && len(result.Extra) == 0 {
+		return nil
+	}
+	sort.Strings(result.Missing)
+	sort.Strings(result.Extra)
+
+	line, err := json.Marshal(result)
+	if err != nil {
+		return err
+	}
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if _, err := fmt.Fprintf(c.out, "%s\n", line); err != nil {
+		return fmt.Errorf("failed to write the deps check report: %w", err)
+	}
+	return nil
+}
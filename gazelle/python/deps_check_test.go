@@ -0,0 +1,115 @@
+// Copyright 2025 The Bazel Authors. All rights reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package python
+
+import (
+	"bytes"
+	"os"
+	"path/filepath"
+	"testing"
+
+	"github.com/bazelbuild/bazel-gazelle/label"
+	"github.com/bazelbuild/bazel-gazelle/rule"
+	"github.com/emirpasic/gods/sets/treeset"
+	godsutils "github.com/emirpasic/gods/utils"
+	"github.com/stretchr/testify/assert"
+)
+
+func TestDepsCheck(t *testing.T) {
+	t.Parallel()
+	build := []byte(`
+py_library(
+    name = "foo",
+    deps = [
+        "//pkg:bar",
+        "//other",
+        "@pip//kept",  # keep
+        "@pip//unused",
+    ],
+)
+
+py_library(
+    name = "selected",
+    deps = select({"//conditions:default": []}),
+)
+`)
+	units := []struct {
+		name     string
+		target   string
+		resolved []string
+		report   string
+	}{
+		{
+			name:     "no drift",
+			target:   "foo",
+			resolved: []string{":bar", "//other:other", "@pip//unused"},
+			report:   "",
+		},
+		{
+			name:     "drift",
+			target:   "foo",
+			resolved: []string{":bar", "@pip//requests"},
+			report:   `{"label":"//pkg:foo","missing":["@pip//requests"],"extra":["//other","@pip//unused"]}` + "\n",
+		},
+		{
+			name:     "new target",
+			target:   "new",
+			resolved: []string{":bar"},
+			report:   `{"label":"//pkg:new","missing":[":bar"]}` + "\n",
+		},
+		{
+			name:     "select is not checked",
+			target:   "selected",
+			resolved: []string{":bar"},
+			report:   "",
+		},
+	}
+	for _, u := range units {
+		t.Run(u.name, func(t *testing.T) {
+			f, err := rule.LoadData("pkg/BUILD.bazel", "pkg", build)
+			assert.NoError(t, err)
+			r := rule.NewRule(pyLibraryKind, u.target)
+			if existing, ok := readExistingDeps(f, u.target); ok {
+				r.SetPrivateAttr(existingDepsKey, existing)
+			}
+			resolved := treeset.NewWith(godsutils.StringComparator)
+			for _, dep := range u.resolved {
+				resolved.Add(dep)
+			}
+
+			var out bytes.Buffer
+			check := &depsCheck{out: &out}
+			assert.NoError(t, check.check(r, resolved, label.New("", "pkg", u.target)))
+			assert.Equal(t, u.report, out.String())
+		})
+	}
+}
+
+func TestAppendFile(t *testing.T) {
+	t.Parallel()
+	path := filepath.Join(t.TempDir(), "report.jsonl")
+	assert.NoError(t, os.WriteFile(path, nil, 0o644))
+
+	out := appendFile(path)
+	for _, line := range []string{"a\n", "b\n"} {
+		n, err := out.Write([]byte(line))
+		assert.NoError(t, err)
+		assert.Equal(t, len(line), n)
+	}
+
+	got, err := os.ReadFile(path)
+	assert.NoError(t, err)
+	assert.Equal(t, "a\nb\n", string(got))
+}
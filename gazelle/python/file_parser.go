@@ -15,6 +15,7 @@
 package python
 
 import (
+	"bytes"
 	"context"
 	"fmt"
 	"log"
@@ -39,6 +40,31 @@ const (
 	sitterNodeTypeImportFromStatement = "import_from_statement"
 )
 
+// sitterStatementContainerTypes are the node types whose children may be
+// statements, and therefore may hold import statements. Any other node is an
+// expression or a simple statement and is only descended into when it may
+// contain comments or parse errors.
+var sitterStatementContainerTypes = map[string]struct{}{
+	"module":               {},
+	"block":                {},
+	"if_statement":         {},
+	"elif_clause":          {},
+	"else_clause":          {},
+	"try_statement":        {},
+	"except_clause":        {},
+	"except_group_clause":  {},
+	"finally_clause":       {},
+	"with_statement":       {},
+	"for_statement":        {},
+	"while_statement":      {},
+	"function_definition":  {},
+	"class_definition":     {},
+	"decorated_definition": {},
+	"match_statement":      {},
+	"case_clause":          {},
+	"ERROR":                {},
+}
+
 type ParserOutput struct {
 	FileName string
 	Modules  []module
@@ -60,7 +86,20 @@ func NewFileParser() *FileParser {
 // the tree-sitter RootNode.
 // It prints a warning if parsing fails.
 func ParseCode(code []byte, path string) (*sitter.Node, error) {
+	tree, err := parseTree(code, path)
+	if err != nil {
+		return nil, err
+	}
+	return tree.RootNode(), nil
+}
+
+// parseTree parses the python code and returns the tree-sitter Tree. The caller
+// may Close the tree as soon as it is done with it to release the memory held
+// by tree-sitter without waiting for the garbage collector.
+// It prints a warning if parsing fails.
+func parseTree(code []byte, path string) (*sitter.Tree, error) {
 	parser := sitter.NewParser()
+	defer parser.Close()
 	parser.SetLanguage(python.GetLanguage())
 
 	tree, err := parser.ParseCtx(context.Background(), nil, code)
@@ -70,7 +109,7 @@ func ParseCode(code []byte, path string) (*sitter.Node, error) {
 
 	root := tree.RootNode()
 	if !root.HasError() {
-		return root, nil
+		return tree, nil
 	}
 
 	log.Printf("WARNING: failed to parse %q. The resulting BUILD target may be incorrect.", path)
@@ -79,7 +118,7 @@ func ParseCode(code []byte, path string) (*sitter.Node, error) {
 	// failure may be in some part of the code that Gazelle doesn't care about.
 	verbose, envExists := os.LookupEnv("RULES_PYTHON_GAZELLE_VERBOSE")
 	if !envExists || verbose != "1" {
-		return root, nil
+		return tree, nil
 	}
 
 	for i := 0; i < int(root.ChildCount()); i++ {
@@ -95,36 +134,28 @@ func ParseCode(code []byte, path string) (*sitter.Node, error) {
 		}
 	}
 
-	return root, nil
+	return tree, nil
 }
 
-// parseMain returns true if the python file has an `if __name__ == "__main__":` block,
+// isMainCheck returns true if the node is an `if __name__ == "__main__":` block,
 // which is a common idiom for python scripts/binaries.
-func (p *FileParser) parseMain(ctx context.Context, node *sitter.Node) bool {
-	for i := 0; i < int(node.ChildCount()); i++ {
-		if err := ctx.Err(); err != nil {
-			return false
-		}
-		child := node.Child(i)
-		if child.Type() == sitterNodeTypeIfStatement &&
-			child.Child(1).Type() == sitterNodeTypeComparisonOperator && child.Child(1).Child(1).Type() == "==" {
-			statement := child.Child(1)
-			a, b := statement.Child(0), statement.Child(2)
-			// convert "'__main__' == __name__" to "__name__ == '__main__'"
-			if b.Type() == sitterNodeTypeIdentifier {
-				a, b = b, a
-			}
-			if a.Type() == sitterNodeTypeIdentifier && a.Content(p.code) == "__name__" &&
-				// at github.com/dougthor42/go-tree-sitter@latest (after v0.0.0-20240422154435-0628b34cbf9c we used)
-				// "__main__" is the second child of b. But now, it isn't.
-				// we cannot use the latest go-tree-sitter because of the top level reference in scanner.c.
-				// https://github.com/dougthor42/go-tree-sitter/blob/04d6b33fe138a98075210f5b770482ded024dc0f/python/scanner.c#L1
-				b.Type() == sitterNodeTypeString && string(p.code[b.StartByte()+1:b.EndByte()-1]) == "__main__" {
-				return true
-			}
-		}
+func (p *FileParser) isMainCheck(node *sitter.Node) bool {
+	if node.Type() != sitterNodeTypeIfStatement ||
+		node.Child(1).Type() != sitterNodeTypeComparisonOperator || node.Child(1).Child(1).Type() != "==" {
+		return false
 	}
-	return false
+	statement := node.Child(1)
+	a, b := statement.Child(0), statement.Child(2)
+	// convert "'__main__' == __name__" to "__name__ == '__main__'"
+	if b.Type() == sitterNodeTypeIdentifier {
+		a, b = b, a
+	}
+	return a.Type() == sitterNodeTypeIdentifier && a.Content(p.code) == "__name__" &&
+		// at github.com/dougthor42/go-tree-sitter@latest (after v0.0.0-20240422154435-0628b34cbf9c we used)
+		// "__main__" is the second child of b. But now, it isn't.
+		// we cannot use the latest go-tree-sitter because of the top level reference in scanner.c.
+		// https://github.com/dougthor42/go-tree-sitter/blob/04d6b33fe138a98075210f5b770482ded024dc0f/python/scanner.c#L1
+		b.Type() == sitterNodeTypeString && string(p.code[b.StartByte()+1:b.EndByte()-1]) == "__main__"
 }
 
 // parseImportStatement parses a node for an import statement, returning a `module` and a boolean
@@ -200,34 +231,56 @@ func (p *FileParser) SetCodeAndFile(code []byte, relPackagePath, filename string
 	p.output.FileName = filename
 }
 
-func (p *FileParser) parse(ctx context.Context, node *sitter.Node) {
-	if node == nil {
+// mayContainImportsOrComments returns true if the children of the node need to
+// be visited. Import statements can only appear in statement containers, so
+// any other node (e.g. a large expression in generated code) is skipped unless
+// its source contains a '#' or it has a parse error.
+func (p *FileParser) mayContainImportsOrComments(node *sitter.Node) bool {
+	if _, ok := sitterStatementContainerTypes[node.Type()]; ok {
+		return true
+	}
+	if node.ChildCount() == 0 {
+		return false
+	}
+	return node.HasError() || bytes.IndexByte(p.code[node.StartByte():node.EndByte()], '#') >= 0
+}
+
+// parse walks the children of the node under the cursor, collecting imports,
+// comments and, for the module level, the `__main__` check. The cursor is
+// restored to the node it started on before returning.
+func (p *FileParser) parse(ctx context.Context, cursor *sitter.TreeCursor, topLevel bool) {
+	if !cursor.GoToFirstChild() {
 		return
 	}
-	for i := 0; i < int(node.ChildCount()); i++ {
+	defer cursor.GoToParent()
+	for {
 		if err := ctx.Err(); err != nil {
 			return
 		}
-		child := node.Child(i)
-		if p.parseImportStatements(child) {
-			continue
+		child := cursor.CurrentNode()
+		if topLevel && !p.output.HasMain && p.isMainCheck(child) {
+			p.output.HasMain = true
+		}
+		if !p.parseImportStatements(child) && !p.parseComments(child) && p.mayContainImportsOrComments(child) {
+			p.parse(ctx, cursor, false)
 		}
-		if p.parseComments(child) {
-			continue
+		if !cursor.GoToNextSibling() {
+			return
 		}
-		p.parse(ctx, child)
 	}
 }
 
 func (p *FileParser) Parse(ctx context.Context) (*ParserOutput, error) {
-	rootNode, err := ParseCode(p.code, p.relFilepath)
+	tree, err := parseTree(p.code, p.relFilepath)
 	if err != nil {
 		return nil, err
 	}
+	defer tree.Close()
 
-	p.output.HasMain = p.parseMain(ctx, rootNode)
+	cursor := sitter.NewTreeCursor(tree.RootNode())
+	defer cursor.Close()
 
-	p.parse(ctx, rootNode)
+	p.parse(ctx, cursor, true)
 	return &p.output, nil
 }
 
@@ -16,6 +16,8 @@ package python
 
 import (
 	"context"
+	"fmt"
+	"strings"
 	"testing"
 
 	"github.com/stretchr/testify/assert"
@@ -107,6 +109,34 @@ func TestParseImportStatements(t *testing.T) {
 				},
 			},
 		},
+		{
+			name: "import in nested blocks",
+			code: `try:
+    import foo
+except ImportError:
+    with open("x") as f:
+        class A:
+            @staticmethod
+            def b():
+                if True:
+                    import bar
+`,
+			filepath: "abc.py",
+			result: []module{
+				{
+					Name:       "foo",
+					LineNumber: 2,
+					Filepath:   "abc.py",
+					From:       "",
+				},
+				{
+					Name:       "bar",
+					LineNumber: 9,
+					Filepath:   "abc.py",
+					From:       "",
+				},
+			},
+		},
 		// align to https://docs.python.org/3/reference/simple_stmts.html#index-34
 		{
 			name: "complex import",
@@ -174,6 +204,11 @@ func TestParseComments(t *testing.T) {
 			code:   "import os# 123\nfrom pathlib import Path as b#456",
 			result: []comment{"# 123", "#456"},
 		},
+		{
+			name:   "has comment in expression",
+			code:   "a = [\n  1,  # gazelle:ignore foo\n  \"#\",\n]\nb = {1: 2}",
+			result: []comment{"# gazelle:ignore foo"},
+		},
 	}
 	for _, u := range units {
 		t.Run(u.name, func(t *testing.T) {
@@ -254,3 +289,40 @@ func TestParseFull(t *testing.T) {
 		FileName: "a.py",
 	}, *output)
 }
+
+// largeGeneratedCode returns python code resembling a generated module: a few
+// imports followed by n large literal assignments.
+func largeGeneratedCode(n int) []byte {
+	var b strings.Builder
+	b.WriteString("import os\nfrom foo import bar\n\n")
+	for i := 0; i < n; i++ {
+		fmt.Fprintf(&b, "TABLE_%d = {\n", i)
+		for j := 0; j < 50; j++ {
+			fmt.Fprintf(&b, "    \"key_%d\": [%d, %d.5, \"value\"],\n", j, j, j)
+		}
+		b.WriteString("}\n")
+	}
+	b.WriteString("\nif __name__ == \"__main__\":\n    import sys\n")
+	return []byte(b.String())
+}
+
+func BenchmarkParse(b *testing.B) {
+	for _, n := range []int{10, 1000} {
+		code := largeGeneratedCode(n)
+		b.Run(fmt.Sprintf("%dKiB", len(code)/1024), func(b *testing.B) {
+			b.ReportAllocs()
+			b.SetBytes(int64(len(code)))
+			for i := 0; i < b.N; i++ {
+				p := NewFileParser()
+				p.SetCodeAndFile(code, "", "generated.py")
+				output, err := p.Parse(context.Background())
+				if err != nil {
+					b.Fatal(err)
+				}
+				if len(output.Modules) != 3 || !output.HasMain {
+					b.Fatalf("unexpected output: %+v", output)
+				}
+			}
+		})
+	}
+}
@@ -225,7 +225,7 @@ func (py *Python) GenerateRules(args language.GenerateArgs) language.GenerateRes
 		}
 	}
 
-	parser := newPython3Parser(args.Config.RepoRoot, args.Rel, cfg.IgnoresDependency)
+	parser := newPython3Parser(args.Config.RepoRoot, args.Rel, cfg.IgnoresDependency, py.parseCache)
 	visibility := cfg.Visibility()
 
 	var result language.GenerateResult
@@ -487,6 +487,14 @@ func (py *Python) GenerateRules(args language.GenerateArgs) language.GenerateRes
 		os.Exit(1)
 	}
 
+	if py.Resolver.depsCheck.enabled() {
+		for _, r := range result.Gen {
+			if existing, ok := readExistingDeps(args.File, r.Name()); ok {
+				r.SetPrivateAttr(existingDepsKey, existing)
+			}
+		}
+	}
+
 	return result
 }
 
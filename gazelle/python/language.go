@@ -15,6 +15,8 @@
 package python
 
 import (
+	"log"
+
 	"github.com/bazelbuild/bazel-gazelle/language"
 )
 
@@ -28,5 +30,21 @@ type Python struct {
 // NewLanguage initializes a new Python that satisfies the language.Language
 // interface. This is the entrypoint for the extension initialization.
 func NewLanguage() language.Language {
-	return &Python{}
+	check := &depsCheck{}
+	return &Python{
+		Configurer: Configurer{depsCheck: check},
+		Resolver:   Resolver{depsCheck: check},
+	}
+}
+
+// DoneGeneratingRules is called after GenerateRules has been called for every
+// directory. It satisfies the language.FinishableLanguage interface and is used
+// to persist the parse cache.
+func (py *Python) DoneGeneratingRules() {
+	if py.parseCache == nil {
+		return
+	}
+	if err := py.parseCache.save(); err != nil {
+		log.Printf("WARNING: failed to write the parse cache: %v", err)
+	}
 }
@@ -0,0 +1,176 @@
+// Copyright 2025 The Bazel Authors. All rights reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package python
+
+import (
+	"context"
+	"crypto/sha256"
+	"encoding/hex"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"io/fs"
+	"os"
+	"path/filepath"
+	"sync"
+)
+
+// parseCacheVersion is bumped whenever the FileParser output changes for the
+// same input so that stale cache files are discarded.
+const parseCacheVersion = 1
+
+// parseCacheEntry is the cached FileParser output for a single file.
+type parseCacheEntry struct {
+	// The sha256 of the file contents the output was computed from.
+	Digest string `json:"digest"`
+	// The FileParser output.
+	Output ParserOutput `json:"output"`
+}
+
+// parseCacheFile is the on-disk format of the parse cache.
+type parseCacheFile struct {
+	Version int                        `json:"version"`
+	Entries map[string]parseCacheEntry `json:"entries"`
+}
+
+// parseCache stores the FileParser output of Python files keyed by their path
+// relative to the repository root and the digest of their contents. It is
+// persisted between Gazelle runs so that only files that changed since the
+// previous run are parsed again.
+type parseCache struct {
+	// The path of the cache file.
+	path string
+	// The repository root the cached file paths are relative to.
+	repoRoot string
+
+	mu      sync.Mutex
+	entries map[string]parseCacheEntry
+	dirty   bool
+}
+
+// loadParseCache reads the parse cache from path. A missing file or a file
+// written by a different version of the extension results in an empty cache.
+func loadParseCache(path, repoRoot string) (*parseCache, error) {
+	c := &parseCache{
+		path:     path,
+		repoRoot: repoRoot,
+		entries:  make(map[string]parseCacheEntry),
+	}
+	data, err := os.ReadFile(path)
+	if errors.Is(err, fs.ErrNotExist) {
+		return c, nil
+	}
+	if err != nil {
+		return nil, fmt.Errorf("failed to read the parse cache: %w", err)
+	}
+	var f parseCacheFile
+	if err := json.Unmarshal(data, &f); err != nil || f.Version != parseCacheVersion {
+		// A corrupted or outdated cache is not an error, it is just rebuilt.
+		return c, nil
+	}
+	if f.Entries != nil {
+		c.entries = f.Entries
+	}
+	return c, nil
+}
+
+// parseFile returns the FileParser output for the given file, parsing it only
+// if its contents changed since it was last cached. A nil cache parses every
+// file.
+func (c *parseCache) parseFile(ctx context.Context, repoRoot, relPackagePath, filename string) (*ParserOutput, error) {
+	p := NewFileParser()
+	if c == nil {
+		return p.ParseFile(ctx, repoRoot, relPackagePath, filename)
+	}
+	code, err := os.ReadFile(filepath.Join(repoRoot, relPackagePath, filename))
+	if err != nil {
+		return nil, err
+	}
+	p.SetCodeAndFile(code, relPackagePath, filename)
+
+	key := p.relFilepath
+	sum := sha256.Sum256(code)
+	digest := hex.EncodeToString(sum[:])
+
+	c.mu.Lock()
+	entry, ok := c.entries[key]
+	c.mu.Unlock()
+	if ok && entry.Digest == digest {
+		output := entry.Output
+		return &output, nil
+	}
+
+	output, err := p.Parse(ctx)
+	if err != nil {
+		return nil, err
+	}
+	if err := ctx.Err(); err != nil {
+		// Do not cache a partial result.
+		return output, nil
+	}
+
+	c.mu.Lock()
+	c.entries[key] = parseCacheEntry{Digest: digest, Output: *output}
+	c.dirty = true
+	c.mu.Unlock()
+	return output, nil
+}
+
+// save writes the parse cache back to disk if it was modified. Entries of
+// files that no longer exist are dropped.
+func (c *parseCache) save() error {
+	if c == nil {
+		return nil
+	}
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	for key := range c.entries {
+		if _, err := os.Stat(filepath.Join(c.repoRoot, key)); errors.Is(err, fs.ErrNotExist) {
+			delete(c.entries, key)
+			c.dirty = true
+		}
+	}
+	if !c.dirty {
+		return nil
+	}
+	data, err := json.Marshal(parseCacheFile{Version: parseCacheVersion, Entries: c.entries})
+	if err != nil {
+		return err
+	}
+	if err := os.MkdirAll(filepath.Dir(c.path), 0o755); err != nil {
+		return err
+	}
+	// Write to a temporary file first so that a concurrent or interrupted run
+	// never observes a truncated cache.
+	tmp, err := os.CreateTemp(filepath.Dir(c.path), filepath.Base(c.path)+".*.tmp")
+	if err != nil {
+		return err
+	}
+	if _, err := tmp.Write(data); err != nil {
+		tmp.Close()
+		os.Remove(tmp.Name())
+		return err
+	}
+	if err := tmp.Close(); err != nil {
+		os.Remove(tmp.Name())
+		return err
+	}
+	if err := os.Rename(tmp.Name(), c.path); err != nil {
+		os.Remove(tmp.Name())
+		return err
+	}
+	c.dirty = false
+	return nil
+}
@@ -0,0 +1,58 @@
+// Copyright 2025 The Bazel Authors. All rights reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package python
+
+import (
+	"context"
+	"os"
+	"path/filepath"
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+func TestParseCache(t *testing.T) {
+	repoRoot := t.TempDir()
+	cacheFile := filepath.Join(t.TempDir(), "cache.json")
+	assert.NoError(t, os.MkdirAll(filepath.Join(repoRoot, "foo"), 0o755))
+	src := filepath.Join(repoRoot, "foo", "a.py")
+	assert.NoError(t, os.WriteFile(src, []byte("import bar\n"), 0o644))
+
+	cache, err := loadParseCache(cacheFile, repoRoot)
+	assert.NoError(t, err)
+	output, err := cache.parseFile(context.Background(), repoRoot, "foo", "a.py")
+	assert.NoError(t, err)
+	assert.Equal(t, []module{{Name: "bar", LineNumber: 1, Filepath: "foo/a.py"}}, output.Modules)
+	assert.NoError(t, cache.save())
+
+	// A new cache loaded from disk returns the stored output.
+	cache, err = loadParseCache(cacheFile, repoRoot)
+	assert.NoError(t, err)
+	assert.Contains(t, cache.entries, "foo/a.py")
+	assert.Equal(t, *output, cache.entries["foo/a.py"].Output)
+
+	// Changing the file contents invalidates the entry.
+	assert.NoError(t, os.WriteFile(src, []byte("import baz\n"), 0o644))
+	output, err = cache.parseFile(context.Background(), repoRoot, "foo", "a.py")
+	assert.NoError(t, err)
+	assert.Equal(t, []module{{Name: "baz", LineNumber: 1, Filepath: "foo/a.py"}}, output.Modules)
+
+	// Entries of deleted files are dropped when saving.
+	assert.NoError(t, os.Remove(src))
+	assert.NoError(t, cache.save())
+	cache, err = loadParseCache(cacheFile, repoRoot)
+	assert.NoError(t, err)
+	assert.Empty(t, cache.entries)
+}
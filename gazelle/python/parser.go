@@ -35,6 +35,8 @@ type python3Parser struct {
 	// The function that determines if a dependency is ignored from a Gazelle
 	// directive. It's the signature of pythonconfig.Config.IgnoresDependency.
 	ignoresDependency func(dep string) bool
+	// The cache of parsed files, or nil if parse caching is disabled.
+	cache *parseCache
 }
 
 // newPython3Parser constructs a new python3Parser.
@@ -42,11 +44,13 @@ func newPython3Parser(
 	repoRoot string,
 	relPackagePath string,
 	ignoresDependency func(dep string) bool,
+	cache *parseCache,
 ) *python3Parser {
 	return &python3Parser{
 		repoRoot:          repoRoot,
 		relPackagePath:    relPackagePath,
 		ignoresDependency: ignoresDependency,
+		cache:             cache,
 	}
 }
 
@@ -73,7 +77,7 @@ func (p *python3Parser) parse(pyFilenames *treeset.Set) (*treeset.Set, map[strin
 				defer func() {
 					<-ch
 				}()
-				res, err := NewFileParser().ParseFile(ctx, p.repoRoot, p.relPackagePath, filename)
+				res, err := p.cache.parseFile(ctx, p.repoRoot, p.relPackagePath, filename)
 				if err != nil {
 					return err
 				}
@@ -43,7 +43,10 @@ const (
 
 // Resolver satisfies the resolve.Resolver interface. It resolves dependencies
 // in rules generated by this extension.
-type Resolver struct{}
+type Resolver struct {
+	// The deps check shared with the Configurer.
+	depsCheck *depsCheck
+}
 
 // Name returns the name of the language. This is the prefix of the kinds of
 // rules generated. E.g. py_library and py_binary.
@@ -291,6 +294,11 @@ func (py *Resolver) Resolve(
 			deps.Add(it.Value())
 		}
 	}
+	if py.depsCheck.enabled() {
+		if err := py.depsCheck.check(r, deps, from); err != nil {
+			log.Fatalf("ERROR: %v\n", err)
+		}
+	}
 	if !deps.Empty() {
 		r.SetAttr("deps", convertDependencySetToExpr(deps))
 	}
@@ -148,6 +148,20 @@ VenvsUseDeclareSymlinkFlag = FlagEnum(
     get_value = _venvs_use_declare_symlink_flag_get_value,
 )
 
+def _venvs_module_index_flag_get_value(ctx):
+    return ctx.attr._venvs_module_index_flag[BuildSettingInfo].value
+
+# Decides if the venv created by bootstrap=script includes an index of the
+# top-level modules provided by each import path.
+# buildifier: disable=name-conventions
+VenvsModuleIndexFlag = FlagEnum(
+    # Find the top-level modules using the index
+    YES = "yes",
+    # Find the top-level modules by searching every sys.path entry
+    NO = "no",
+    get_value = _venvs_module_index_flag_get_value,
+)
+
 def _venvs_site_packages_is_enabled(ctx):
     if not ctx.attr.experimental_venvs_site_packages:
         return False
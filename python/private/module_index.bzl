@@ -0,0 +1,76 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Functions to compute the index of the top-level modules of the import paths."""
+
+def module_index_mapper(workspace_name, imports):
+    """Create the `map_each` function for the module index entries.
+
+    Args:
+        workspace_name: {type}`str` the name of the main workspace.
+        imports: {type}`depset[str]` the runfiles-root relative import paths.
+
+    Returns:
+        {type}`callable` that takes a {type}`File` and returns the list of
+        `<module>=<import path>` entries for it.
+    """
+
+    # The workspace root is always added to sys.path when import_all is
+    # disabled, so it is an import path too.
+    import_paths = {path: None for path in imports.to_list()}
+    import_paths[workspace_name] = None
+
+    def map_module_index(file):
+        # Compute the runfiles-root relative path, see `runfiles_root_path`.
+        if file.short_path.startswith("../"):
+            parts = file.short_path[3:].split("/")
+        else:
+            parts = [workspace_name] + file.short_path.split("/")
+
+        # A file can provide a module for several import paths, e.g. `a/b/c.py`
+        # provides `b` for `a` and `c` for `a/b`.
+        entries = []
+        for i in range(1, len(parts)):
+            import_path = "/".join(parts[:i])
+            if import_path not in import_paths:
+                continue
+            name = top_level_module_name(parts[i:])
+            if name:
+                entries.append("{}={}".format(name, import_path))
+        return entries
+
+    return map_module_index
+
+def top_level_module_name(parts):
+    """Return the top-level module a file provides.
+
+    Args:
+        parts: {type}`list[str]` the path components of the file relative to
+            the import path.
+
+    Returns:
+        {type}`str | None` the name of the module or `None` if the file
+        doesn't provide an importable top-level module.
+    """
+    if len(parts) == 1 or (len(parts) == 2 and parts[0] == "__pycache__"):
+        # A module file, e.g. `foo.py` or `__pycache__/foo.cpython-311.pyc`.
+        name = parts[-1].partition(".")[0]
+    else:
+        # A file within a package directory.
+        name = parts[0]
+
+    if (not name or name in ("__init__", "__pycache__") or name[0].isdigit() or
+        not name.replace("_", "a").isalnum()):
+        return None
+    return name
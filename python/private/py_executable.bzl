@@ -50,13 +50,15 @@ load(
     "runfiles_root_path",
     "target_platform_has_any_constraint",
 )
-load(":flags.bzl", "BootstrapImplFlag", "VenvsUseDeclareSymlinkFlag")
+load(":flags.bzl", "BootstrapImplFlag", "VenvsModuleIndexFlag", "VenvsUseDeclareSymlinkFlag")
+load(":module_index.bzl", "module_index_mapper")
 load(":precompile.bzl", "maybe_precompile")
 load(":py_cc_link_params_info.bzl", "PyCcLinkParamsInfo")
 load(":py_executable_info.bzl", "PyExecutableInfo")
 load(":py_info.bzl", "PyInfo")
 load(":py_internal.bzl", "py_internal")
 load(":py_runtime_info.bzl", "DEFAULT_STUB_SHEBANG", "PyRuntimeInfo")
+load(":py_venv_info.bzl", "PyVenvInfo")
 load(":reexports.bzl", "BuiltinPyInfo", "BuiltinPyRuntimeInfo")
 load(":rule_builders.bzl", "ruleb")
 load(
@@ -180,6 +182,35 @@ configuration.
 This attribute was changed from only accepting `PY2` and `PY3` values to
 accepting arbitrary Python versions.
 :::
+""",
+        ),
+        "venv": lambda: attrb.Label(
+            providers = [PyVenvInfo],
+            doc = """
+Optional; a {obj}`py_venv` target to use instead of creating a venv for this
+target.
+
+Executables with the same dependency closure can share a single venv, so that
+the site-packages symlinks and the site init file are created once instead of
+for every executable. The venv's `deps` should be the same as the executable's
+dependencies:
+
+* The venv must provide all of the import paths and site-packages entries of
+  the executable, otherwise analysis fails. This includes the executable's own
+  {attr}`py_binary.imports`, so move them to a library that both depend on.
+* The venv must not have site-packages entries that the executable doesn't
+  have, otherwise analysis fails, because the venv symlinks point to the files
+  in the executable's runfiles.
+
+:::{note}
+Only supported for {obj}`--bootstrap_impl=script`. Ignored otherwise.
+:::
+
+:::{include} /_includes/experimental_api.md
+:::
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
 """,
         ),
         # Required to opt-in to the transition feature.
@@ -219,6 +250,10 @@ accepting arbitrary Python versions.
         "_python_version_flag": lambda: attrb.Label(
             default = "//python/config_settings:python_version",
         ),
+        "_venvs_module_index_flag": lambda: attrb.Label(
+            default = "//python/config_settings:venvs_module_index",
+            providers = [BuildSettingInfo],
+        ),
         "_venvs_use_declare_symlink_flag": lambda: attrb.Label(
             default = "//python/config_settings:venvs_use_declare_symlink",
             providers = [BuildSettingInfo],
@@ -335,13 +370,23 @@ def _create_executable(
     if (BootstrapImplFlag.get_value(ctx) == BootstrapImplFlag.SCRIPT and
         runtime_details.effective_runtime and
         hasattr(runtime_details.effective_runtime, "stage2_bootstrap_template")):
-        venv = _create_venv(
+        if ctx.attr.venv:
+            venv = ctx.attr.venv[PyVenvInfo]
+            _check_venv_provides_imports(ctx, venv, imports)
+        else:
+            venv = create_venv(
+                ctx,
+                output_prefix = base_executable_name,
+                imports = imports,
+                runtime_details = runtime_details,
+            )
+
+        module_index = _create_module_index(
             ctx,
             output_prefix = base_executable_name,
+            output_sibling = executable,
             imports = imports,
-            runtime_details = runtime_details,
         )
-
         stage2_bootstrap = _create_stage2_bootstrap(
             ctx,
             output_prefix = base_executable_name,
@@ -350,8 +395,12 @@ def _create_executable(
             imports = imports,
             runtime_details = runtime_details,
             venv = venv,
+            module_index = module_index,
+        )
+        extra_runfiles = ctx.runfiles(
+            [stage2_bootstrap] + venv.files_without_interpreter +
+            ([module_index] if module_index else []),
         )
-        extra_runfiles = ctx.runfiles([stage2_bootstrap] + venv.files_without_interpreter)
         zip_main = _create_zip_main(
             ctx,
             stage2_bootstrap = stage2_bootstrap,
@@ -371,13 +420,19 @@ def _create_executable(
             runtime_details = runtime_details,
         )
 
+    # Don't include the original executable because it isn't used by the
+    # zip file, so no need to build it for the action. Leaving it out of the
+    # runfiles up front avoids flattening them to filter it out.
+    zip_runfiles = runfiles_details.runfiles_without_exe.merge(extra_runfiles)
+    if runfiles_details.build_data_file:
+        zip_runfiles = zip_runfiles.merge(ctx.runfiles([runfiles_details.build_data_file]))
+
     zip_file = ctx.actions.declare_file(base_executable_name + ".zip", sibling = executable)
     _create_zip_file(
         ctx,
         output = zip_file,
-        original_nonzip_executable = executable,
         zip_main = zip_main,
-        runfiles = runfiles_details.default_runfiles.merge(extra_runfiles),
+        runfiles = zip_runfiles,
     )
 
     extra_files_to_build = []
@@ -528,7 +583,19 @@ def relative_path(from_, to):
 # * https://snarky.ca/how-virtual-environments-work/
 # * https://github.com/python/cpython/blob/main/Modules/getpath.py
 # * https://github.com/python/cpython/blob/main/Lib/site.py
-def _create_venv(ctx, output_prefix, imports, runtime_details):
+def create_venv(ctx, output_prefix, imports, runtime_details):
+    """Create the venv files.
+
+    Args:
+        ctx: current rule ctx. The `deps` are used for the site-packages
+            symlinks.
+        output_prefix: {type}`str` prefix for the name of the venv directory.
+        imports: {type}`depset[str]` the import paths to add in the site init.
+        runtime_details: struct with the `effective_runtime` to use.
+
+    Returns:
+        {type}`struct` with the same fields as {obj}`PyVenvInfo`.
+    """
     venv = "_{}.venv".format(output_prefix.lstrip("_"))
 
     # The pyvenv.cfg file must be present to trigger the venv site hooks.
@@ -618,9 +685,12 @@ def _create_venv(ctx, output_prefix, imports, runtime_details):
         },
         computed_substitutions = computed_subs,
     )
-    site_packages_symlinks = _create_site_packages_symlinks(ctx, site_packages)
+    site_packages_entries = _get_site_packages_entries(ctx)
+    site_packages_symlinks = _create_site_packages_symlinks(ctx, site_packages, site_packages_entries)
 
     return struct(
+        imports = imports,
+        site_packages_entries = site_packages_entries,
         interpreter = interpreter,
         recreate_venv_at_runtime = recreate_venv_at_runtime,
         # Runfiles root relative path or absolute path
@@ -630,19 +700,59 @@ def _create_venv(ctx, output_prefix, imports, runtime_details):
         venv_site_packages = venv_site_packages,
     )
 
-def _create_site_packages_symlinks(ctx, site_packages):
-    """Creates symlinks within site-packages.
+def _check_venv_provides_imports(ctx, venv, imports):
+    """Fails if a shared venv doesn't match the import paths of the executable.
+
+    The venv's site-packages symlinks point into the executable's runfiles,
+    so the venv must neither miss entries of the executable nor have entries
+    the executable doesn't have.
 
     Args:
-        ctx: current rule ctx
-        site_packages: runfiles-root-relative path to the site-packages directory
+        ctx: current rule ctx.
+        venv: {type}`PyVenvInfo` the shared venv.
+        imports: {type}`depset[str]` the import paths of the executable.
+    """
+    venv_imports = {i: None for i in venv.imports.to_list()}
+    missing = [i for i in imports.to_list() if i not in venv_imports]
+
+    venv_entries = {e: None for e in venv.site_packages_entries.to_list()}
+    entries = {e: None for e in _get_site_packages_entries(ctx).to_list()}
+    for entry in entries:
+        if entry not in venv_entries:
+            missing.append(entry[1])
+
+    if missing:
+        fail(("The venv {venv} doesn't provide all of the import paths and " +
+              "site-packages entries of {target}, missing: {missing}. The " +
+              "venv's deps must be the same as the executable's deps and the " +
+              "executable's own `imports` must come from a library.").format(
+            venv = ctx.attr.venv.label,
+            target = ctx.label,
+            missing = missing,
+        ))
+
+    extra = [entry[1] for entry in venv_entries if entry not in entries]
+    if extra:
+        fail(("The venv {venv} has site-packages entries that {target} " +
+              "doesn't have, extra: {extra}. Their symlinks would dangle " +
+              "because they point into the executable's runfiles. The " +
+              "venv's deps must be the same as the executable's deps.").format(
+            venv = ctx.attr.venv.label,
+            target = ctx.label,
+            extra = extra,
+        ))
+
+def _get_site_packages_entries(ctx):
+    """Returns the site-packages entries of the deps.
+
+    Args:
+        ctx: current rule ctx.
 
     Returns:
-        {type}`list[File]` list of the File symlink objects created.
+        {type}`depset[tuple[str, str]]` of the runfiles path to link to and
+        the site-packages relative path.
     """
-
-    # maps site-package symlink to the runfiles path it should point to
-    entries = depset(
+    return depset(
         # NOTE: Topological ordering is used so that dependencies closer to the
         # binary have precedence in creating their symlinks. This allows the
         # binary a modicum of control over the result.
@@ -652,8 +762,23 @@ def _create_site_packages_symlinks(ctx, site_packages):
             for dep in ctx.attr.deps
             if PyInfo in dep
         ],
-    ).to_list()
-    link_map = _build_link_map(entries)
+    )
+
+def _create_site_packages_symlinks(ctx, site_packages, entries):
+    """Creates symlinks within site-packages.
+
+    Args:
+        ctx: current rule ctx
+        site_packages: runfiles-root-relative path to the site-packages directory
+        entries: {type}`depset[tuple[str, str]]` the site-packages entries of
+            the deps.
+
+    Returns:
+        {type}`list[File]` list of the File symlink objects created.
+    """
+
+    # maps site-package symlink to the runfiles path it should point to
+    link_map = _build_link_map(entries.to_list())
 
     sp_files = []
     for sp_dir_path, link_to in link_map.items():
@@ -686,26 +811,78 @@ def _build_link_map(entries):
         if not link_to:
             link_map.pop(sp_dir_path)
 
-    # Remove entries that would be a child path of a created symlink.
-    # Earlier entries have precedence to match how exact matches are handled.
+    # Remove entries that would be a child or a parent path of a created
+    # symlink. Earlier entries have precedence to match how exact matches are
+    # handled.
+    #
+    # The parent directories of the kept entries are tracked, so that both
+    # checks are dict lookups of the path components instead of comparing
+    # every pair of entries.
     keep_link_map = {}
-    for _ in range(len(link_map)):
-        if not link_map:
-            break
-        dirname, value = link_map.popitem()
-        keep_link_map[dirname] = value
+    kept_parents = {}
+    for sp_dir_path, link_to in link_map.items():
+        if sp_dir_path in kept_parents:
+            # A child path of this one has been kept.
+            continue
+
+        parts = sp_dir_path.split("/")
+        parents = ["/".join(parts[:i]) for i in range(1, len(parts))]
+        if [p for p in parents if p in keep_link_map]:
+            # This is a child path of a kept one.
+            continue
 
-        prefix = dirname + "/"  # Add slash to prevent /X matching /XY
-        for maybe_suffix in link_map.keys():
-            maybe_suffix += "/"  # Add slash to prevent /X matching /XY
-            if maybe_suffix.startswith(prefix) or prefix.startswith(maybe_suffix):
-                link_map.pop(maybe_suffix)
+        keep_link_map[sp_dir_path] = link_to
+        for p in parents:
+            kept_parents[p] = None
 
     return keep_link_map
 
 def _map_each_identity(v):
     return v
 
+def _create_module_index(ctx, *, output_prefix, output_sibling, imports):
+    """Create the index of the top-level modules provided by each import path.
+
+    Args:
+        ctx: current rule ctx.
+        output_prefix: {type}`str` prefix for the name of the index file.
+        output_sibling: {type}`File` file to create the index next to.
+        imports: {type}`depset[str]` the runfiles-root relative import paths.
+
+    Returns:
+        {type}`File | None` the index file, with one `<module>=<import path>`
+        line per entry, or `None` if the index is disabled.
+    """
+
+    # With import_all, every repository is an import path, so the index would
+    # not know about all the modules.
+    if (VenvsModuleIndexFlag.get_value(ctx) != VenvsModuleIndexFlag.YES or
+        ctx.fragments.bazel_py.python_import_all_repositories):
+        return None
+
+    output = ctx.actions.declare_file(
+        "_{}.module_index".format(output_prefix),
+        sibling = output_sibling,
+    )
+    files = depset(ctx.files.srcs, transitive = [
+        depset(transitive = [
+            dep[PyInfo].transitive_sources,
+            dep[PyInfo].transitive_pyc_files,
+        ])
+        for dep in ctx.attr.deps
+        if PyInfo in dep
+    ])
+    content = ctx.actions.args()
+    content.set_param_file_format("multiline")
+    content.add_all(
+        files,
+        map_each = module_index_mapper(ctx.workspace_name, imports),
+        uniquify = True,
+        allow_closure = True,
+    )
+    ctx.actions.write(output, content)
+    return output
+
 def _get_coverage_tool_runfiles_path(ctx, runtime):
     if (ctx.configuration.coverage_enabled and
         runtime and
@@ -725,7 +902,8 @@ def _create_stage2_bootstrap(
         main_py,
         imports,
         runtime_details,
-        venv = None):
+        venv = None,
+        module_index = None):
     output = ctx.actions.declare_file(
         # Prepend with underscore to prevent pytest from trying to
         # process the bootstrap for files starting with `test_`
@@ -757,6 +935,7 @@ def _create_stage2_bootstrap(
             "%imports%": ":".join(imports.to_list()),
             "%main%": main_py_path,
             "%main_module%": ctx.attr.main_module,
+            "%module_index%": runfiles_root_path(ctx, module_index.short_path) if module_index else "",
             "%target%": str(ctx.label),
             "%venv_rel_site_packages%": venv_rel_site_packages,
             "%workspace_name%": ctx.workspace_name,
@@ -872,7 +1051,7 @@ def _create_windows_exe_launcher(
         use_default_shell_env = True,
     )
 
-def _create_zip_file(ctx, *, output, original_nonzip_executable, zip_main, runfiles):
+def _create_zip_file(ctx, *, output, zip_main, runfiles):
     """Create a Python zipapp (zip with __main__.py entry point)."""
     workspace_name = ctx.workspace_name
     legacy_external_runfiles = _py_builtins.get_legacy_external_runfiles(ctx)
@@ -888,17 +1067,17 @@ def _create_zip_file(ctx, *, output, original_nonzip_executable, zip_main, runfi
             _get_zip_runfiles_path("__init__.py", workspace_name, legacy_external_runfiles),
         ),
     )
-    for path in runfiles.empty_filenames.to_list():
-        manifest.add("{}=".format(_get_zip_runfiles_path(path, workspace_name, legacy_external_runfiles)))
+
+    def map_zip_empty_filenames(path):
+        return "{}=".format(_get_zip_runfiles_path(path, workspace_name, legacy_external_runfiles))
+
+    manifest.add_all(runfiles.empty_filenames, map_each = map_zip_empty_filenames, allow_closure = True)
 
     def map_zip_runfiles(file):
-        if file != original_nonzip_executable and file != output:
-            return "{}={}".format(
-                _get_zip_runfiles_path(file.short_path, workspace_name, legacy_external_runfiles),
-                file.path,
-            )
-        else:
-            return None
+        return "{}={}".format(
+            _get_zip_runfiles_path(file.short_path, workspace_name, legacy_external_runfiles),
+            file.path,
+        )
 
     manifest.add_all(runfiles.files, map_each = map_zip_runfiles, allow_closure = True)
 
@@ -919,13 +1098,6 @@ def _create_zip_file(ctx, *, output, original_nonzip_executable, zip_main, runfi
         ))
         inputs.append(zip_repo_mapping_manifest)
 
-    for artifact in runfiles.files.to_list():
-        # Don't include the original executable because it isn't used by the
-        # zip file, so no need to build it for the action.
-        # Don't include the zipfile itself because it's an output.
-        if artifact != original_nonzip_executable and artifact != output:
-            inputs.append(artifact)
-
     zip_cli_args = ctx.actions.args()
     zip_cli_args.add("cC")
     zip_cli_args.add(output)
@@ -933,7 +1105,9 @@ def _create_zip_file(ctx, *, output, original_nonzip_executable, zip_main, runfi
     ctx.actions.run(
         executable = ctx.executable._zipper,
         arguments = [zip_cli_args, manifest],
-        inputs = depset(inputs),
+        # The runfiles are passed as a depset so that they aren't flattened
+        # during analysis.
+        inputs = depset(inputs, transitive = [runfiles.files]),
         outputs = [output],
         use_default_shell_env = True,
         mnemonic = "PythonZipper",
@@ -0,0 +1,90 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Rule that creates a venv that can be shared between executables."""
+
+load("@bazel_skylib//lib:structs.bzl", "structs")
+load("@bazel_skylib//rules:common_settings.bzl", "BuildSettingInfo")
+load(":py_executable.bzl", "create_venv")
+load(":py_info.bzl", "PyInfo")
+load(":py_venv_info.bzl", "PyVenvInfo")
+load(":reexports.bzl", "BuiltinPyInfo")
+load(":toolchain_types.bzl", "TARGET_TOOLCHAIN_TYPE")
+
+def _py_venv_impl(ctx):
+    runtime = ctx.toolchains[TARGET_TOOLCHAIN_TYPE].py3_runtime
+    if not getattr(runtime, "site_init_template", None):
+        fail("The Python toolchain runtime doesn't support venvs; " +
+             "it must provide `site_init_template`")
+
+    transitive = []
+    for dep in ctx.attr.deps:
+        if PyInfo in dep:
+            transitive.append(dep[PyInfo].imports)
+        if BuiltinPyInfo != None and BuiltinPyInfo in dep:
+            transitive.append(dep[BuiltinPyInfo].imports)
+
+    venv = create_venv(
+        ctx,
+        output_prefix = ctx.label.name,
+        imports = depset(transitive = transitive),
+        runtime_details = struct(effective_runtime = runtime),
+    )
+    files = [venv.interpreter] + venv.files_without_interpreter
+    return [
+        DefaultInfo(
+            files = depset(files),
+            runfiles = ctx.runfiles(files),
+        ),
+        PyVenvInfo(**structs.to_dict(venv)),
+    ]
+
+py_venv = rule(
+    implementation = _py_venv_impl,
+    doc = """
+Creates a venv that can be shared by several executables.
+
+By default, every {obj}`py_binary` and {obj}`py_test` creates its own venv
+when {obj}`--bootstrap_impl=script` is used. When many executables have the
+same dependencies, they can instead refer to a single `py_venv` using their
+{attr}`py_binary.venv` attribute, so that the venv files (including the
+site-packages symlinks) are only created once.
+
+:::{include} /_includes/experimental_api.md
+:::
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+    attrs = {
+        "deps": attr.label_list(
+            providers = [[PyInfo]] + ([[BuiltinPyInfo]] if BuiltinPyInfo != None else []),
+            doc = """
+The dependencies to create the venv for. These should be the same as the
+dependencies of the executables that use the venv: the venv must provide all of
+their import paths and site-packages entries, otherwise their analysis fails,
+and the venv symlinks point to the files in their runfiles.
+""",
+        ),
+        "_python_version_flag": attr.label(
+            default = "//python/config_settings:python_version",
+        ),
+        "_venvs_use_declare_symlink_flag": attr.label(
+            default = "//python/config_settings:venvs_use_declare_symlink",
+            providers = [BuildSettingInfo],
+        ),
+    },
+    fragments = ["bazel_py"],
+    provides = [PyVenvInfo],
+    toolchains = [TARGET_TOOLCHAIN_TYPE],
+)
@@ -0,0 +1,68 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Provider for a venv that can be shared between executables."""
+
+PyVenvInfo = provider(
+    doc = """
+Information about a venv created by {obj}`py_venv`.
+
+:::{include} /_includes/experimental_api.md
+:::
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+    fields = {
+        "files_without_interpreter": """
+:type: list[File]
+
+The files of the venv, except for the interpreter: `pyvenv.cfg`, the `.pth` and
+site init files and the site-packages symlinks.
+""",
+        "imports": """
+:type: depset[str]
+
+The runfiles-root relative import paths added by the site init file.
+""",
+        "interpreter": """
+:type: File
+
+The `bin/python3` file of the venv.
+""",
+        "interpreter_actual_path": """
+:type: str
+
+The runfiles-root relative path, or absolute path, of the interpreter the
+venv interpreter points to.
+""",
+        "recreate_venv_at_runtime": """
+:type: bool
+
+True if the venv has to be recreated at runtime, e.g. because the toolchain
+doesn't support build-time venvs.
+""",
+        "site_packages_entries": """
+:type: depset[tuple[str, str]]
+
+The runfiles path to link to and the site-packages relative path of the
+entries the site-packages symlinks are created from, see
+{obj}`PyInfo.site_packages_symlinks`.
+""",
+        "venv_site_packages": """
+:type: str
+
+The venv-relative path to the site-packages directory.
+""",
+    },
+)
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""A simple function that evaluates markers using a python interpreter."""
+"""Functions that evaluate the markers of the requirement lines."""
 
 load(":deps.bzl", "record_files")
 load(":pep508_env.bzl", "env")
@@ -41,10 +41,19 @@ def evaluate_markers(requirements, python_version = None):
         dict of string lists with target platforms
     """
     ret = {}
+
+    # Many requirement lines share the same marker, e.g. `python_version < "3.11"`,
+    # so compile each unique marker once and evaluate it only once per distinct
+    # value of the env keys that it references.
+    envs = {}
+    cache = {}
     for req_string, platforms in requirements.items():
-        req = requirement(req_string)
+        marker = requirement(req_string).marker
         for platform in platforms:
-            if evaluate(req.marker, env = env(platform_from_str(platform, python_version))):
+            if platform not in envs:
+                envs[platform] = env(platform_from_str(platform, python_version))
+
+            if evaluate(marker, env = envs[platform], cache = cache):
                 ret.setdefault(req_string, []).append(platform)
 
     return ret
@@ -25,7 +25,7 @@ load("//python/private:repo_utils.bzl", "repo_utils")
 load("//python/private:version.bzl", "version")
 load("//python/private:version_label.bzl", "version_label")
 load(":attrs.bzl", "use_isolated")
-load(":evaluate_markers.bzl", "evaluate_markers_py", EVALUATE_MARKERS_SRCS = "SRCS")
+load(":evaluate_markers.bzl", evaluate_markers_star = "evaluate_markers")
 load(":hub_repository.bzl", "hub_repository", "whl_config_settings_to_json")
 load(":parse_requirements.bzl", "parse_requirements")
 load(":parse_whl_name.bzl", "parse_whl_name")
@@ -72,8 +72,9 @@ def _create_whl_repos(
         whl_overrides,
         available_interpreters = INTERPRETER_LABELS,
         minor_mapping = MINOR_MAPPING,
-        evaluate_markers = evaluate_markers_py,
+        evaluate_markers = None,
         get_index_urls = None,
+        requirements_cache = None,
         enable_pipstar = False):
     """create all of the whl repositories
 
@@ -88,7 +89,10 @@ def _create_whl_repos(
             used during the `repository_rule` and must be always compatible with the host.
         minor_mapping: {type}`dict[str, str]` The dictionary needed to resolve the full
             python version used to parse package METADATA files.
-        evaluate_markers: the function used to evaluate the markers.
+        evaluate_markers: the function used to evaluate the markers. Defaults
+            to the Starlark implementation.
+        requirements_cache: {type}`dict | None` The cache of the parsed
+            requirements files that is shared by all of the hubs.
         enable_pipstar: enable the pipstar feature.
 
     Returns a {type}`struct` with the following attributes:
@@ -103,6 +107,10 @@ def _create_whl_repos(
             rule.
     """
     logger = repo_utils.logger(module_ctx, "pypi:create_whl_repos")
+    if evaluate_markers == None:
+        evaluate_markers = lambda _, requirements: evaluate_markers_star(
+            requirements = requirements,
+        )
     python_interpreter_target = pip_attr.python_interpreter_target
 
     # containers to aggregate outputs from this function
@@ -177,27 +185,16 @@ def _create_whl_repos(
         ),
         extra_pip_args = pip_attr.extra_pip_args,
         get_index_urls = get_index_urls,
-        # NOTE @aignas 2024-08-02: , we will execute any interpreter that we find either
-        # in the PATH or if specified as a label. We will configure the env
-        # markers when evaluating the requirement lines based on the output
-        # from the `requirements_files_by_platform` which should have something
-        # similar to:
+        cache = requirements_cache,
+        # The markers are evaluated in Starlark for the target platforms,
+        # which already include the Python version, e.g.
         # {
         #    "//:requirements.txt": ["cp311_linux_x86_64", ...]
         # }
-        #
-        # We know the target python versions that we need to evaluate the
-        # markers for and thus we don't need to use multiple python interpreter
-        # instances to perform this manipulation. This function should be executed
-        # only once by the underlying code to minimize the overhead needed to
-        # spin up a Python interpreter.
+        # so there is no need to spin up a Python interpreter here.
         evaluate_markers = lambda module_ctx, requirements: evaluate_markers(
             module_ctx,
             requirements = requirements,
-            python_interpreter = pip_attr.python_interpreter,
-            python_interpreter_target = python_interpreter_target,
-            srcs = pip_attr._evaluate_markers_srcs,
-            logger = logger,
         ),
         logger = logger,
     )
@@ -255,15 +252,23 @@ def _create_whl_repos(
                 python_version = major_minor,
                 multiple_requirements_for_whl = len(requirements) > 1.,
                 enable_pipstar = enable_pipstar,
+                whl_metadata_only = enable_pipstar and pip_attr.experimental_whl_metadata_only,
             ).items():
                 repo_name = "{}_{}".format(pip_name, repo_name)
-                if repo_name in whl_libraries:
-                    fail("Attempting to creating a duplicate library {} for {}".format(
-                        repo_name,
-                        whl_name,
-                    ))
+                if "metadata_url" in args:
+                    repos = _whl_metadata_only_repos(repo_name, args)
+                else:
+                    repos = {repo_name: args}
+
+                for name, args in repos.items():
+                    if name in whl_libraries:
+                        fail("Attempting to creating a duplicate library {} for {}".format(
+                            name,
+                            whl_name,
+                        ))
+
+                    whl_libraries[name] = args
 
-                whl_libraries[repo_name] = args
                 whl_map.setdefault(whl_name, {})[config_setting] = repo_name
 
     return struct(
@@ -277,7 +282,7 @@ def _create_whl_repos(
         whl_libraries = whl_libraries,
     )
 
-def _whl_repos(*, requirement, whl_library_args, download_only, netrc, auth_patterns, multiple_requirements_for_whl = False, python_version, enable_pipstar = False):
+def _whl_repos(*, requirement, whl_library_args, download_only, netrc, auth_patterns, multiple_requirements_for_whl = False, python_version, enable_pipstar = False, whl_metadata_only = False):
     ret = {}
 
     dists = requirement.whls
@@ -305,6 +310,16 @@ def _whl_repos(*, requirement, whl_library_args, download_only, netrc, auth_patt
         args["urls"] = [distribution.url]
         args["sha256"] = distribution.sha256
         args["filename"] = distribution.filename
+        if (
+            whl_metadata_only and
+            getattr(distribution, "metadata_url", "") and
+            # The METADATA in the wheel may be different from the one on the
+            # index if we are modifying the wheel.
+            not args.get("annotation") and
+            not args.get("whl_patches")
+        ):
+            args["metadata_url"] = distribution.metadata_url
+            args["metadata_sha256"] = distribution.metadata_sha256
         if not enable_pipstar:
             args["experimental_target_platforms"] = [
                 # Get rid of the version fot the target platforms because we are
@@ -358,6 +373,48 @@ def _whl_repos(*, requirement, whl_library_args, download_only, netrc, auth_patt
 
     return ret
 
+def _whl_metadata_only_repos(repo_name, args):
+    """Split the whl_library args into a repo using the METADATA and a repo with the files.
+
+    Args:
+        repo_name: {type}`str` the name of the whl_library.
+        args: {type}`dict` the args for the whl_library, including the
+            `metadata_url` and `metadata_sha256`.
+
+    Returns:
+        {type}`dict[str, dict]` the repo names and their args.
+    """
+    files_repo = repo_name + "_files"
+
+    # The group is handled by the whl_library with the dependencies.
+    files_args = {
+        k: v
+        for k, v in args.items()
+        if k not in ["group_deps", "group_name", "metadata_sha256", "metadata_url"]
+    }
+    files_args["files_only"] = True
+
+    metadata_args = {
+        k: v
+        for k, v in args.items()
+        if k in [
+            "auth_patterns",
+            "dep_template",
+            "filename",
+            "group_deps",
+            "group_name",
+            "metadata_sha256",
+            "metadata_url",
+            "netrc",
+            "requirement",
+        ]
+    }
+    metadata_args["files_repo"] = files_repo
+    return {
+        repo_name: metadata_args,
+        files_repo: files_args,
+    }
+
 def parse_modules(
         module_ctx,
         _fail = fail,
@@ -439,6 +496,7 @@ You cannot use both the additive_build_content and additive_build_content_file a
     # versions.
     pip_hub_map = {}
     simpleapi_cache = {}
+    requirements_cache = {}
 
     # Keeps track of all the hub's whl repos across the different versions.
     # dict[hub, dict[whl, dict[version, str pip]]]
@@ -496,11 +554,11 @@ You cannot use both the additive_build_content and additive_build_content_file a
                         index_url = pip_attr.experimental_index_url,
                         extra_index_urls = pip_attr.experimental_extra_index_urls or [],
                         index_url_overrides = pip_attr.experimental_index_url_overrides or {},
-                        sources = [
-                            d
-                            for d in distributions
+                        sources = {
+                            d: want
+                            for d, want in distributions.items()
                             if normalize_name(d) not in skip_sources
-                        ],
+                        },
                         envsubst = pip_attr.envsubst,
                         # Auth related info
                         netrc = pip_attr.netrc,
@@ -518,6 +576,7 @@ You cannot use both the additive_build_content and additive_build_content_file a
                 module_ctx,
                 pip_attr = pip_attr,
                 get_index_urls = get_index_urls,
+                requirements_cache = requirements_cache,
                 whl_overrides = whl_overrides,
                 **kwargs
             )
@@ -735,6 +794,30 @@ https://pytorch.org/blog/compromised-nightly-dependency/.
 
 The indexes must support Simple API as described here:
 https://packaging.python.org/en/latest/specifications/simple-repository-api/
+""",
+        ),
+        "experimental_whl_metadata_only": attr.bool(
+            doc = """\
+Generate the `whl_library` targets from the METADATA files served by the index
+(see [PEP 658](https://peps.python.org/pep-0658/)) instead of the extracted
+wheels. The wheel files are then put in a separate repository, which is only
+fetched when a target actually needs the files, so that e.g. `bazel query`
+does not need to download large wheels.
+
+This only applies to the wheels that have the METADATA available on the
+{attr}`experimental_index_url` and that have no `whl_modifications` or
+patches. Requires {envvar}`RULES_PYTHON_ENABLE_PIPSTAR` to be set.
+
+:::{note}
+The entry points are listed in the `entry_points.txt` of the wheel and not in
+the METADATA, so the legacy `rules_python_wheel_entry_point_<name>` targets are
+not generated for these wheels. Use {obj}`py_console_script_binary` instead.
+:::
+
+EXPERIMENTAL: this may be removed without notice.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
 """,
         ),
         "hub_name": attr.string(
@@ -804,13 +887,6 @@ EXPERIMENTAL: this may be removed without notice.
             doc = """\
 A dict of labels to wheel names that is typically generated by the whl_modifications.
 The labels are JSON config files describing the modifications.
-""",
-        ),
-        "_evaluate_markers_srcs": attr.label_list(
-            default = EVALUATE_MARKERS_SRCS,
-            doc = """\
-The list of labels to use as SRCS for the marker evaluation code. This ensures that the
-code will be re-evaluated when any of files in the default changes.
 """,
         ),
     }, **ATTRS)
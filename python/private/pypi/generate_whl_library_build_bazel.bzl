@@ -73,6 +73,7 @@ def generate_whl_library_build_bazel(
             "metadata_name",
             "metadata_version",
             "include",
+            "files_repo",
         ]
     else:
         fn = "whl_library_targets_from_requires"
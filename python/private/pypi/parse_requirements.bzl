@@ -41,6 +41,7 @@ def parse_requirements(
         get_index_urls = None,
         evaluate_markers = None,
         extract_url_srcs = True,
+        cache = None,
         logger = None):
     """Get the requirements with platforms that the requirements apply to.
 
@@ -51,9 +52,10 @@ def parse_requirements(
             os, arch combinations.
         extra_pip_args (string list): Extra pip arguments to perform extra validations and to
             be joined with args found in files.
-        get_index_urls: Callable[[ctx, list[str]], dict], a callable to get all
-            of the distribution URLs from a PyPI index. Accepts ctx and
-            distribution names to query.
+        get_index_urls: Callable[[ctx, dict[str, struct]], dict], a callable to get all
+            of the distribution URLs from a PyPI index. Accepts ctx and a dict
+            of the distribution names to query to a struct with the `sha256s`
+            and `versions` pinned in the requirements files.
         evaluate_markers: A function to use to evaluate the requirements.
             Accepts a dict where keys are requirement lines to evaluate against
             the platforms stored as values in the input dict. Returns the same
@@ -61,6 +63,10 @@ def parse_requirements(
             requirements line.
         extract_url_srcs: A boolean to enable extracting URLs from requirement
             lines to enable using bazel downloader.
+        cache: {type}`dict | None` A dict for storing the parsed requirements
+            files and requirement lines, which can be shared between the calls
+            within a single module extension evaluation so that each unique
+            file and line is parsed only once.
         logger: repo_utils.logger or None, a simple struct to log diagnostic messages.
 
     Returns:
@@ -84,6 +90,9 @@ def parse_requirements(
         The second element is extra_pip_args should be passed to `whl_library`.
     """
     evaluate_markers = evaluate_markers or (lambda _ctx, _requirements: {})
+    cache = {} if cache == None else cache
+    files_cache = cache.setdefault("files", {})
+    srcs_cache = cache.setdefault("index_sources", {})
     options = {}
     requirements = {}
     for file, plats in requirements_by_platform.items():
@@ -91,39 +100,16 @@ def parse_requirements(
             logger.debug(lambda: "Using {} for {}".format(file, plats))
         contents = ctx.read(file)
 
-        # Parse the requirements file directly in starlark to get the information
-        # needed for the whl_library declarations later.
-        parse_result = parse_requirements_txt(contents)
-
-        # Replicate a surprising behavior that WORKSPACE builds allowed:
-        # Defining a repo with the same name multiple times, but only the last
-        # definition is respected.
-        # The requirement lines might have duplicate names because lines for extras
-        # are returned as just the base package name. e.g., `foo[bar]` results
-        # in an entry like `("foo", "foo[bar] == 1.0 ...")`.
-        # Lines with different markers are not condidered duplicates.
-        requirements_dict = {}
-        for entry in sorted(
-            parse_result.requirements,
-            # Get the longest match and fallback to original WORKSPACE sorting,
-            # which should get us the entry with most extras.
-            #
-            # FIXME @aignas 2024-05-13: The correct behaviour might be to get an
-            # entry with all aggregated extras, but it is unclear if we
-            # should do this now.
-            key = lambda x: (len(x[1].partition("==")[0]), x),
-        ):
-            req = requirement(entry[1])
-            requirements_dict[(req.name, req.version, req.marker)] = entry
-
-        tokenized_options = []
-        for opt in parse_result.options:
-            for p in opt.split(" "):
-                tokenized_options.append(p)
-
-        pip_args = tokenized_options + extra_pip_args
+        # The same lock file is commonly used for many platforms and Python
+        # versions, so only parse each unique file once.
+        parsed = files_cache.get(contents)
+        if not parsed:
+            parsed = _parse_requirements_txt(contents)
+            files_cache[contents] = parsed
+
+        pip_args = parsed.options + extra_pip_args
         for plat in plats:
-            requirements[plat] = requirements_dict.values()
+            requirements[plat] = parsed.requirements
             options[plat] = pip_args
 
     requirements_by_platform = {}
@@ -140,16 +126,21 @@ def parse_requirements(
             if ";" in requirement_line:
                 reqs_with_env_markers.setdefault(requirement_line, []).append(target_platform)
 
-            for_req = for_whl.setdefault(
-                (requirement_line, ",".join(extra_pip_args)),
-                struct(
+            key = (requirement_line, ",".join(extra_pip_args))
+            for_req = for_whl.get(key)
+            if not for_req:
+                srcs = srcs_cache.get(requirement_line)
+                if not srcs:
+                    srcs = index_sources(requirement_line)
+                    srcs_cache[requirement_line] = srcs
+                for_req = struct(
                     distribution = distribution,
-                    srcs = index_sources(requirement_line),
+                    srcs = srcs,
                     requirement_line = requirement_line,
                     target_platforms = [],
                     extra_pip_args = extra_pip_args,
-                ),
-            )
+                )
+                for_whl[key] = for_req
             for_req.target_platforms.append(target_platform)
 
     # This may call to Python, so execute it early (before calling to the
@@ -168,16 +159,20 @@ def parse_requirements(
 
     index_urls = {}
     if get_index_urls:
-        index_urls = get_index_urls(
-            ctx,
-            # Use list({}) as a way to have a set
-            list({
-                req.distribution: None
-                for reqs in requirements_by_platform.values()
-                for req in reqs.values()
-                if not req.srcs.url
-            }),
-        )
+        # The pinned hashes, or versions if the lines have no hashes, allow
+        # reusing Simple API responses that already have all of them.
+        distributions = {}
+        for reqs in requirements_by_platform.values():
+            for req in reqs.values():
+                if req.srcs.url:
+                    continue
+                want = distributions.setdefault(req.distribution, struct(sha256s = {}, versions = {}))
+                for sha256 in req.srcs.shas:
+                    want.sha256s[sha256] = None
+                if not req.srcs.shas:
+                    want.versions[req.srcs.version] = None
+
+        index_urls = get_index_urls(ctx, distributions)
 
     ret = {}
     for whl_name, reqs in sorted(requirements_by_platform.items()):
@@ -223,6 +218,49 @@ def parse_requirements(
 
     return ret
 
+def _parse_requirements_txt(contents):
+    """Parse the requirements file directly in starlark.
+
+    Args:
+        contents: {type}`str` the contents of the requirements file.
+
+    Returns:
+        A struct with the deduplicated `(distribution, line)` requirements
+        and the tokenized pip options found in the file.
+    """
+    parse_result = parse_requirements_txt(contents)
+
+    # Replicate a surprising behavior that WORKSPACE builds allowed:
+    # Defining a repo with the same name multiple times, but only the last
+    # definition is respected.
+    # The requirement lines might have duplicate names because lines for extras
+    # are returned as just the base package name. e.g., `foo[bar]` results
+    # in an entry like `("foo", "foo[bar] == 1.0 ...")`.
+    # Lines with different markers are not condidered duplicates.
+    requirements_dict = {}
+    for entry in sorted(
+        parse_result.requirements,
+        # Get the longest match and fallback to original WORKSPACE sorting,
+        # which should get us the entry with most extras.
+        #
+        # FIXME @aignas 2024-05-13: The correct behaviour might be to get an
+        # entry with all aggregated extras, but it is unclear if we
+        # should do this now.
+        key = lambda x: (len(x[1].partition("==")[0]), x),
+    ):
+        req = requirement(entry[1])
+        requirements_dict[(req.name, req.version, req.marker)] = entry
+
+    tokenized_options = []
+    for opt in parse_result.options:
+        for p in opt.split(" "):
+            tokenized_options.append(p)
+
+    return struct(
+        requirements = requirements_dict.values(),
+        options = tokenized_options,
+    )
+
 def select_requirement(requirements, *, platform):
     """A simple function to get a requirement for a particular platform.
 
@@ -13,15 +13,19 @@
 # limitations under the License.
 
 """
-Parse SimpleAPI HTML in Starlark.
+Parse SimpleAPI HTML and JSON in Starlark.
 """
 
-def parse_simpleapi_html(*, url, content):
+def parse_simpleapi_html(*, url, content, want = None):
     """Get the package URLs for given shas by parsing the Simple API HTML.
 
     Args:
         url(str): The URL that the HTML content can be downloaded from.
         content(str): The Simple API HTML content.
+        want: An optional struct with the `sha256s` and `versions` (dicts used
+            as sets) pinned in the requirements files. If given, only the
+            distributions matching one of them are returned and the rest are
+            skipped before their URLs are resolved.
 
     Returns:
         A list of structs with:
@@ -55,17 +59,22 @@ def parse_simpleapi_html(*, url, content):
     sha256s_by_version = {}
     for line in lines[1:]:
         dist_url, _, tail = line.partition("#sha256=")
-        dist_url = _absolute_url(url, dist_url)
-
         sha256, _, tail = tail.partition("\"")
-
-        # See https://packaging.python.org/en/latest/specifications/simple-repository-api/#adding-yank-support-to-the-simple-api
-        yanked = "data-yanked" in line
+        if want and sha256 not in want.sha256s and not want.versions:
+            continue
 
         head, _, _ = tail.rpartition("</a>")
         maybe_metadata, _, filename = head.rpartition(">")
         version = _version(filename)
-        sha256s_by_version.setdefault(version, []).append(sha256)
+        if want and sha256 not in want.sha256s and version not in want.versions:
+            continue
+
+        dist_url = _absolute_url(url, dist_url)
+        if not want or version in want.versions:
+            sha256s_by_version.setdefault(version, []).append(sha256)
+
+        # See https://packaging.python.org/en/latest/specifications/simple-repository-api/#adding-yank-support-to-the-simple-api
+        yanked = "data-yanked" in line
 
         metadata_sha256 = ""
         metadata_url = ""
@@ -105,6 +114,91 @@ def parse_simpleapi_html(*, url, content):
         sha256s_by_version = sha256s_by_version,
     )
 
+def parse_simpleapi_json(*, url, content, want = None):
+    """Get the package URLs for given shas by parsing the Simple API JSON.
+
+    This parses the JSON serialization of the Simple API as specified in
+    [PEP 691](https://peps.python.org/pep-0691/), which is much cheaper to
+    decode in Starlark than the HTML serialization for packages with
+    thousands of files.
+
+    Args:
+        url(str): The URL that the JSON content can be downloaded from.
+        content(str): The Simple API JSON content.
+        want: An optional struct with the `sha256s` and `versions` (dicts used
+            as sets) pinned in the requirements files. If given, only the
+            distributions matching one of them are returned and the rest are
+            skipped before their URLs are resolved.
+
+    Returns:
+        The same struct as {obj}`parse_simpleapi_html`.
+    """
+    sdists = {}
+    whls = {}
+    data = json.decode(content)
+
+    api_version = data.get("meta", {}).get("api-version", "1.0")
+    api_version = tuple([int(i) for i in api_version.split(".")])
+    if api_version >= (2, 0):
+        # https://packaging.python.org/en/latest/specifications/simple-repository-api/#versioning-pypi-s-simple-api
+        fail("Unsupported API version: {}".format(api_version))
+
+    sha256s_by_version = {}
+    for file in data.get("files", []):
+        filename = file["filename"]
+        sha256 = file.get("hashes", {}).get("sha256", "")
+        version = _version(filename)
+        if want and sha256 not in want.sha256s and version not in want.versions:
+            continue
+
+        dist_url, _, _ = file["url"].partition("#")
+        dist_url = _absolute_url(url, dist_url)
+
+        # The value is either a bool or the reason for yanking, which may be empty.
+        yanked = file.get("yanked", False) != False
+
+        if not want or version in want.versions:
+            sha256s_by_version.setdefault(version, []).append(sha256)
+
+        if not filename.endswith(".whl"):
+            sdists[sha256] = struct(
+                filename = filename,
+                version = version,
+                url = dist_url,
+                sha256 = sha256,
+                metadata_sha256 = "",
+                metadata_url = "",
+                yanked = yanked,
+            )
+            continue
+
+        metadata_sha256 = ""
+        metadata_url = ""
+
+        # Implement https://peps.python.org/pep-0714/
+        for metadata_key in ["core-metadata", "dist-info-metadata"]:
+            metadata = file.get(metadata_key)
+            if type(metadata) == "dict" and metadata.get("sha256"):
+                metadata_sha256 = metadata["sha256"]
+                metadata_url = dist_url + ".metadata"
+                break
+
+        whls[sha256] = struct(
+            filename = filename,
+            version = version,
+            url = dist_url,
+            sha256 = sha256,
+            metadata_sha256 = metadata_sha256,
+            metadata_url = metadata_url,
+            yanked = yanked,
+        )
+
+    return struct(
+        sdists = sdists,
+        whls = whls,
+        sha256s_by_version = sha256s_by_version,
+    )
+
 _SDIST_EXTS = [
     ".tar",  # handles any compression
     ".zip",
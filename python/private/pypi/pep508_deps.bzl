@@ -50,7 +50,10 @@ def deps(
     deps = {}
     deps_select = {}
     name = normalize_name(name)
-    want_extras = _resolve_extras(name, reqs, extras)
+    # The same markers, e.g. `extra == "test"`, are evaluated for many
+    # requirements and extras.
+    cache = {}
+    want_extras = _resolve_extras(name, reqs, extras, cache)
     include = [normalize_name(n) for n in include]
 
     # drop self edges
@@ -74,6 +77,7 @@ def deps(
             normalize_name(name),
             reqs,
             extras = want_extras,
+            cache = cache,
         )
 
     return struct(
@@ -94,7 +98,7 @@ def _add(deps, deps_select, dep, markers = None):
     else:
         deps_select[dep] = "({})".format(") or (".join(sorted(markers)))
 
-def _resolve_extras(self_name, reqs, extras):
+def _resolve_extras(self_name, reqs, extras, cache):
     """Resolve extras which are due to depending on self[some_other_extra].
 
     Some packages may have cyclic dependencies resulting from extras being used, one example is
@@ -135,7 +139,7 @@ def _resolve_extras(self_name, reqs, extras):
 
     # A double loop is not strictly optimal, but always correct without recursion
     for req in self_reqs:
-        if [True for extra in extras if evaluate(req.marker, env = {"extra": extra})]:
+        if [True for extra in extras if evaluate(req.marker, env = {"extra": extra}, cache = cache)]:
             extras = extras + req.extras
         else:
             continue
@@ -143,13 +147,13 @@ def _resolve_extras(self_name, reqs, extras):
         # Iterate through all packages to ensure that we include all of the extras from previously
         # visited packages.
         for req_ in self_reqs:
-            if [True for extra in extras if evaluate(req.marker, env = {"extra": extra})]:
+            if [True for extra in extras if evaluate(req.marker, env = {"extra": extra}, cache = cache)]:
                 extras = extras + req_.extras
 
     # Poor mans set
     return sorted({x: None for x in extras})
 
-def _add_reqs(deps, deps_select, dep, reqs, *, extras):
+def _add_reqs(deps, deps_select, dep, reqs, *, extras, cache):
     for req in reqs:
         if not req.marker:
             _add(deps, deps_select, dep)
@@ -158,7 +162,7 @@ def _add_reqs(deps, deps_select, dep, reqs, *, extras):
     markers = {}
     for req in reqs:
         for x in extras:
-            m = evaluate(req.marker, env = {"extra": x}, strict = False)
+            m = evaluate(req.marker, env = {"extra": x}, strict = False, cache = cache)
             if m == False:
                 continue
             elif m == True:
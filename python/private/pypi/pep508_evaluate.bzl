@@ -16,6 +16,7 @@
 """
 
 load("//python/private:enum.bzl", "enum")
+load("//python/private:normalize_name.bzl", "normalize_name")
 load("//python/private:version.bzl", "version")
 
 # The expression parsing and resolution for the PEP508 is below
@@ -45,6 +46,17 @@ _AND = "and"
 _OR = "or"
 _NOT = "not"
 _ENV_ALIASES = "_aliases"
+_VERSIONS = "_versions"
+
+# The operations of the compiled markers, see `compile`.
+_EXPR = "expr"
+_PARENS = "()"
+_TRUE = "true"
+_PRECEDENCE = {
+    _AND: 2,
+    _NOT: 3,
+    _OR: 1,
+}
 
 def tokenize(marker):
     """Tokenize the input string.
@@ -78,10 +90,7 @@ def tokenize(marker):
             return tokens
 
         char = marker[0]
-        if char in _BRACKETS:
-            state = _STATE.NONE
-            token = char
-        elif state == _STATE.STRING and char in _QUOTES:
+        if state == _STATE.STRING and char in _QUOTES:
             state = _STATE.NONE
             token = '"{}"'.format(token)
         elif (
@@ -90,6 +99,8 @@ def tokenize(marker):
         ):
             state = _STATE.NONE
             continue  # Skip consuming the char below
+        elif state == _STATE.NONE and char in _BRACKETS:
+            token = char
         elif state == _STATE.NONE:
             # Transition from _STATE.NONE to something or stay in NONE
             if char in _QUOTES:
@@ -112,34 +123,6 @@ def tokenize(marker):
 
     return fail("BUG: failed to process the marker in allocated cycles: {}".format(marker))
 
-def evaluate(marker, *, env, strict = True, **kwargs):
-    """Evaluate the marker against a given env.
-
-    Args:
-        marker: {type}`str` The string marker to evaluate.
-        env: {type}`dict` The environment to evaluate the marker against.
-        strict: {type}`bool` A setting to not fail on missing values in the env.
-        **kwargs: Extra kwargs to be passed to the expression evaluator.
-
-    Returns:
-        The {type}`bool | str` If the marker is compatible with the given env. If strict is
-        `False`, then the output type is `str` which will represent the remaining
-        expression that has not been evaluated.
-    """
-    tokens = tokenize(marker)
-
-    ast = _new_expr(marker = marker, **kwargs)
-    for _ in range(len(tokens) * 2):
-        if not tokens:
-            break
-
-        tokens = ast.parse(env = env, tokens = tokens, strict = strict)
-
-    if not tokens:
-        return ast.value()
-
-    fail("Could not evaluate: {}".format(marker))
-
 _STRING_REPLACEMENTS = {
     "!=": "neq",
     "(": "_",
@@ -208,70 +191,173 @@ def _not_fn(x):
     else:
         return not x
 
-def _new_expr(
-        *,
-        marker,
-        and_fn = _and_fn,
-        or_fn = _or_fn,
-        not_fn = _not_fn):
-    # buildifier: disable=uninitialized
-    self = struct(
+def compile(marker):
+    """Compile the marker into an expression that can be evaluated many times.
+
+    The marker is tokenized and converted to a postfix notation once, so that
+    evaluating it against different environments is a simple loop over the
+    operations.
+
+    Args:
+        marker: {type}`str` The string marker to compile.
+
+    Returns:
+        An immutable {type}`struct` with the following attributes:
+        * `marker`: {type}`str` the original marker.
+        * `ops`: {type}`tuple` the operations in the postfix notation.
+        * `vars`: {type}`tuple[str]` the sorted env keys that the marker
+          references.
+    """
+    tokens = tokenize(marker)
+
+    ops = []
+    stack = []
+    vars = {}
+    prev = None
+    for _ in range(len(tokens)):
+        if not tokens:
+            break
+
+        token = tokens[0]
+        if token == "(":
+            stack.append(token)
+        elif token == ")":
+            if prev == "(":
+                # Empty parenthesis evaluate to True, like an empty marker.
+                ops.append((_TRUE,))
+            for _ in range(len(stack)):
+                if stack[-1] == "(":
+                    break
+                ops.append((stack.pop(),))
+            if not stack:
+                fail("Could not compile, unbalanced parenthesis: {}".format(marker))
+            stack.pop()
+            ops.append((_PARENS,))
+        elif token in _PRECEDENCE:
+            # `not` is a prefix operator, so it cannot pop the operators that
+            # come before it. `or` is right associative to keep the order
+            # in which the partially evaluated expressions are rendered.
+            precedence = _PRECEDENCE[token]
+            for _ in range(len(stack)):
+                if token == _NOT or stack[-1] == "(":
+                    break
+
+                top = _PRECEDENCE[stack[-1]]
+                if top > precedence or (top == precedence and token == _AND):
+                    ops.append((stack.pop(),))
+                else:
+                    break
+            stack.append(token)
+        else:
+            if len(tokens) < 3:
+                fail("Could not compile: {}".format(marker))
+            left, op, right = tokens[:3]
+            for value in [left, right]:
+                if value[0] != '"':
+                    vars[value] = None
+            ops.append((_EXPR, left, op, right))
+            tokens = tokens[2:]
+
+        prev = token
+        tokens = tokens[1:]
+
+    for _ in range(len(stack)):
+        token = stack.pop()
+        if token == "(":
+            fail("Could not compile, unbalanced parenthesis: {}".format(marker))
+        ops.append((token,))
+
+    return struct(
         marker = marker,
-        tree = [],
-        parse = lambda **kwargs: _parse(self, **kwargs),
-        value = lambda: _value(self),
-        # This is a way for us to have a handle to the currently constructed
-        # expression tree branch.
-        current = lambda: self._current[-1] if self._current else None,
-        _current = [],
-        _and = and_fn,
-        _or = or_fn,
-        _not = not_fn,
+        ops = tuple(ops),
+        vars = tuple(sorted(vars)),
     )
-    return self
-
-def _parse(self, *, env, tokens, strict = False):
-    """The parse function takes the consumed tokens and returns the remaining."""
-    token, remaining = tokens[0], tokens[1:]
-
-    if token == "(":
-        expr = _open_parenthesis(self)
-    elif token == ")":
-        expr = _close_parenthesis(self)
-    elif token == _AND:
-        expr = _and_expr(self)
-    elif token == _OR:
-        expr = _or_expr(self)
-    elif token == _NOT:
-        expr = _not_expr(self)
-    else:
-        expr = marker_expr(env = env, strict = strict, *tokens[:3])
-        remaining = tokens[3:]
 
-    _append(self, expr)
-    return remaining
+def eval(expr, *, env, strict = True, and_fn = _and_fn, or_fn = _or_fn, not_fn = _not_fn, version_cache = None):
+    """Evaluate the compiled marker against a given env.
 
-def _value(self):
-    """Evaluate the expression tree"""
-    if not self.tree:
+    Args:
+        expr: {type}`struct` The compiled marker returned by {obj}`compile`.
+        env: {type}`dict` The environment to evaluate the marker against.
+        strict: {type}`bool` A setting to not fail on missing values in the env.
+        and_fn: The function to combine the values with `and`.
+        or_fn: The function to combine the values with `or`.
+        not_fn: The function to negate the value.
+        version_cache: {type}`dict | None` A dict for memoizing the parsed
+            versions, see {obj}`version.parse`.
+
+    Returns:
+        The same as {obj}`evaluate`.
+    """
+    if not expr.ops:
         # Basic case where no marker should evaluate to True
         return True
 
-    for _ in range(len(self.tree)):
-        if len(self.tree) == 1:
-            return self.tree[0]
-
-        # Resolve all of the `or` expressions as it is safe to do now since all
-        # `and` and `not` expressions have been taken care of by now.
-        if getattr(self.tree[-2], "op", None) == _OR:
-            current = self.tree.pop()
-            self.tree[-1] = self.tree[-1].value(current)
+    stack = []
+    for op in expr.ops:
+        kind = op[0]
+        if kind == _EXPR:
+            stack.append(marker_expr(env = env, strict = strict, version_cache = version_cache, *op[1:]))
+        elif kind == _TRUE:
+            stack.append(True)
+        elif kind == _NOT:
+            stack[-1] = not_fn(stack[-1])
+        elif kind == _PARENS:
+            if type(stack[-1]) == type(""):
+                stack[-1] = "({})".format(stack[-1])
         else:
-            break
+            value = stack.pop()
+            if kind == _AND:
+                stack[-1] = and_fn(stack[-1], value)
+            else:
+                stack[-1] = or_fn(stack[-1], value)
+
+    if len(stack) != 1:
+        fail("Could not evaluate: {}".format(expr.marker))
+
+    return stack[0]
+
+def evaluate(marker, *, env, strict = True, cache = None, **kwargs):
+    """Evaluate the marker against a given env.
 
-    fail("BUG: invalid state: {}".format(self.tree))
+    Args:
+        marker: {type}`str` The string marker to evaluate.
+        env: {type}`dict` The environment to evaluate the marker against.
+        strict: {type}`bool` A setting to not fail on missing values in the env.
+        cache: {type}`dict | None` A dict for memoizing the compiled markers and
+            the evaluation results. The results are keyed by the values of only
+            the env keys that the marker references, so that e.g.
+            `python_version < "3.11"` is evaluated once per distinct
+            `python_version` value. The results are not memoized when custom
+            functions are passed via `kwargs`, but the parsed versions are.
+        **kwargs: Extra kwargs to be passed to the expression evaluator.
 
-def marker_expr(left, op, right, *, env, strict = True):
+    Returns:
+        The {type}`bool | str` If the marker is compatible with the given env. If strict is
+        `False`, then the output type is `str` which will represent the remaining
+        expression that has not been evaluated.
+    """
+    if cache == None:
+        return eval(compile(marker), env = env, strict = strict, **kwargs)
+
+    expr = cache.get(marker)
+    if expr == None:
+        expr = compile(marker)
+        cache[marker] = expr
+
+    version_cache = cache.setdefault(_VERSIONS, {})
+    if kwargs:
+        return eval(expr, env = env, strict = strict, version_cache = version_cache, **kwargs)
+
+    key = (marker, strict, _ENV_ALIASES in env, tuple([env.get(v) for v in expr.vars]))
+    result = cache.get(key)
+    if result == None:
+        result = eval(expr, env = env, strict = strict, version_cache = version_cache)
+        cache[key] = result
+
+    return result
+
+def marker_expr(left, op, right, *, env, strict = True, version_cache = None):
     """Evaluate a marker expression
 
     Args:
@@ -280,6 +366,8 @@ def marker_expr(left, op, right, *, env, strict = True):
         right: {type}`str` the env identifier or a value quoted in `"`.
         strict: {type}`bool` if false, only evaluates the values that are present
             in the environment, otherwise returns the original expression.
+        version_cache: {type}`dict | None` a dict for memoizing the parsed
+            versions.
         env: {type}`dict[str, str]` the `env` to substitute `env` identifiers in
             the `<left> <op> <right>` expression. Note, if `env` has a key
             "_aliases", then we will do normalization so that we can ensure
@@ -316,10 +404,14 @@ def marker_expr(left, op, right, *, env, strict = True):
             # See the note above on normalization
             right = env.get(_ENV_ALIASES, {}).get(var_name, {}).get(right, right)
 
-    if var_name in _NON_VERSION_VAR_NAMES:
+    if var_name == "extra":
+        # The extras are compared normalized, see
+        # https://packaging.python.org/en/latest/specifications/dependency-specifiers/#environment-markers
+        return _env_expr(normalize_name(left), op, normalize_name(right))
+    elif var_name in _NON_VERSION_VAR_NAMES:
         return _env_expr(left, op, right)
     elif var_name.endswith("_version"):
-        return _version_expr(left, op, right)
+        return _version_expr(left, op, right, cache = version_cache)
     else:
         # Do not fail here, just evaluate the expression to False.
         return False
@@ -345,10 +437,15 @@ def _env_expr(left, op, right):
     else:
         return fail("unsupported op: '{}' {} '{}'".format(left, op, right))
 
-def _version_expr(left, op, right):
+def _version_expr(left, op, right, cache = None):
     """Evaluate a version comparison expression"""
-    _left = version.parse(left)
-    _right = version.parse(right)
+    if op in ["in", "not in"]:
+        # These are not version specifier operators, so the values are
+        # compared as strings like in the `packaging` library.
+        return _env_expr(left, op, right)
+
+    _left = version.parse(left, cache = cache)
+    _right = version.parse(right, cache = cache)
     if _left == None or _right == None:
         # Per spec, if either can't be normalized to a version, then
         # fallback to simple string comparison. Usually this is `platform_version`
@@ -373,131 +470,3 @@ def _version_expr(left, op, right):
         return version.is_compatible(_left, _right)
     else:
         return False  # Let's just ignore the invalid ops
-
-# Code to allowing to combine expressions with logical operators
-
-def _append(self, value):
-    if value == None:
-        return
-
-    current = self.current() or self
-    op = getattr(value, "op", None)
-
-    if op == _NOT:
-        current.tree.append(value)
-    elif op in [_AND, _OR]:
-        value.append(current.tree[-1])
-        current.tree[-1] = value
-    elif not current.tree:
-        current.tree.append(value)
-    elif hasattr(current.tree[-1], "append"):
-        current.tree[-1].append(value)
-    elif hasattr(current.tree, "_append"):
-        current.tree._append(value)
-    else:
-        fail("Cannot evaluate '{}' in '{}', current: {}".format(value, self.marker, current))
-
-def _open_parenthesis(self):
-    """Add an extra node into the tree to perform evaluate inside parenthesis."""
-    self._current.append(_new_expr(
-        marker = self.marker,
-        and_fn = self._and,
-        or_fn = self._or,
-        not_fn = self._not,
-    ))
-
-def _close_parenthesis(self):
-    """Backtrack and evaluate the expression within parenthesis."""
-    value = self._current.pop().value()
-    if type(value) == type(""):
-        return "({})".format(value)
-    else:
-        return value
-
-def _not_expr(self):
-    """Add an extra node into the tree to perform an 'not' operation."""
-
-    def _append(value):
-        """Append a value to the not expression node.
-
-        This codifies `not` precedence over `and` and performs backtracking to
-        evaluate any `not` statements and forward the value to the first `and`
-        statement if needed.
-        """
-
-        current = self.current() or self
-        current.tree[-1] = self._not(value)
-
-        for _ in range(len(current.tree)):
-            if not len(current.tree) > 1:
-                break
-
-            op = getattr(current.tree[-2], "op", None)
-            if op == None:
-                pass
-            elif op == _NOT:
-                value = current.tree.pop()
-                current.tree[-1] = self._not(value)
-                continue
-            elif op == _AND:
-                value = current.tree.pop()
-                current.tree[-1].append(value)
-            elif op != _OR:
-                fail("BUG: '{} not' compound is unsupported".format(current.tree[-1]))
-
-            break
-
-    return struct(
-        op = _NOT,
-        append = _append,
-    )
-
-def _and_expr(self):
-    """Add an extra node into the tree to perform an 'and' operation"""
-    maybe_value = [None]
-
-    def _append(value):
-        """Append a value to the and expression node.
-
-        Here we backtrack, but we only evaluate the current `and` statement -
-        all of the `not` statements will be by now evaluated and `or`
-        statements need to be evaluated later.
-        """
-        if maybe_value[0] == None:
-            maybe_value[0] = value
-            return
-
-        current = self.current() or self
-        current.tree[-1] = self._and(maybe_value[0], value)
-
-    return struct(
-        op = _AND,
-        append = _append,
-        # private fields that help debugging
-        _maybe_value = maybe_value,
-    )
-
-def _or_expr(self):
-    """Add an extra node into the tree to perform an 'or' operation"""
-    maybe_value = [None]
-
-    def _append(value):
-        """Append a value to the or expression node.
-
-        Here we just append the extra values to the tree and the `or`
-        statements will be evaluated in the _value() function.
-        """
-        if maybe_value[0] == None:
-            maybe_value[0] = value
-            return
-
-        current = self.current() or self
-        current.tree.append(value)
-
-    return struct(
-        op = _OR,
-        value = lambda x: self._or(maybe_value[0], x),
-        append = _append,
-        # private fields that help debugging
-        _maybe_value = maybe_value,
-    )
@@ -20,8 +20,22 @@ load("@bazel_features//:features.bzl", "bazel_features")
 load("//python/private:auth.bzl", _get_auth = "get_auth")
 load("//python/private:envsubst.bzl", "envsubst")
 load("//python/private:normalize_name.bzl", "normalize_name")
+load("//python/private:repo_utils.bzl", "repo_utils")
 load("//python/private:text_util.bzl", "render")
-load(":parse_simpleapi_html.bzl", "parse_simpleapi_html")
+load(":parse_simpleapi_html.bzl", "parse_simpleapi_html", "parse_simpleapi_json")
+
+# Prefer the JSON serialization of the Simple API (PEP 691) as it is much
+# cheaper to parse, but accept HTML from indexes that do not support it.
+# See https://peps.python.org/pep-0691/#version-format-selection
+_ACCEPT_HEADER = ", ".join([
+    "application/vnd.pypi.simple.v1+json",
+    "application/vnd.pypi.simple.v1+html;q=0.2",
+    "text/html;q=0.01",
+])
+
+# The environment variable with the directory for persisting the Simple API
+# responses across evaluations of the extension.
+_CACHE_DIR_ENV_VAR = "RULES_PYTHON_PYPI_SIMPLEAPI_CACHE"
 
 def simpleapi_download(
         ctx,
@@ -32,7 +46,11 @@ def simpleapi_download(
         read_simpleapi = None,
         get_auth = None,
         _fail = fail):
-    """Download Simple API HTML.
+    """Download Simple API HTML or JSON.
+
+    The JSON serialization (PEP 691) is requested when the Bazel version
+    supports passing request headers and the HTML serialization is used as a
+    fallback for indexes that do not support it.
 
     Args:
         ctx: The module_ctx or repository_ctx.
@@ -43,8 +61,12 @@ def simpleapi_download(
              separate packages.
            * extra_index_urls: Extra index URLs that will be looked up after
              the main is looked up.
-           * sources: list[str], the sources to download things for. Each value is
-             the contents of requirements files.
+           * sources: list[str] | dict[str, struct], the sources to download
+             things for. If it is a dict, the values are structs with the
+             `sha256s` and `versions` (both dicts used as sets) that are pinned
+             in the requirements files, which allows reusing the responses
+             persisted in the {envvar}`RULES_PYTHON_PYPI_SIMPLEAPI_CACHE`
+             directory if they contain all of them.
            * envsubst: list[str], the envsubst vars for performing substitution in index url.
            * netrc: The netrc parameter for ctx.download, see http_file for docs.
            * auth_patterns: The auth_patterns parameter for ctx.download, see
@@ -64,7 +86,7 @@ def simpleapi_download(
         _fail: a function to print a failure. Used in tests.
 
     Returns:
-        dict of pkg name to the parsed HTML contents - a list of structs.
+        dict of pkg name to the parsed Simple API contents - a list of structs.
     """
     index_url_overrides = {
         normalize_name(p): i
@@ -82,6 +104,7 @@ def simpleapi_download(
     read_simpleapi = read_simpleapi or _read_simpleapi
 
     found_on_index = {}
+    to_persist = []
     warn_overrides = False
     for i, index_url in enumerate(index_urls):
         if i != 0:
@@ -92,6 +115,9 @@ def simpleapi_download(
         sources = [pkg for pkg in attr.sources if pkg not in found_on_index]
         for pkg in sources:
             pkg_normalized = normalize_name(pkg)
+            read_kwargs = dict(download_kwargs)
+            if type(attr.sources) == "dict":
+                read_kwargs["want"] = attr.sources[pkg]
             result = read_simpleapi(
                 ctx = ctx,
                 url = "{}/{}/".format(
@@ -101,7 +127,7 @@ def simpleapi_download(
                 attr = attr,
                 cache = cache,
                 get_auth = get_auth,
-                **download_kwargs
+                **read_kwargs
             )
             if hasattr(result, "wait"):
                 # We will process it in a separate loop:
@@ -112,6 +138,8 @@ def simpleapi_download(
             elif result.success:
                 contents[pkg_normalized] = result.output
                 found_on_index[pkg] = index_url
+                if getattr(result, "persist", None):
+                    to_persist.extend(result.persist)
 
         if not async_downloads:
             continue
@@ -124,6 +152,10 @@ def simpleapi_download(
             if result.success:
                 contents[download.pkg_normalized] = result.output
                 found_on_index[pkg] = index_url
+                if getattr(result, "persist", None):
+                    to_persist.extend(result.persist)
+
+    _persist(ctx, to_persist)
 
     failed_sources = [pkg for pkg in attr.sources if pkg not in found_on_index]
     if failed_sources:
@@ -154,7 +186,7 @@ def simpleapi_download(
 
     return contents
 
-def _read_simpleapi(ctx, url, attr, cache, get_auth = None, **download_kwargs):
+def _read_simpleapi(ctx, url, attr, cache, get_auth = None, want = None, **download_kwargs):
     """Read SimpleAPI.
 
     Args:
@@ -168,6 +200,9 @@ def _read_simpleapi(ctx, url, attr, cache, get_auth = None, **download_kwargs):
                http_file for docs.
         cache: A dict for storing the results.
         get_auth: A function to get auth information. Used in tests.
+        want: A struct with the `sha256s` and `versions` that the response
+            needs to contain for a persisted response to be reused, or None
+            if persisted responses should not be used.
         **download_kwargs: Any extra params to ctx.download.
             Note that output and auth will be passed for you.
 
@@ -187,8 +222,9 @@ def _read_simpleapi(ctx, url, attr, cache, get_auth = None, **download_kwargs):
     ))
 
     cache_key = real_url
-    if cache_key in cache:
-        return struct(success = True, output = cache[cache_key])
+    cached = cache.get(cache_key)
+    if cached and (not want or _covers(cached.checked, want) or _contains_wanted(cached.output, want)):
+        return struct(success = True, output = cached.output)
 
     output_str = envsubst(
         url,
@@ -203,10 +239,25 @@ def _read_simpleapi(ctx, url, attr, cache, get_auth = None, **download_kwargs):
     for char in [".", ":", "/", "\\", "-"]:
         output_str = output_str.replace(char, "_")
 
-    output = ctx.path(output_str.strip("_").lower() + ".html")
+    output_str = output_str.strip("_").lower()
+    output = ctx.path(output_str + ".html")
+
+    if cached and output.exists:
+        # The cached response was parsed for a different set of pinned
+        # distributions, so parse the already downloaded file again.
+        return _read_index_result(ctx, struct(success = True), output, real_url, cache, cache_key, want = want)
+
+    persisted = _persisted_path(ctx, output_str, real_url)
+    if persisted and want and persisted.page.exists:
+        result = _read_index_result(ctx, struct(success = True), persisted.page, real_url, cache, cache_key, want = want, checked_want = persisted.want)
+        if result.success:
+            return result
 
     get_auth = get_auth or _get_auth
 
+    if getattr(bazel_features.external_deps, "download_has_headers_param", False):
+        download_kwargs["headers"] = {"Accept": _ACCEPT_HEADER}
+
     # NOTE: this may have block = True or block = False in the download_kwargs
     download = ctx.download(
         url = [real_url],
@@ -219,10 +270,10 @@ def _read_simpleapi(ctx, url, attr, cache, get_auth = None, **download_kwargs):
     if download_kwargs.get("block") == False:
         # Simulate the same API as ctx.download has
         return struct(
-            wait = lambda: _read_index_result(ctx, download.wait(), output, real_url, cache, cache_key),
+            wait = lambda: _read_index_result(ctx, download.wait(), output, real_url, cache, cache_key, want = want, persist_to = persisted),
         )
 
-    return _read_index_result(ctx, download, output, real_url, cache, cache_key)
+    return _read_index_result(ctx, download, output, real_url, cache, cache_key, want = want, persist_to = persisted)
 
 def strip_empty_path_segments(url):
     """Removes empty path segments from a URL. Does nothing for urls with no scheme.
@@ -245,15 +296,169 @@ def strip_empty_path_segments(url):
     else:
         return "{}://{}".format(scheme, stripped)
 
-def _read_index_result(ctx, result, output, url, cache, cache_key):
+def _persisted_path(ctx, output_str, real_url):
+    """Returns the paths of the persisted response or None if disabled.
+
+    The `page` is the response and the `want` records the pinned hashes and
+    versions that were requested when it was downloaded.
+    """
+    cache_dir = repo_utils.getenv(ctx, _CACHE_DIR_ENV_VAR)
+    if not cache_dir:
+        return None
+
+    # The output_str has the env var names instead of their values, so add a
+    # digest of the real URL so that different indexes do not share an entry.
+    page = "{}/{}_{}.simpleapi".format(
+        cache_dir.rstrip("/\\"),
+        output_str,
+        hash(real_url) & 0xffffffff,
+    )
+    return struct(
+        page = ctx.path(page),
+        want = ctx.path(page + ".want"),
+        want_src = output_str + ".want",
+    )
+
+def _persist(ctx, copies):
+    """Copies the downloaded responses to the cache directory.
+
+    The module_ctx cannot write outside of its working directory, so the
+    files are copied with a single subprocess. Each copy is written to a
+    temporary file first so that concurrent Bazel servers never read a
+    partial response.
+
+    Args:
+        ctx: The module_ctx or repository_ctx.
+        copies: {type}`list[struct]` with the `src` and `dst` paths.
+    """
+    if not copies:
+        return
+
+    cache_dir = copies[0].dst.dirname
+    if repo_utils.get_platforms_os_name(ctx) == "windows":
+        # The command line length is limited on Windows, so use a script.
+        lines = [
+            "@echo off",
+            "if not exist \"{dir}\" mkdir \"{dir}\"".format(
+                dir = str(cache_dir).replace("/", "\\"),
+            ),
+        ]
+        for copy in copies:
+            lines.append("copy /y \"{src}\" \"{tmp}\" >nul && move /y \"{tmp}\" \"{dst}\" >nul".format(
+                src = str(copy.src).replace("/", "\\"),
+                tmp = "{}.{}.tmp".format(copy.dst, hash(str(copy.src)) & 0xffffffff).replace("/", "\\"),
+                dst = str(copy.dst).replace("/", "\\"),
+            ))
+        script = "simpleapi_persist.bat"
+        ctx.file(script, "\r\n".join(lines) + "\r\n", executable = False)
+        args = ["cmd.exe", "/c", str(ctx.path(script))]
+    else:
+        args = [
+            "/bin/sh",
+            "-c",
+            'mkdir -p "$1" || exit 1; shift; while [ "$#" -gt 0 ]; do cp -f "$1" "$2.$$.tmp" && mv -f "$2.$$.tmp" "$2"; shift 2; done',
+            "--",
+            str(cache_dir),
+        ]
+        for copy in copies:
+            args.extend([str(copy.src), str(copy.dst)])
+
+    # A failure to persist the responses is not fatal, they will be downloaded again.
+    repo_utils.execute_unchecked(
+        ctx,
+        op = "Persisting {} Simple API responses to {}".format(len(copies), cache_dir),
+        arguments = args,
+        logger = repo_utils.logger(ctx, "pypi:simpleapi_download"),
+        log_stdout = False,
+    )
+
+def _covers(checked, want):
+    """Returns True if all pinned hashes and versions were already checked."""
+    for sha256 in want.sha256s:
+        if sha256 not in checked.sha256s:
+            return False
+    for version in want.versions:
+        if version not in checked.versions:
+            return False
+    return True
+
+def _read_checked_want(ctx, path):
+    """Reads the pinned hashes and versions recorded next to a persisted response."""
+    if not path.exists:
+        return None
+    checked = json.decode(ctx.read(path))
+    if type(checked) != "dict":
+        return None
+    return struct(
+        sha256s = {sha256: None for sha256 in checked.get("sha256s", [])},
+        versions = {version: None for version in checked.get("versions", [])},
+    )
+
+def _contains_wanted(output, want):
+    """Returns True if the parsed response has all pinned hashes and versions."""
+    for sha256 in want.sha256s:
+        if sha256 not in output.whls and sha256 not in output.sdists:
+            return False
+    for version in want.versions:
+        if version not in output.sha256s_by_version:
+            return False
+    return True
+
+def _read_index_result(ctx, result, output, url, cache, cache_key, want = None, checked_want = None, persist_to = None):
     if not result.success:
         return struct(success = False)
 
     content = ctx.read(output)
 
-    output = parse_simpleapi_html(url = url, content = content)
-    if output:
-        cache.setdefault(cache_key, output)
-        return struct(success = True, output = output, cache_key = cache_key)
+    # The download API does not expose the Content-Type of the response, so
+    # detect which serialization the index chose to return.
+    if content.lstrip().startswith("{"):
+        parsed = parse_simpleapi_json(url = url, content = content, want = want)
     else:
+        parsed = parse_simpleapi_html(url = url, content = content, want = want)
+
+    if not parsed:
         return struct(success = False)
+
+    if checked_want and not _contains_wanted(parsed, want):
+        # The index may never serve some of the pinned distributions, e.g.
+        # when they come from a different index, so the persisted response is
+        # only stale if it was not downloaded for them.
+        checked = _read_checked_want(ctx, checked_want)
+        if not checked or not _covers(checked, want):
+            return struct(success = False)
+
+    cached = cache.get(cache_key)
+    if cached:
+        # Only the pinned distributions are parsed, so merge them with the
+        # ones that other hubs have already requested from the same page.
+        cached.output.whls.update(parsed.whls)
+        cached.output.sdists.update(parsed.sdists)
+        cached.output.sha256s_by_version.update(parsed.sha256s_by_version)
+    else:
+        cached = struct(output = parsed, checked = struct(sha256s = {}, versions = {}))
+        cache[cache_key] = cached
+
+    # The parsed response is authoritative for the pinned distributions that
+    # it was parsed for, whether it contains them or not.
+    if want:
+        cached.checked.sha256s.update(want.sha256s)
+        cached.checked.versions.update(want.versions)
+
+    if persist_to:
+        ctx.file(persist_to.want_src, json.encode({
+            "sha256s": sorted(want.sha256s) if want else [],
+            "versions": sorted(want.versions) if want else [],
+        }), executable = False)
+        return struct(
+            success = True,
+            output = cached.output,
+            cache_key = cache_key,
+            persist = [
+                # The response is persisted first, so that the recorded pins
+                # never describe an older response.
+                struct(src = output, dst = persist_to.page),
+                struct(src = ctx.path(persist_to.want_src), dst = persist_to.want),
+            ],
+        )
+    return struct(success = True, output = cached.output, cache_key = cache_key)
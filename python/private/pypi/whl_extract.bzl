@@ -0,0 +1,367 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Extract a wheel into the repository without spawning a Python interpreter.
+
+This mirrors what the `whl_installer` does when invoked with `--enable-pipstar`
+so that the produced repository contents are the same, but everything is done
+using the `repository_ctx` API.
+"""
+
+load(":whl_metadata.bzl", "find_whl_metadata")
+
+_INSTALLER = "https://github.com/bazel-contrib/rules_python"
+
+# The `sha256` and the size of the `_INSTALLER` contents so that we can write
+# the RECORD entry for the `INSTALLER` file.
+_INSTALLER_RECORD = "sha256=GrS5JfYMYg-1MYMOfZDJAw8qrm1TEKDBdiOTPaIY_P8,45"
+
+# The directories, relative to the repository root, where the contents of the
+# `.data` directory schemes get installed. The `installer` paths in the
+# `RECORD` file are relative to `site-packages`.
+_SCHEMES = {
+    "data": "data",
+    "headers": "include",
+    "platlib": "site-packages",
+    "purelib": "site-packages",
+    "scripts": "bin",
+}
+
+_SITE_PACKAGES = "site-packages"
+_BIN = "bin"
+
+_SCRIPT_SHEBANG = "#!python"
+_INTERPRETER = "/dev/null"
+
+_SCRIPT_TEMPLATE = """\
+#!{interpreter}
+# -*- coding: utf-8 -*-
+import re
+import sys
+from {module} import {import_name}
+if __name__ == "__main__":
+    sys.argv[0] = re.sub(r"(-script\\.pyw|\\.exe)?$", "", sys.argv[0])
+    sys.exit({func_path}())
+"""
+
+_NAMESPACE_PKG_INIT = """\
+# __path__ manipulation added by bazel-contrib/rules_python to support namespace pkgs.
+__path__ = __import__('pkgutil').extend_path(__path__, __name__)
+"""
+
+_MODULE_SUFFIXES = [
+    ".py",
+    ".pyc",
+    ".so",
+    ".pyd",
+]
+
+# Starlark has no while loops, so bound the directory depth that we traverse.
+_MAX_DEPTH = 1000
+
+def whl_extract(rctx, *, whl_path, enable_implicit_namespace_pkgs, logger):
+    """Extract the wheel into the `site-packages` and the other scheme dirs.
+
+    Args:
+        rctx: {type}`repository_ctx` the repository context.
+        whl_path: {type}`path` the path to the wheel file.
+        enable_implicit_namespace_pkgs: {type}`bool` if `False`, the native
+            namespace packages are converted to `pkgutil` style ones.
+        logger: the logger used to report failures.
+
+    Returns:
+        {type}`list[struct]` the console script entry points sorted by name,
+        each with the `name`, `module` and `attribute` fields.
+    """
+    install_dir = rctx.path(_SITE_PACKAGES)
+
+    # Use bazel's extract by symlinking to a zip file as the wheel file
+    # extension is not recognized.
+    whl_file_zip = whl_path.basename + ".zip"
+    rctx.symlink(whl_path, whl_file_zip)
+    rctx.extract(whl_file_zip, output = _SITE_PACKAGES)
+
+    dist_info = find_whl_metadata(install_dir = install_dir, logger = logger).dirname
+    record = rctx.read(dist_info.get_child("RECORD"))
+    entries = parse_record(record)
+
+    data_dirs = {}
+    for path, _ in entries:
+        data_dir, _, tail = path.partition("/")
+        if not data_dir.endswith(".data"):
+            continue
+        scheme, _, _ = tail.partition("/")
+        if scheme not in _SCHEMES:
+            logger.fail("Unknown scheme '{}' in '{}'".format(scheme, path))
+            return None
+        data_dirs.setdefault(data_dir, {})[scheme] = None
+
+    for data_dir, schemes in data_dirs.items():
+        for scheme in schemes:
+            rctx.extract(
+                whl_file_zip,
+                output = _SCHEMES[scheme],
+                strip_prefix = "{}/{}".format(data_dir, scheme),
+            )
+        if not rctx.delete(install_dir.get_child(data_dir)):
+            fail("Failed to remove the '{}' directory".format(data_dir))
+
+    if not rctx.delete(whl_file_zip):
+        fail("Failed to remove the symlink after extracting")
+
+    rewritten = {}
+    for path, _ in entries:
+        dest = install_path(path)
+        if not dest.startswith("../{}/".format(_BIN)):
+            continue
+        script = dest[len("../"):]
+        contents = rctx.read(script)
+        if not contents.startswith(_SCRIPT_SHEBANG):
+            continue
+        _, _, tail = contents.partition("\n")
+        rctx.file(
+            script,
+            "#!{}\n{}".format(_INTERPRETER, tail),
+            legacy_utf8 = False,
+        )
+        rewritten[path] = True
+
+    entry_points = []
+    entry_points_txt = dist_info.get_child("entry_points.txt")
+    if entry_points_txt.exists:
+        entry_points = parse_entry_points(rctx.read(entry_points_txt), logger = logger)
+
+    launchers = []
+    for ep in entry_points:
+        launcher = "{}/{}".format(_BIN, ep.name)
+        rctx.file(launcher, _SCRIPT_TEMPLATE.format(
+            interpreter = _INTERPRETER,
+            module = ep.module,
+            import_name = ep.attribute.split(".")[0],
+            func_path = ep.attribute,
+        ))
+        launchers.append("../" + launcher)
+
+    rctx.file(dist_info.get_child("INSTALLER"), _INSTALLER, executable = False)
+    rctx.file(
+        dist_info.get_child("RECORD"),
+        render_record(
+            entries,
+            dist_info = dist_info.basename,
+            launchers = launchers,
+            rewritten = rewritten,
+        ),
+        executable = False,
+    )
+
+    if not enable_implicit_namespace_pkgs:
+        for ns_pkg_dir in implicit_namespace_packages(rctx.path(""), ignored_dirnames = [_BIN]):
+            rctx.file("{}/__init__.py".format(ns_pkg_dir), _NAMESPACE_PKG_INIT, executable = False)
+
+    console_scripts = {
+        ep.name: struct(name = ep.name, module = ep.module, attribute = ep.attribute)
+        for ep in entry_points
+        if ep.console
+    }
+    return [console_scripts[name] for name in sorted(console_scripts)]
+
+def parse_entry_points(contents, *, logger):
+    """Parse the script entry points from the `entry_points.txt` file.
+
+    See https://packaging.python.org/en/latest/specifications/entry-points/
+
+    Args:
+        contents: {type}`str` the contents of the file.
+        logger: the logger used to report failures.
+
+    Returns:
+        {type}`list[struct]` of the entry points in the order they are defined,
+        each with the `name`, `module`, `attribute` and `console` fields.
+    """
+    section = None
+    entry_points = []
+    for line in contents.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1]
+            continue
+
+        if section not in ("console_scripts", "gui_scripts"):
+            continue
+
+        name, sep, value = line.partition("=")
+        if not sep:
+            continue
+
+        value, _, _ = value.partition("[")
+        module, _, attribute = value.partition(":")
+        if not attribute.strip():
+            logger.fail("Entry point '{}' is not a callable: '{}'".format(name.strip(), value.strip()))
+            return None
+
+        entry_points.append(struct(
+            name = name.strip(),
+            module = module.strip(),
+            attribute = attribute.strip(),
+            console = section == "console_scripts",
+        ))
+
+    return entry_points
+
+def install_path(path):
+    """Return the installed path of a wheel archive member.
+
+    Args:
+        path: {type}`str` the path in the wheel archive.
+
+    Returns:
+        {type}`str` the path relative to the `site-packages` directory as it
+        is written to the `RECORD` file.
+    """
+    data_dir, _, tail = path.partition("/")
+    if not data_dir.endswith(".data") or "/" not in tail:
+        return path
+
+    scheme, _, tail = tail.partition("/")
+    dest = _SCHEMES.get(scheme, scheme)
+    if dest == _SITE_PACKAGES:
+        return tail
+
+    return "../{}/{}".format(dest, tail)
+
+def parse_record(contents):
+    """Parse the `RECORD` file.
+
+    Args:
+        contents: {type}`str` the contents of the file.
+
+    Returns:
+        {type}`list[tuple[str, str]]` the paths in the archive together with
+        the hash and size fields.
+    """
+    entries = []
+    for line in contents.splitlines():
+        if not line.strip():
+            continue
+
+        # The hash and the size never contain commas, but the path may.
+        path, _, rest = line.rpartition(",")
+        path, _, digest = path.rpartition(",")
+        if path.startswith("\"") and path.endswith("\""):
+            path = path[1:-1].replace("\"\"", "\"")
+
+        entries.append((path, "{},{}".format(digest, rest)))
+
+    return entries
+
+def render_record(entries, *, dist_info, launchers, rewritten):
+    """Render the `RECORD` file after installing the wheel.
+
+    The files that are written by us have their hash omitted.
+
+    Args:
+        entries: {type}`list[tuple[str, str]]` the parsed `RECORD` entries.
+        dist_info: {type}`str` the name of the `.dist-info` directory.
+        launchers: {type}`list[str]` the generated entry point launchers.
+        rewritten: {type}`dict[str, bool]` the archive members which contents
+            have been modified during installation.
+
+    Returns:
+        {type}`str` the contents of the `RECORD` file.
+    """
+    record = "{}/RECORD".format(dist_info)
+    lines = [_record_line(path, ",") for path in launchers]
+    for path, hash_and_size in entries:
+        if path == record:
+            continue
+        lines.append(_record_line(
+            install_path(path),
+            "," if path in rewritten else hash_and_size,
+        ))
+
+    lines.append(_record_line("{}/INSTALLER".format(dist_info), _INSTALLER_RECORD))
+    lines.append(_record_line(record, ","))
+    return "\n".join(lines) + "\n"
+
+def _record_line(path, hash_and_size):
+    if "," in path or "\"" in path:
+        path = "\"{}\"".format(path.replace("\"", "\"\""))
+    return "{},{}".format(path, hash_and_size)
+
+def implicit_namespace_packages(root, *, ignored_dirnames = []):
+    """Discover the native namespace packages.
+
+    A directory is a namespace package if it has no `__init__.py` file, but
+    contains python modules or other packages.
+
+    Args:
+        root: {type}`path` the directory to search in, never treated as a
+            namespace package itself.
+        ignored_dirnames: {type}`list[str]` directories relative to `root`
+            that are not searched.
+
+    Returns:
+        {type}`list[str]` the namespace package directories relative to `root`.
+    """
+
+    # Starlark does not support recursion, so list the directories level by
+    # level and then process them bottom-up, so that the children are
+    # classified before their parents.
+    dirs = []
+    level = [("", root)]
+    for _ in range(_MAX_DEPTH):
+        if not level:
+            break
+
+        next_level = []
+        for rel, path in level:
+            files = []
+            subdirs = []
+            for child in path.readdir():
+                child_rel = child.basename if not rel else "{}/{}".format(rel, child.basename)
+                if child.is_dir:
+                    subdirs.append(child_rel)
+                    next_level.append((child_rel, child))
+                else:
+                    files.append(child.basename)
+
+            dirs.append(struct(rel = rel, files = files, subdirs = subdirs))
+        level = next_level
+
+    ignored = {d: True for d in ignored_dirnames}
+    namespace_pkg_dirs = {}
+    pkg_dirs = {}
+    for d in reversed(dirs):
+        if "__init__.py" in d.files:
+            pkg_dirs[d.rel] = True
+            continue
+
+        top, _, _ = d.rel.partition("/")
+        if not d.rel or top in ignored:
+            continue
+
+        if [f for f in d.files if _suffix(f) in _MODULE_SUFFIXES] or [s for s in d.subdirs if s in pkg_dirs]:
+            namespace_pkg_dirs[d.rel] = True
+            pkg_dirs[d.rel] = True
+
+    return sorted(namespace_pkg_dirs)
+
+def _suffix(basename):
+    i = basename.rfind(".")
+    if i <= 0 or i == len(basename) - 1:
+        return ""
+    return basename[i:]
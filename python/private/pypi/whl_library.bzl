@@ -25,7 +25,8 @@ load(":generate_whl_library_build_bazel.bzl", "generate_whl_library_build_bazel"
 load(":parse_whl_name.bzl", "parse_whl_name")
 load(":patch_whl.bzl", "patch_whl")
 load(":pypi_repo_utils.bzl", "pypi_repo_utils")
-load(":whl_metadata.bzl", "whl_metadata")
+load(":whl_extract.bzl", "whl_extract")
+load(":whl_metadata.bzl", "parse_whl_metadata", "whl_metadata")
 load(":whl_target_platforms.bzl", "whl_target_platforms")
 
 _CPPFLAGS = "CPPFLAGS"
@@ -231,8 +232,49 @@ def _create_repository_execution_environment(rctx, python_interpreter, logger =
         env[_CPPFLAGS] = " ".join(cppflags)
     return env
 
+def _whl_library_from_metadata(rctx, logger):
+    """Generate the BUILD.bazel file from the METADATA served by the index.
+
+    See https://peps.python.org/pep-0658/. The wheel files are referenced
+    from the `files_repo`, so that the wheel is only downloaded when the files
+    are needed and not when just evaluating the dependency graph.
+
+    The entry points are only listed in the `entry_points.txt` within the
+    wheel, so the legacy entry point targets are not generated.
+    """
+    urls = [rctx.attr.metadata_url]
+    result = rctx.download(
+        url = urls,
+        output = "METADATA",
+        sha256 = rctx.attr.metadata_sha256,
+        auth = get_auth(rctx, urls),
+    )
+    if not result.success:
+        fail("could not download the METADATA for '{}' from {}:\n{}".format(rctx.attr.filename, urls, result))
+
+    contents = rctx.read("METADATA")
+    metadata = parse_whl_metadata(contents)
+    if not (metadata.name and metadata.version):
+        logger.fail("Failed to parse the wheel METADATA file:\n{}".format(contents))
+        return
+
+    rctx.file("BUILD.bazel", generate_whl_library_build_bazel(
+        name = rctx.attr.filename,
+        dep_template = rctx.attr.dep_template or "@{}{{name}}//:{{target}}".format(rctx.attr.repo_prefix),
+        files_repo = "@" + rctx.attr.files_repo,
+        metadata_name = metadata.name,
+        metadata_version = metadata.version,
+        requires_dist = metadata.requires_dist,
+        group_deps = rctx.attr.group_deps,
+        group_name = rctx.attr.group_name,
+    ))
+
 def _whl_library_impl(rctx):
     logger = repo_utils.logger(rctx)
+    if rctx.attr.files_repo:
+        _whl_library_from_metadata(rctx, logger)
+        return
+
     python_interpreter = pypi_repo_utils.resolve_python_interpreter(
         rctx,
         python_interpreter = rctx.attr.python_interpreter,
@@ -247,9 +289,6 @@ def _whl_library_impl(rctx):
     extra_pip_args = []
     extra_pip_args.extend(rctx.attr.extra_pip_args)
 
-    # Manually construct the PYTHONPATH since we cannot use the toolchain here
-    environment = _create_repository_execution_environment(rctx, python_interpreter, logger = logger)
-
     whl_path = None
     if rctx.attr.whl_file:
         whl_path = rctx.path(rctx.attr.whl_file)
@@ -285,7 +324,13 @@ def _whl_library_impl(rctx):
             # build deps from PyPI (e.g. `flit_core`) if they are missing.
             extra_pip_args.extend(["--find-links", "."])
 
-    args = _parse_optional_attrs(rctx, args, extra_pip_args)
+    # The python environment is only needed if we are not extracting the
+    # wheel in Starlark.
+    environment = None
+    if not (whl_path and rp_config.enable_pipstar):
+        # Manually construct the PYTHONPATH since we cannot use the toolchain here
+        environment = _create_repository_execution_environment(rctx, python_interpreter, logger = logger)
+        args = _parse_optional_attrs(rctx, args, extra_pip_args)
 
     if not whl_path:
         if rctx.attr.urls:
@@ -333,34 +378,22 @@ def _whl_library_impl(rctx):
             )
 
     if rp_config.enable_pipstar:
-        pypi_repo_utils.execute_checked(
+        console_scripts = whl_extract(
             rctx,
-            op = "whl_library.ExtractWheel({}, {})".format(rctx.attr.name, whl_path),
-            python = python_interpreter,
-            arguments = args + [
-                "--whl-file",
-                whl_path,
-                "--enable-pipstar",
-            ],
-            srcs = rctx.attr._python_srcs,
-            environment = environment,
-            quiet = rctx.attr.quiet,
-            timeout = rctx.attr.timeout,
+            whl_path = whl_path,
+            enable_implicit_namespace_pkgs = rctx.attr.enable_implicit_namespace_pkgs,
             logger = logger,
         )
 
-        metadata = json.decode(rctx.read("metadata.json"))
-        rctx.delete("metadata.json")
-
         # NOTE @aignas 2024-06-22: this has to live on until we stop supporting
         # passing `twine` as a `:pkg` library via the `WORKSPACE` builds.
         #
         # See ../../packaging.bzl line 190
         entry_points = {}
-        for item in metadata["entry_points"]:
-            name = item["name"]
-            module = item["module"]
-            attribute = item["attribute"]
+        for item in console_scripts:
+            name = item.name
+            module = item.module
+            attribute = item.attribute
 
             # There is an extreme edge-case with entry_points that end with `.py`
             # See: https://github.com/bazelbuild/bazel/blob/09c621e4cf5b968f4c6cdf905ab142d5961f9ddc/src/test/java/com/google/devtools/build/lib/rules/python/PyBinaryConfiguredTargetTest.java#L174
@@ -388,7 +421,9 @@ def _whl_library_impl(rctx):
             entry_points = entry_points,
             metadata_name = metadata.name,
             metadata_version = metadata.version,
-            requires_dist = metadata.requires_dist,
+            # The dependencies are added by the whl_library that uses the
+            # files from this one.
+            requires_dist = [] if rctx.attr.files_only else metadata.requires_dist,
             # TODO @aignas 2025-04-14: load through the hub:
             annotation = None if not rctx.attr.annotation else struct(**json.decode(rctx.read(rctx.attr.annotation))),
             data_exclude = rctx.attr.pip_data_exclude,
@@ -521,6 +556,18 @@ and the target that we need respectively.
     "filename": attr.string(
         doc = "Download the whl file to this filename. Only used when the `urls` is passed. If not specified, will be auto-detected from the `urls`.",
     ),
+    "files_only": attr.bool(
+        doc = """\
+Only create the targets for the files of the wheel without its dependencies.
+Used for the `files_repo` of another `whl_library`. INTERNAL USE ONLY.""",
+    ),
+    "files_repo": attr.string(
+        doc = """\
+The name of the repository with the files of the wheel. If set, only the
+METADATA is downloaded from `metadata_url` and the targets reference the
+files from that repository. Only supported when pipstar is enabled.
+INTERNAL USE ONLY.""",
+    ),
     "group_deps": attr.string_list(
         doc = "List of dependencies to skip in order to break the cycles within a dependency group.",
         default = [],
@@ -528,6 +575,12 @@ and the target that we need respectively.
     "group_name": attr.string(
         doc = "Name of the group, if any.",
     ),
+    "metadata_sha256": attr.string(
+        doc = "The sha256 of the METADATA file served by the index. Only used when the `files_repo` is passed.",
+    ),
+    "metadata_url": attr.string(
+        doc = "The URL of the METADATA file served by the index as per PEP 658. Only used when the `files_repo` is passed.",
+    ),
     "repo": attr.string(
         doc = "Pointer to parent repo name. Used to make these rules rerun if the parent repo changes.",
     ),
@@ -112,6 +112,7 @@ def whl_library_targets(
         copy_files = {},
         copy_executables = {},
         entry_points = {},
+        files_repo = "",
         native = native,
         rules = struct(
             copy_file = copy_file,
@@ -153,6 +154,9 @@ def whl_library_targets(
         data: {type}`list[str]` A list of labels to include as part of the `data` attribute in `py_library`.
         entry_points: {type}`dict[str, str]` The mapping between the script
             name and the python file to use. DEPRECATED.
+        files_repo: {type}`str` The repository with the extracted wheel files,
+            e.g. `@pypi_foo_files`. If set, the targets only reference the
+            files from there and it is only fetched when the files are needed.
         native: {type}`native` The native struct for overriding in tests.
         rules: {type}`struct` A struct with references to rules for creating targets.
     """
@@ -167,7 +171,9 @@ def whl_library_targets(
     for filegroup_name, glob in filegroups.items():
         native.filegroup(
             name = filegroup_name,
-            srcs = native.glob(glob, allow_empty = True),
+            srcs = [
+                "{}//:{}".format(files_repo, filegroup_name),
+            ] if files_repo else native.glob(glob, allow_empty = True),
             visibility = ["//visibility:public"],
         )
 
@@ -275,7 +281,7 @@ def whl_library_targets(
     if hasattr(native, "filegroup"):
         native.filegroup(
             name = whl_file_label,
-            srcs = [name],
+            srcs = ["{}//:{}".format(files_repo, name) if files_repo else name],
             data = _deps(
                 deps = dependencies,
                 deps_by_platform = dependencies_by_platform,
@@ -309,27 +315,40 @@ def whl_library_targets(
             if item not in _data_exclude:
                 _data_exclude.append(item)
 
-        rules.py_library(
-            name = py_library_label,
+        if files_repo:
+            srcs = []
+            pyi_srcs = []
+            imports = []
+            files_deps = ["{}//:{}".format(files_repo, PY_LIBRARY_PUBLIC_LABEL)]
+        else:
             srcs = native.glob(
                 ["site-packages/**/*.py"],
                 exclude = srcs_exclude,
                 # Empty sources are allowed to support wheels that don't have any
                 # pure-Python code, e.g. pymssql, which is written in Cython.
                 allow_empty = True,
-            ),
+            )
             pyi_srcs = native.glob(
                 ["site-packages/**/*.pyi"],
                 allow_empty = True,
-            ),
+            )
             data = data + native.glob(
                 ["site-packages/**/*"],
                 exclude = _data_exclude,
-            ),
+            )
+
             # This makes this directory a top-level in the python import
             # search path for anything that depends on this.
-            imports = ["site-packages"],
-            deps = _deps(
+            imports = ["site-packages"]
+            files_deps = []
+
+        rules.py_library(
+            name = py_library_label,
+            srcs = srcs,
+            pyi_srcs = pyi_srcs,
+            data = data,
+            imports = imports,
+            deps = files_deps + _deps(
                 deps = dependencies,
                 deps_by_platform = dependencies_by_platform,
                 deps_conditional = deps_conditional,
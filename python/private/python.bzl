@@ -560,6 +560,12 @@ def _process_single_version_overrides(*, tag, _fail = fail, default):
         kwargs.setdefault(tag.python_version, {})["distutils_content"] = tag.distutils_content
     if tag.distutils:
         kwargs.setdefault(tag.python_version, {})["distutils"] = tag.distutils
+    if tag.slim_runtime:
+        kwargs.setdefault(tag.python_version, {})["slim_runtime"] = tag.slim_runtime
+    if tag.extra_files_glob_include:
+        kwargs.setdefault(tag.python_version, {})["extra_files_glob_include"] = list(tag.extra_files_glob_include)
+    if tag.extra_files_glob_exclude:
+        kwargs.setdefault(tag.python_version, {})["extra_files_glob_exclude"] = list(tag.extra_files_glob_exclude)
 
 def _process_single_version_platform_overrides(*, tag, _fail = fail, default):
     if not _validate_version(tag.python_version, _fail = _fail):
@@ -615,6 +621,7 @@ def _process_global_overrides(*, tag, default, _fail = fail):
     forwarded_attrs = sorted(AUTH_ATTRS) + [
         "ignore_root_user_error",
         "base_url",
+        "precompile_stdlib",
         "register_all_versions",
     ]
     for key in forwarded_attrs:
@@ -993,6 +1000,16 @@ The values in this mapping override the default values and do not replace them.
 """,
             default = {},
         ),
+        "precompile_stdlib": attr.bool(
+            default = False,
+            doc = """\
+Whether to precompile the standard library of the downloaded runtimes into
+deterministic `.pyc` files, see {attr}`python_repository.precompile_stdlib`.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
         "register_all_versions": attr.bool(default = False, doc = "Add all versions"),
     } | AUTH_ATTRS,
 )
@@ -1040,6 +1057,26 @@ class.
                   "Either {attr}`distutils` or {attr}`distutils_content` can be specified, but not both.",
             mandatory = False,
         ),
+        "extra_files_glob_exclude": attr.string_list(
+            mandatory = False,
+            doc = """\
+Additional glob patterns of the files to exclude from the runtime files. See
+{attr}`python_repository.extra_files_glob_exclude`.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
+        "extra_files_glob_include": attr.string_list(
+            mandatory = False,
+            doc = """\
+Additional glob patterns of the files to include in the runtime files. See
+{attr}`python_repository.extra_files_glob_include`.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
         "patch_strip": attr.int(
             mandatory = False,
             doc = "Same as the --strip argument of Unix patch.",
@@ -1057,6 +1094,16 @@ class.
             mandatory = False,
             doc = "The python platform to sha256 dict. See {attr}`python.single_version_platform_override.platform` for allowed key values.",
         ),
+        "slim_runtime": attr.bool(
+            mandatory = False,
+            doc = """\
+Whether to exclude the parts of the runtime that programs rarely need from the
+runtime files. See {attr}`python_repository.slim_runtime`.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
         "strip_prefix": attr.string(
             mandatory = False,
             doc = "The 'strip_prefix' for the archive, defaults to 'python'.",
@@ -22,6 +22,39 @@ load(":text_util.bzl", "render")
 
 STANDALONE_INTERPRETER_FILENAME = "STANDALONE_INTERPRETER"
 
+# The test data files that aren't valid Python. This matches what CPython's
+# `make install` skips when it compiles the stdlib.
+_PRECOMPILE_STDLIB_EXCLUDE = "bad_coding|badsyntax|lib2to3.tests.data|test_lib2to3.data"
+
+# The parts of the runtime that programs rarely need at runtime, which are
+# excluded from the runtime files when `slim_runtime` is set: the GUI toolkit
+# and the programs using it, the bundled pip and the files only used to build
+# extensions.
+_SLIM_RUNTIME_EXCLUDES = [
+    "{stdlib}/config-*/**",
+    "{stdlib}/ensurepip/_bundled/**",
+    "{stdlib}/idlelib/**",
+    "{stdlib}/lib-dynload/_tkinter.*",
+    "{stdlib}/lib2to3/**",
+    "{stdlib}/site-packages/pip-*.dist-info/**",
+    "{stdlib}/site-packages/pip/**",
+    "{stdlib}/tkinter/**",
+    "{stdlib}/turtle.py",
+    "{stdlib}/turtledemo/**",
+]
+_SLIM_RUNTIME_EXCLUDES_UNIX = [
+    "lib/itcl*/**",
+    "lib/tcl*/**",
+    "lib/thread*/**",
+    "lib/tk*/**",
+]
+_SLIM_RUNTIME_EXCLUDES_WINDOWS = [
+    "DLLs/_tkinter.pyd",
+    "DLLs/tcl*.dll",
+    "DLLs/tk*.dll",
+    "tcl/**",
+]
+
 def is_standalone_interpreter(rctx, python_interpreter_path, *, logger = None):
     """Query a python interpreter target for whether or not it's a rules_rust provided toolchain
 
@@ -123,6 +156,17 @@ def _python_repository_impl(rctx):
             logger = logger,
         )
 
+    python_bin = "python.exe" if ("windows" in platform) else "bin/python3"
+
+    stdlib_precompiled = False
+    if rctx.attr.precompile_stdlib:
+        stdlib_precompiled = _precompile_stdlib(
+            rctx,
+            python_bin = python_bin,
+            stdlib_dir = "Lib" if "windows" in platform else "lib/python{}".format(python_short_version),
+            logger = logger,
+        )
+
     # Make the Python installation read-only. This is to prevent issues due to
     # pycs being generated at runtime:
     # * The pycs are not deterministic (they contain timestamps)
@@ -162,8 +206,6 @@ def _python_repository_impl(rctx):
                 else:
                     logger.warn("The current user has CAP_DAC_OVERRIDE set, which can cause spurious cache misses or build failures with the hermetic Python interpreter. See https://github.com/bazel-contrib/rules_python/pull/713.")
 
-    python_bin = "python.exe" if ("windows" in platform) else "bin/python3"
-
     if "linux" in platform:
         # Workaround around https://github.com/astral-sh/python-build-standalone/issues/231
         for url in urls:
@@ -188,15 +230,25 @@ def _python_repository_impl(rctx):
     glob_include = []
     glob_exclude = []
     if rctx.attr.ignore_root_user_error or "windows" in platform:
-        glob_exclude += [
-            # These pycache files are created on first use of the associated python files.
-            # Exclude them from the glob because otherwise between the first time and second time a python toolchain is used,"
-            # the definition of this filegroup will change, and depending rules will get invalidated."
-            # See https://github.com/bazel-contrib/rules_python/issues/1008 for unconditionally adding these to toolchains so we can stop ignoring them."
-            # pyc* is ignored because pyc creation creates temporary .pyc.NNNN files
-            "**/__pycache__/*.pyc*",
-            "**/__pycache__/*.pyo*",
-        ]
+        # These pycache files are created on first use of the associated python files.
+        # Exclude them from the glob because otherwise between the first time and second time a python toolchain is used,"
+        # the definition of this filegroup will change, and depending rules will get invalidated."
+        # See https://github.com/bazel-contrib/rules_python/issues/1008 for unconditionally adding these to toolchains so we can stop ignoring them."
+        if stdlib_precompiled:
+            # The plain pycs were created when the repository was created. The
+            # optimized pycs and the temporary .pyc.NNNN files can still be
+            # created at runtime.
+            glob_exclude += [
+                "**/__pycache__/*.opt-*.pyc",
+                "**/__pycache__/*.pyc.*",
+                "**/__pycache__/*.pyo*",
+            ]
+        else:
+            glob_exclude += [
+                # pyc* is ignored because pyc creation creates temporary .pyc.NNNN files
+                "**/__pycache__/*.pyc*",
+                "**/__pycache__/*.pyo*",
+            ]
 
     if "windows" in platform:
         glob_include += [
@@ -212,6 +264,21 @@ def _python_repository_impl(rctx):
             "lib/**",
         )
 
+    if rctx.attr.slim_runtime:
+        if "windows" in platform:
+            stdlib_dir = "Lib"
+            glob_exclude += _SLIM_RUNTIME_EXCLUDES_WINDOWS
+        else:
+            stdlib_dir = "lib/python{}".format(python_short_version)
+            glob_exclude += _SLIM_RUNTIME_EXCLUDES_UNIX
+        glob_exclude += [
+            pattern.format(stdlib = stdlib_dir)
+            for pattern in _SLIM_RUNTIME_EXCLUDES
+        ]
+
+    glob_include += rctx.attr.extra_files_glob_include
+    glob_exclude += rctx.attr.extra_files_glob_exclude
+
     if "windows" in platform:
         coverage_tool = None
     else:
@@ -249,15 +316,19 @@ define_hermetic_runtime_toolchain_impl(
         "coverage_tool": rctx.attr.coverage_tool,
         "distutils": rctx.attr.distutils,
         "distutils_content": rctx.attr.distutils_content,
+        "extra_files_glob_exclude": rctx.attr.extra_files_glob_exclude,
+        "extra_files_glob_include": rctx.attr.extra_files_glob_include,
         "ignore_root_user_error": rctx.attr.ignore_root_user_error,
         "name": rctx.attr.name,
         "netrc": rctx.attr.netrc,
         "patch_strip": rctx.attr.patch_strip,
         "patches": rctx.attr.patches,
         "platform": platform,
+        "precompile_stdlib": rctx.attr.precompile_stdlib,
         "python_version": python_version,
         "release_filename": release_filename,
         "sha256": rctx.attr.sha256,
+        "slim_runtime": rctx.attr.slim_runtime,
         "strip_prefix": rctx.attr.strip_prefix,
     }
 
@@ -268,6 +339,58 @@ define_hermetic_runtime_toolchain_impl(
 
     return attrs
 
+def _precompile_stdlib(rctx, *, python_bin, stdlib_dir, logger):
+    """Precompiles the stdlib into pycs.
+
+    Returns:
+        {type}`bool` True if the pycs were created, False otherwise.
+    """
+    meta = PLATFORMS[rctx.attr.platform]
+    if (meta.os_name, meta.arch) != (
+        repo_utils.get_platforms_os_name(rctx),
+        repo_utils.get_platforms_cpu_name(rctx),
+    ):
+        logger.warn(lambda: ("Not precompiling the stdlib of {}: it can't run on the host, so " +
+                             "its files differ from those fetched on a matching host").format(rctx.attr.platform))
+        return False
+
+    # The source paths are relative to the repository root, so that the
+    # `co_filename` embedded in the pycs doesn't depend on the output base.
+    # Python fixes it up to the real location when the pyc is loaded.
+    exec_result = repo_utils.execute_unchecked(
+        rctx,
+        op = "python_repository.PrecompileStdlib",
+        arguments = [
+            rctx.path(python_bin),
+            "-s",
+            "-m",
+            "compileall",
+            "-q",
+            "-f",
+            "-j0",
+            "--invalidation-mode=unchecked-hash",
+            "-x",
+            _PRECOMPILE_STDLIB_EXCLUDE,
+            stdlib_dir,
+        ],
+        environment = {
+            # Before Python 3.11, the set and frozenset constants are
+            # marshalled in hash order.
+            "PYTHONHASHSEED": "0",
+            "PYTHONPATH": "",
+            "PYTHONPYCACHEPREFIX": "",
+        },
+        logger = logger,
+    )
+    if exec_result.return_code != 0:
+        logger.warn(lambda: "Failed to precompile the stdlib of {}:\n{}{}".format(
+            rctx.attr.platform,
+            exec_result.stdout,
+            exec_result.stderr,
+        ))
+        return False
+    return True
+
 python_repository = repository_rule(
     _python_repository_impl,
     doc = "Fetches the external tools needed for the Python toolchain.",
@@ -297,6 +420,24 @@ For more information see {attr}`py_runtime.coverage_tool`.
                   "Either distutils or distutils_content can be specified, but not both.",
             mandatory = False,
         ),
+        "extra_files_glob_exclude": attr.string_list(
+            doc = """\
+Additional glob patterns of the files to exclude from the runtime files, i.e.
+the files included in the binaries using the runtime.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
+        "extra_files_glob_include": attr.string_list(
+            doc = """\
+Additional glob patterns of the files to include in the runtime files, i.e.
+the files included in the binaries using the runtime.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
         "ignore_root_user_error": attr.bool(
             default = True,
             doc = "Whether the check for root should be ignored or not. This causes cache misses with .pyc files.",
@@ -329,6 +470,29 @@ function defaults (e.g. `single_version_override` for `MODULE.bazel` files.
             mandatory = True,
             values = PLATFORMS.keys(),
         ),
+        "precompile_stdlib": attr.bool(
+            default = False,
+            doc = """\
+Whether to precompile the standard library, and the packages installed in the
+runtime's `site-packages`, into `.pyc` files when the repository is created.
+
+The pycs use the `unchecked-hash` invalidation mode and don't contain
+timestamps. They are created before the installation is made read-only and are
+part of the runtime's files, so the interpreter doesn't have to compile the
+standard library every time a program starts.
+
+The pycs are only created if the runtime can be run on the host, i.e. the host
+OS and CPU match the runtime's platform; otherwise a warning is printed. The
+runtime's files, and thus the inputs of the actions using it, then depend on
+which host fetched the repository: e.g. the Linux runtime fetched on a macOS
+machine doesn't have the pycs that it has when fetched on Linux CI, so the two
+don't share remote cache hits. Only enable this when the hosts sharing a cache
+fetch the runtimes they can run.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
         "python_version": attr.string(
             doc = "The Python version.",
             mandatory = True,
@@ -341,6 +505,19 @@ function defaults (e.g. `single_version_override` for `MODULE.bazel` files.
             doc = "The SHA256 integrity hash for the Python interpreter tarball.",
             mandatory = True,
         ),
+        "slim_runtime": attr.bool(
+            default = False,
+            doc = """\
+Whether to exclude the parts of the runtime that programs rarely need from the
+runtime files: `tkinter` and the programs using it (e.g. `idlelib`), `lib2to3`,
+the bundled `pip` and the files only used to build extensions (`config-*`).
+
+Use {attr}`extra_files_glob_exclude` to exclude other parts as well.
+
+:::{versionadded} VERSION_NEXT_FEATURE
+:::
+""",
+        ),
         "strip_prefix": attr.string(
             doc = "A directory prefix to strip from the extracted files.",
         ),
@@ -27,6 +27,14 @@ _SELF_RUNFILES_RELATIVE_PATH = "%site_init_runfiles_path%"
 # Runfiles-relative path to the coverage tool entry point, if any.
 _COVERAGE_TOOL = "%coverage_tool%"
 
+# Timestamps recorded for RULES_PYTHON_BOOTSTRAP_PROFILE; read by the stage2
+# bootstrap.
+PROFILE_TIMESTAMPS = {}
+if os.environ.get("RULES_PYTHON_BOOTSTRAP_PROFILE"):
+    import time
+
+    PROFILE_TIMESTAMPS["site_init_start"] = time.time()
+
 
 def _is_verbose():
     return bool(os.environ.get("RULES_PYTHON_BOOTSTRAP_VERBOSE"))
@@ -124,6 +132,13 @@ def _search_path(name):
     return None
 
 
+def _get_runfiles_prefix():
+    prefix = os.path.join(_get_windows_path_with_unc_prefix(_RUNFILES_ROOT), "")
+    if _is_windows():
+        prefix = prefix.replace("/", os.sep)
+    return prefix
+
+
 def _setup_sys_path():
     """Perform Bazel/binary specific sys.path setup.
 
@@ -134,7 +149,6 @@ def _setup_sys_path():
        Python names, so there's no point in adding the runfiles root to sys.path.
     """
     seen = set(sys.path)
-    python_path_entries = []
 
     def _maybe_add_path(path):
         if path in seen:
@@ -147,19 +161,32 @@ def _setup_sys_path():
         sys.path.append(path)
         seen.add(path)
 
-    for rel_path in _IMPORTS_STR.split(":"):
-        abs_path = os.path.join(_RUNFILES_ROOT, rel_path)
-        _maybe_add_path(abs_path)
+    # The import paths are resolved at build time, so they are added without
+    # checking that they exist and the per path work is only a concatenation.
+    runfiles_prefix = _get_runfiles_prefix()
+    imports_str = _IMPORTS_STR
+    if _is_windows():
+        imports_str = imports_str.replace("/", os.sep)
+    import_paths = [runfiles_prefix + p for p in imports_str.split(":") if p]
 
     if _IMPORT_ALL:
-        repo_dirs = sorted(
-            os.path.join(_RUNFILES_ROOT, d) for d in os.listdir(_RUNFILES_ROOT)
-        )
-        for d in repo_dirs:
-            if os.path.isdir(d):
-                _maybe_add_path(d)
+        # Only the directory entries of the runfiles root need to be probed;
+        # scandir gets the entry type without a stat call on most platforms.
+        with os.scandir(_RUNFILES_ROOT) as entries:
+            import_paths.extend(
+                sorted(runfiles_prefix + e.name for e in entries if e.is_dir())
+            )
     else:
-        _maybe_add_path(os.path.join(_RUNFILES_ROOT, _WORKSPACE_NAME))
+        import_paths.append(runfiles_prefix + _WORKSPACE_NAME)
+
+    verbose = _is_verbose()
+    for path in import_paths:
+        if path in seen:
+            continue
+        if verbose:
+            _print_verbose("append sys.path:", path)
+        sys.path.append(path)
+        seen.add(path)
 
     # COVERAGE_DIR is set if coverage is enabled and instrumentation is configured
     # for something, though it could be another program executing this one or
@@ -203,6 +230,66 @@ def _setup_sys_path():
     return coverage_setup
 
 
+class _ModuleIndexFinder:
+    """Finds top-level modules using the index computed at build time.
+
+    A top-level import normally checks every sys.path entry in order until the
+    module is found. For a module in the index, the import paths that are
+    known not to provide it are skipped, while the other sys.path entries are
+    still searched in their original order. Modules not in the index are left
+    to the regular path based finder.
+    """
+
+    def __init__(self, index, import_paths, path_finder):
+        self._index = index
+        self._import_paths = import_paths
+        self._path_finder = path_finder
+
+    def find_spec(self, fullname, path=None, target=None):
+        # Submodules are searched in the package's __path__.
+        if path is not None:
+            return None
+        candidates = self._index.get(fullname)
+        if candidates is None:
+            return None
+        search_path = [
+            p for p in sys.path if p in candidates or p not in self._import_paths
+        ]
+        return self._path_finder.find_spec(fullname, search_path, target)
+
+
+def install_module_index_finder(index_path):
+    """Install a meta path finder that uses the given module index.
+
+    Args:
+        index_path: path to the module index file created at build time, with
+            one `<top-level module>=<runfiles-relative import path>` per line.
+    """
+    from importlib.machinery import PathFinder
+
+    runfiles_prefix = _get_runfiles_prefix()
+    sep = os.sep if _is_windows() else None
+    index = {}
+    import_paths = set()
+    with open(index_path, encoding="utf-8") as f:
+        for line in f:
+            name, _, rel_path = line.rstrip("\n").partition("=")
+            if sep:
+                rel_path = rel_path.replace("/", sep)
+            path = runfiles_prefix + rel_path
+            index.setdefault(name, set()).add(path)
+            import_paths.add(path)
+
+    finder = _ModuleIndexFinder(index, import_paths, PathFinder)
+    for i, meta_path_finder in enumerate(sys.meta_path):
+        if meta_path_finder is PathFinder:
+            sys.meta_path.insert(i, finder)
+            break
+    else:
+        sys.meta_path.append(finder)
+    _print_verbose("module index size:", len(index))
+
+
 def _fixup_sys_base_executable():
     """Fixup sys._base_executable to account for Bazel-specific pyvenv.cfg
 
@@ -226,4 +313,6 @@ def _fixup_sys_base_executable():
 _fixup_sys_base_executable()
 
 COVERAGE_SETUP = _setup_sys_path()
+if PROFILE_TIMESTAMPS:
+    PROFILE_TIMESTAMPS["site_init_end"] = time.time()
 _print_verbose("DONE")
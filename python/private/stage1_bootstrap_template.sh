@@ -6,6 +6,18 @@ if [[ -n "${RULES_PYTHON_BOOTSTRAP_VERBOSE:-}" ]]; then
   set -x
 fi
 
+# Wall clock timestamps, in seconds, recorded for the startup profile.
+declare -a profile_timestamps
+function profile_timestamp() {
+  if [[ -n "${RULES_PYTHON_BOOTSTRAP_PROFILE:-}" ]]; then
+    # EPOCHREALTIME requires Bash 5; older versions only have whole seconds.
+    local now="${EPOCHREALTIME:-$(date +%s)}"
+    # Some locales use a comma as the decimal separator.
+    profile_timestamps+=("$1=${now/,/.}")
+  fi
+}
+profile_timestamp stage1_start
+
 # runfiles-relative path
 STAGE2_BOOTSTRAP="%stage2_bootstrap%"
 
@@ -146,17 +158,64 @@ if [[ "$IS_ZIPFILE" == "1" ]]; then
   mkdir -p "$(dirname $python_exe)"
   ln -s "$symlink_to" "$python_exe"
 elif [[ "$RECREATE_VENV_AT_RUNTIME" == "1" ]]; then
-  if [[ -n "$RULES_PYTHON_EXTRACT_ROOT" ]]; then
+  runfiles_venv="$RUNFILES_DIR/$(dirname $(dirname $PYTHON_BINARY))"
+
+  if [[ "$PYTHON_BINARY_ACTUAL" == /* ]]; then
+    # An absolute path, i.e. platform runtime, e.g. /usr/bin/python3
+    python_exe_actual=$PYTHON_BINARY_ACTUAL
+  elif [[ "$PYTHON_BINARY_ACTUAL" == */* ]]; then
+    # A runfiles-relative path
+    python_exe_actual="$RUNFILES_DIR/$PYTHON_BINARY_ACTUAL"
+  else
+    # A plain word, e.g. "python3". Symlink to where PATH leads
+    python_exe_actual=$(which $PYTHON_BINARY_ACTUAL)
+    # Guard against trying to symlink to an empty value
+    if [[ $? -ne 0 ]]; then
+      echo >&2 "ERROR: Python to use not found on PATH: $PYTHON_BINARY_ACTUAL"
+      exit 1
+    fi
+  fi
+
+  venvs_root="${RULES_PYTHON_EXTRACT_ROOT:-}"
+  if [[ -z "$venvs_root" ]]; then
+    # Share the venvs between invocations in a per-user directory of the temp
+    # directory, so that the interpreter isn't probed on every run. If it
+    # can't be used safely, e.g. another user created it, a temporary venv is
+    # created for this run instead.
+    venvs_root="${TMPDIR:-/tmp}/rules_python_venvs_$UID"
+    if ! mkdir -p -m 700 "$venvs_root" 2>/dev/null || [[ -L "$venvs_root" || ! -O "$venvs_root" ]]; then
+      venvs_root=""
+    fi
+  fi
+
+  if [[ -n "$venvs_root" ]]; then
     use_exec=1
     # Use our runfiles path as a unique, reusable, location for the
-    # binary-specific venv being created.
-    venv="$RULES_PYTHON_EXTRACT_ROOT/$(dirname $(dirname $PYTHON_BINARY))"
-    mkdir -p $RULES_PYTHON_EXTRACT_ROOT
+    # binary-specific venv being created. The venv symlinks point to the
+    # runfiles and the interpreter, so they are part of the key; otherwise
+    # e.g. different output bases would reuse each other's venv.
+    read -r venv_key _ < <(printf '%s\n' "$runfiles_venv" "$python_exe_actual" | cksum)
+    venv="$venvs_root/$(dirname $(dirname $PYTHON_BINARY))-$venv_key"
+    if [[ -e "$venv/pyvenv.cfg" ]]; then
+      venv_tmp=""
+    else
+      mkdir -p "$(dirname "$venv")"
+      # The venv is created next to its final location and then published
+      # with a symlink, which is atomic, so that concurrent invocations never
+      # use a partially created venv.
+      venv_tmp=$(mktemp -d "$venv.XXXXXX")
+      # Don't leave a partially created venv behind if this fails before the
+      # venv is published.
+      if [[ -n "$venv_tmp" && -z "${RULES_PYTHON_BOOTSTRAP_VERBOSE:-}" ]]; then
+        trap 'rm -fr "$venv_tmp"' EXIT
+      fi
+    fi
   else
     # Re-exec'ing can't be used because we have to clean up the temporary
     # venv directory that is created.
     use_exec=0
     venv=$(mktemp -d)
+    venv_tmp=$venv
     if [[ -n "$venv" && -z "${RULES_PYTHON_BOOTSTRAP_VERBOSE:-}" ]]; then
       trap 'rm -fr "$venv"' EXIT
     fi
@@ -165,24 +224,7 @@ elif [[ "$RECREATE_VENV_AT_RUNTIME" == "1" ]]; then
   # Match the basename; some tools, e.g. pyvenv key off the executable name
   python_exe="$venv/bin/$(basename $PYTHON_BINARY_ACTUAL)"
 
-  if [[ ! -e "$python_exe" ]]; then
-    if [[ "$PYTHON_BINARY_ACTUAL" == /* ]]; then
-      # An absolute path, i.e. platform runtime, e.g. /usr/bin/python3
-      python_exe_actual=$PYTHON_BINARY_ACTUAL
-    elif [[ "$PYTHON_BINARY_ACTUAL" == */* ]]; then
-      # A runfiles-relative path
-      python_exe_actual="$RUNFILES_DIR/$PYTHON_BINARY_ACTUAL"
-    else
-      # A plain word, e.g. "python3". Symlink to where PATH leads
-      python_exe_actual=$(which $PYTHON_BINARY_ACTUAL)
-      # Guard against trying to symlink to an empty value
-      if [[ $? -ne 0 ]]; then
-        echo >&2 "ERROR: Python to use not found on PATH: $PYTHON_BINARY_ACTUAL"
-        exit 1
-      fi
-    fi
-
-    runfiles_venv="$RUNFILES_DIR/$(dirname $(dirname $PYTHON_BINARY))"
+  if [[ -n "$venv_tmp" ]]; then
     # When RESOLVE_PYTHON_BINARY_AT_RUNTIME is true, it means the toolchain
     # has thrown two complications at us:
     # 1. The build-time assumption of the Python version may not match the
@@ -197,6 +239,8 @@ elif [[ "$RECREATE_VENV_AT_RUNTIME" == "1" ]]; then
     # directory. Hopefully the version mismatch is OK :D.
     # To fix (2), we determine the actual underlying interpreter and symlink
     # to that.
+    # With RULES_PYTHON_EXTRACT_ROOT, this only happens until the venv is
+    # cached.
     if [[ "$RESOLVE_PYTHON_BINARY_AT_RUNTIME" == "1" ]]; then
       {
         read -r resolved_py_exe
@@ -204,7 +248,7 @@ elif [[ "$RECREATE_VENV_AT_RUNTIME" == "1" ]]; then
       } < <("$python_exe_actual" -I <<EOF
 import sys, site, os
 print(sys.executable)
-print(site.getsitepackages(["$venv"])[-1])
+print(site.getsitepackages(["$venv_tmp"])[-1])
 EOF
 )
       python_exe_actual="$resolved_py_exe"
@@ -213,25 +257,47 @@ EOF
     else
       # For simplicity, just symlink to the whole lib directory.
       runfiles_venv_site_packages=$runfiles_venv/lib
-      venv_site_packages=$venv/lib
+      venv_site_packages=$venv_tmp/lib
     fi
 
-    mkdir -p "$venv/bin"
-    ln -s "$python_exe_actual" "$python_exe"
+    mkdir -p "$venv_tmp/bin"
+    ln -s "$python_exe_actual" "$venv_tmp/bin/$(basename $PYTHON_BINARY_ACTUAL)"
 
     if [[ ! -e "$venv_site_packages" ]]; then
       mkdir -p $(dirname $venv_site_packages)
       ln -s "$runfiles_venv_site_packages" "$venv_site_packages"
     fi
-  fi
 
-  if [[ ! -e "$venv/pyvenv.cfg" ]]; then
-    ln -s "$runfiles_venv/pyvenv.cfg" "$venv/pyvenv.cfg"
+    ln -s "$runfiles_venv/pyvenv.cfg" "$venv_tmp/pyvenv.cfg"
+
+    if [[ "$venv_tmp" != "$venv" ]]; then
+      # -n so that an existing symlink to a directory isn't followed.
+      if ln -sn "$(basename "$venv_tmp")" "$venv" 2>/dev/null; then
+        :
+      elif [[ -L "$venv" && ! -e "$venv/pyvenv.cfg" ]]; then
+        # The published venv was removed, e.g. by a temp directory cleaner,
+        # so atomically replace the dangling symlink. -T (GNU) and -h (BSD)
+        # keep mv from moving into a venv another invocation just published.
+        venv_link="$venv_tmp.link"
+        ln -sfn "$(basename "$venv_tmp")" "$venv_link"
+        if ! mv -fT "$venv_link" "$venv" 2>/dev/null &&
+            ! mv -fh "$venv_link" "$venv" 2>/dev/null; then
+          rm -f "$venv_link"
+          rm -fr "$venv_tmp"
+        fi
+      else
+        # Another invocation published the venv first, so use that one.
+        rm -fr "$venv_tmp"
+      fi
+      trap - EXIT
+    fi
   fi
 else
   use_exec=1
 fi
 
+profile_timestamp stage1_venv_ready
+
 # At this point, we should have a valid reference to the interpreter.
 # Check that so we can give an nicer failure if things went wrong.
 if [[ ! -x "$python_exe" ]]; then
@@ -276,6 +342,13 @@ fi
 
 export RUNFILES_DIR
 
+profile_timestamp stage1_exec
+if [[ -n "${RULES_PYTHON_BOOTSTRAP_PROFILE:-}" ]]; then
+  # Only passed to the interpreter; the stage2 bootstrap removes it from the
+  # environment so that it isn't inherited by subprocesses.
+  interpreter_env+=("RULES_PYTHON_BOOTSTRAP_PROFILE_STAGE1=${profile_timestamps[*]}")
+fi
+
 command=(
   env
   "${interpreter_env[@]}"
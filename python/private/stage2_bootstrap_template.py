@@ -20,8 +20,11 @@ import contextlib
 import os
 import re
 import runpy
+import time
 import uuid
 
+_STAGE2_START = time.time()
+
 # ===== Template substitutions start =====
 # We just put them in one place so its easy to tell which are used.
 
@@ -32,12 +35,19 @@ MAIN_PATH = "%main%"
 # Module name to execute. Empty if MAIN is used.
 MAIN_MODULE = "%main_module%"
 
+# Label of the binary.
+TARGET = "%target%"
+
 # venv-relative path to the expected location of the binary's site-packages
 # directory.
 # Only set when the toolchain doesn't support the build-time venv. Empty
 # string otherwise.
 VENV_SITE_PACKAGES = "%venv_rel_site_packages%"
 
+# Runfiles-relative path to the index of the top-level modules provided by
+# each import path. Empty if the module index is disabled.
+MODULE_INDEX = "%module_index%"
+
 # ===== Template substitutions end =====
 
 
@@ -128,6 +138,49 @@ def print_verbose_coverage(*args):
         print("bootstrap: stage 2: coverage:", *args, file=sys.stderr, flush=True)
 
 
+def start_profile():
+    """Return the startup timestamps if profiling is enabled, otherwise None."""
+    if not os.environ.get("RULES_PYTHON_BOOTSTRAP_PROFILE"):
+        return None
+
+    timestamps = {}
+    stage1 = os.environ.pop("RULES_PYTHON_BOOTSTRAP_PROFILE_STAGE1", "")
+    for entry in stage1.split():
+        name, _, value = entry.partition("=")
+        timestamps[name] = float(value)
+    try:
+        import _bazel_site_init
+    except ImportError:
+        pass
+    else:
+        timestamps.update(getattr(_bazel_site_init, "PROFILE_TIMESTAMPS", {}))
+    timestamps["stage2_start"] = _STAGE2_START
+    return timestamps
+
+
+def profile_timestamp(profile, name):
+    if profile is not None:
+        profile[name] = time.time()
+
+
+def write_profile(profile):
+    """Append the profile as a JSON line to $RULES_PYTHON_BOOTSTRAP_PROFILE."""
+    import json
+
+    record = {
+        "target": TARGET,
+        "pid": os.getpid(),
+        "argv": sys.argv,
+        "timestamps": profile,
+    }
+    path = os.environ["RULES_PYTHON_BOOTSTRAP_PROFILE"]
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as err:
+        print("bootstrap: stage 2: unable to write profile:", err, file=sys.stderr)
+
+
 def is_verbose_coverage():
     """Returns True if VERBOSE_COVERAGE is non-empty in the environment."""
     return os.environ.get("VERBOSE_COVERAGE") or is_verbose()
@@ -292,30 +345,24 @@ def _run_py_module(module_name):
     runpy.run_module(module_name, alter_sys=True, run_name="__main__")
 
 
-@contextlib.contextmanager
-def _maybe_collect_coverage(enable):
-    print_verbose_coverage("enabled:", enable)
-    if not enable:
-        yield
-        return
+# Set by the process that combines the coverage data in parallel mode, so that
+# the processes it starts only write their data.
+_COVERAGE_COMBINER_ENVVAR = "RULES_PYTHON_COVERAGE_COMBINER_PID"
+
 
+def _coverage_source():
+    """Returns the coveragerc `source` setting for the instrumented files."""
     instrumented_files = [abs_path for abs_path, _ in instrumented_file_paths()]
     unique_dirs = {os.path.dirname(file) for file in instrumented_files}
-    source = "\n\t".join(unique_dirs)
 
     print_verbose_coverage("Instrumented Files:\n" + "\n".join(instrumented_files))
     print_verbose_coverage("Sources:\n" + "\n".join(unique_dirs))
+    return "\n\t".join(unique_dirs)
 
-    import uuid
-
-    import coverage
-
-    coverage_dir = os.environ["COVERAGE_DIR"]
-    unique_id = uuid.uuid4()
 
+def _write_coveragerc(rcfile_name, source):
     # We need for coveragepy to use relative paths.  This can only be configured
     # using an rc file.
-    rcfile_name = os.path.join(coverage_dir, ".coveragerc_{}".format(unique_id))
     print_verbose_coverage("coveragerc file:", rcfile_name)
     with open(rcfile_name, "w") as rcfile:
         rcfile.write(
@@ -325,44 +372,74 @@ source =
 \t{source}
 """
         )
+
+
+def _new_coverage(rcfile_name, **kwargs):
+    import coverage
+
+    return coverage.Coverage(
+        config_file=rcfile_name,
+        branch=True,
+        # NOTE: The messages arg controls what coverage prints to stdout/stderr,
+        # which can interfere with the Bazel coverage command. Enabling message
+        # output is only useful for debugging coverage support.
+        messages=is_verbose_coverage(),
+        omit=[
+            # Pipes can't be read back later, which can cause coverage to
+            # throw an error when trying to get its source code.
+            "/dev/fd/*",
+            # The mechanism for finding third-party packages in coverage-py
+            # only works for installed packages, not for runfiles. e.g:
+            #'$HOME/.local/lib/python3.10/site-packages',
+            # '/usr/lib/python',
+            # '/usr/lib/python3.10/site-packages',
+            # '/usr/local/lib/python3.10/dist-packages'
+            # see https://github.com/nedbat/coveragepy/blob/bfb0c708fdd8182b2a9f0fc403596693ef65e475/coverage/inorout.py#L153-L164
+            "*/external/*",
+        ],
+        **kwargs,
+    )
+
+
+def _write_lcov(cov, coverage_dir):
+    lcov_path = os.path.join(coverage_dir, "pylcov.dat")
+    print_verbose_coverage("generating lcov from:", lcov_path)
+    cov.lcov_report(
+        outfile=lcov_path,
+        # Ignore errors because sometimes instrumented files aren't
+        # readable afterwards. e.g. if they come from /dev/fd or if
+        # they were transient code-under-test in /tmp
+        ignore_errors=True,
+    )
+    if os.path.isfile(lcov_path):
+        unresolve_symlinks(lcov_path)
+
+
+@contextlib.contextmanager
+def _maybe_collect_coverage(enable):
+    print_verbose_coverage("enabled:", enable)
+    if not enable:
+        yield
+        return
+
+    coverage_dir = os.environ["COVERAGE_DIR"]
+    if os.environ.get("RULES_PYTHON_COVERAGE_PARALLEL") == "1":
+        with _collect_parallel_coverage(coverage_dir):
+            yield
+        return
+
+    source = _coverage_source()
+    unique_id = uuid.uuid4()
+    rcfile_name = os.path.join(coverage_dir, ".coveragerc_{}".format(unique_id))
+    _write_coveragerc(rcfile_name, source)
     try:
-        cov = coverage.Coverage(
-            config_file=rcfile_name,
-            branch=True,
-            # NOTE: The messages arg controls what coverage prints to stdout/stderr,
-            # which can interfere with the Bazel coverage command. Enabling message
-            # output is only useful for debugging coverage support.
-            messages=is_verbose_coverage(),
-            omit=[
-                # Pipes can't be read back later, which can cause coverage to
-                # throw an error when trying to get its source code.
-                "/dev/fd/*",
-                # The mechanism for finding third-party packages in coverage-py
-                # only works for installed packages, not for runfiles. e.g:
-                #'$HOME/.local/lib/python3.10/site-packages',
-                # '/usr/lib/python',
-                # '/usr/lib/python3.10/site-packages',
-                # '/usr/local/lib/python3.10/dist-packages'
-                # see https://github.com/nedbat/coveragepy/blob/bfb0c708fdd8182b2a9f0fc403596693ef65e475/coverage/inorout.py#L153-L164
-                "*/external/*",
-            ],
-        )
+        cov = _new_coverage(rcfile_name)
         cov.start()
         try:
             yield
         finally:
             cov.stop()
-            lcov_path = os.path.join(coverage_dir, "pylcov.dat")
-            print_verbose_coverage("generating lcov from:", lcov_path)
-            cov.lcov_report(
-                outfile=lcov_path,
-                # Ignore errors because sometimes instrumented files aren't
-                # readable afterwards. e.g. if they come from /dev/fd or if
-                # they were transient code-under-test in /tmp
-                ignore_errors=True,
-            )
-            if os.path.isfile(lcov_path):
-                unresolve_symlinks(lcov_path)
+            _write_lcov(cov, coverage_dir)
     finally:
         try:
             os.unlink(rcfile_name)
@@ -373,7 +450,58 @@ source =
             print_verbose_coverage("Error removing temporary coverage rc file:", err)
 
 
+@contextlib.contextmanager
+def _collect_parallel_coverage(coverage_dir):
+    """Collects coverage data, deferring the lcov conversion to one process.
+
+    Every process writes its raw data to a unique `.coverage.*` file. The
+    first process of the test, i.e. the one without the combiner envvar set,
+    combines all the data files and converts them to lcov once at exit.
+    """
+    # All processes of a test share the same COVERAGE_MANIFEST, so the rc
+    # file is only written by the first one to avoid resolving the
+    # instrumented files in every process.
+    rcfile_name = os.path.join(coverage_dir, ".coveragerc_parallel")
+    if not os.path.exists(rcfile_name):
+        tmp_rcfile_name = os.path.join(
+            coverage_dir, ".coveragerc_{}".format(uuid.uuid4())
+        )
+        _write_coveragerc(tmp_rcfile_name, _coverage_source())
+        # Concurrent processes write the same contents, so the last one wins.
+        os.replace(tmp_rcfile_name, rcfile_name)
+
+    is_combiner = _COVERAGE_COMBINER_ENVVAR not in os.environ
+    if is_combiner:
+        os.environ[_COVERAGE_COMBINER_ENVVAR] = str(os.getpid())
+    print_verbose_coverage("parallel mode, combiner:", is_combiner)
+
+    cov = _new_coverage(
+        rcfile_name,
+        data_file=os.path.join(coverage_dir, ".coverage"),
+        data_suffix=True,
+    )
+    cov.start()
+    try:
+        yield
+    finally:
+        cov.stop()
+        cov.save()
+        if is_combiner:
+            # The per-process data files are combined and deleted, and the
+            # combined data is saved as a new data file. A later process that
+            # also acts as the combiner, e.g. the next py_binary run by a
+            # sh_test, then combines it too instead of overwriting the report.
+            cov.combine(data_paths=[coverage_dir])
+            cov.save()
+            _write_lcov(cov, coverage_dir)
+            try:
+                os.unlink(rcfile_name)
+            except OSError as err:
+                print_verbose_coverage("Error removing coverage rc file:", err)
+
+
 def main():
+    profile = start_profile()
     print_verbose("initial argv:", values=sys.argv)
     print_verbose("initial cwd:", os.getcwd())
     print_verbose("initial environ:", mapping=os.environ)
@@ -455,6 +583,15 @@ def main():
     else:
         main_filename = None
 
+    if MODULE_INDEX:
+        import _bazel_site_init
+
+        # Custom site init templates may not support the module index.
+        if hasattr(_bazel_site_init, "install_module_index_finder"):
+            _bazel_site_init.install_module_index_finder(
+                os.path.join(runfiles_root, MODULE_INDEX)
+            )
+
     if os.environ.get("COVERAGE_DIR"):
         import _bazel_site_init
 
@@ -462,13 +599,23 @@ def main():
     else:
         coverage_enabled = False
 
-    with _maybe_collect_coverage(enable=coverage_enabled):
-        if MAIN_PATH:
-            # The first arg is this bootstrap, so drop that for the re-invocation.
-            _run_py_path(main_filename, args=sys.argv[1:])
-        else:
-            _run_py_module(MAIN_MODULE)
-        sys.exit(0)
+    profile_timestamp(profile, "stage2_setup_end")
+    try:
+        with _maybe_collect_coverage(enable=coverage_enabled):
+            profile_timestamp(profile, "main_start")
+            try:
+                if MAIN_PATH:
+                    # The first arg is this bootstrap, so drop that for the re-invocation.
+                    _run_py_path(main_filename, args=sys.argv[1:])
+                else:
+                    _run_py_module(MAIN_MODULE)
+            finally:
+                profile_timestamp(profile, "main_end")
+            sys.exit(0)
+    finally:
+        if profile is not None:
+            profile_timestamp(profile, "stage2_end")
+            write_profile(profile)
 
 
 main()
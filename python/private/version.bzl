@@ -508,6 +508,10 @@ def normalize_pep440(version):
     Returns:
       string containing the normalized version.
     """
+    parsed = _parse_release_only(version)
+    if parsed:
+        return parsed.string
+
     return _parse(version, strict = True)["norm"]
 
 def _parse(version_str, strict = True, _fail = fail):
@@ -555,7 +559,7 @@ def _parse(version_str, strict = True, _fail = fail):
     parser_ctx["is_prefix"] = is_prefix
     return parser_ctx
 
-def parse(version_str, strict = False, _fail = fail):
+def parse(version_str, strict = False, _fail = fail, cache = None):
     """Parse a PEP4408 compliant version.
 
     This is similar to `normalize_pep440`, but it parses individual components to
@@ -565,6 +569,9 @@ def parse(version_str, strict = False, _fail = fail):
       version_str: version string to be normalized according to PEP 440.
       strict: fail if the version is invalid.
       _fail: used for tests
+      cache: {type}`dict | None` a dict for memoizing the parsed versions
+        by the input string. Module globals are frozen, so the callers that
+        parse the same strings many times need to pass their own dict.
 
     Returns:
       a struct with individual components of a version:
@@ -581,6 +588,17 @@ def parse(version_str, strict = False, _fail = fail):
         * `is_prefix` {type}`bool` whether the version_str ends with `.*`.
         * `string` {type}`str` normalized value of the input.
     """
+    if cache != None:
+        key = (version_str, strict)
+        if key not in cache:
+            cache[key] = parse(version_str, strict = strict, _fail = _fail)
+        return cache[key]
+
+    # Most of the versions are just `X.Y.Z`, so avoid running the full parser
+    # for them.
+    parsed = _parse_release_only(version_str)
+    if parsed:
+        return parsed
 
     parts = _parse(version_str, strict = strict, _fail = _fail)
     if not parts:
@@ -593,7 +611,7 @@ def parse(version_str, strict = False, _fail = fail):
         # https://peps.python.org/pep-0440/#public-version-identifiers
         return None
 
-    return struct(
+    return _new_version(
         epoch = _parse_epoch(parts["epoch"], _fail),
         release = _parse_release(parts["release"]),
         pre = _parse_pre(parts["pre"]),
@@ -604,6 +622,54 @@ def parse(version_str, strict = False, _fail = fail):
         is_prefix = parts["is_prefix"],
     )
 
+def _parse_release_only(version_str):
+    """Parse a version that only has a release segment, e.g. `1.2.3`.
+
+    Returns None if the version has any other segments.
+    """
+    release = []
+    for part in version_str.strip().split("."):
+        if not part.isdigit():
+            return None
+        release.append(int(part))
+
+    return _new_version(
+        epoch = 0,
+        release = tuple(release),
+        pre = None,
+        post = None,
+        dev = None,
+        local = None,
+        string = ".".join([str(d) for d in release]),
+        is_prefix = False,
+    )
+
+def _new_version(*, epoch, release, pre, post, dev, local, string, is_prefix):
+    # The release without the trailing zeros can be compared directly, which
+    # is the same as comparing the releases padded to the same length.
+    trimmed = list(release)
+    for _ in release:
+        if len(trimmed) <= 1 or trimmed[-1] != 0:
+            break
+        trimmed.pop()
+
+    key = dict(epoch = epoch, release = release, pre = pre, post = post, dev = dev)
+    return struct(
+        epoch = epoch,
+        release = release,
+        pre = pre,
+        post = post,
+        dev = dev,
+        local = local,
+        string = string,
+        is_prefix = is_prefix,
+        # Precomputed so that sorting and comparing does not need to do it
+        # for every call.
+        _key = _new_key(local = local, **key),
+        _public_key = _new_key(local = None, **key),
+        _release = tuple(trimmed),
+    )
+
 def _parse_epoch(value, fail):
     if not value:
         return 0
@@ -660,14 +726,6 @@ def _parse_post(value, fail):
     # it. Use `ord` and `chr` functions to find a good value.
     return ("~", post)
 
-def _pad_zeros(release, n):
-    padding = n - len(release)
-    if padding <= 0:
-        return release
-
-    release = list(release) + [0] * padding
-    return tuple(release)
-
 def _prefix_err(left, op, right):
     if left.is_prefix or right.is_prefix:
         fail("PEP440: only '==' and '!=' operators can use prefix matching: {} {} {}".format(
@@ -697,11 +755,7 @@ def _version_eq(left, right):
     if left.epoch != right.epoch:
         return False
 
-    release_len = max(len(left.release), len(right.release))
-    left_release = _pad_zeros(left.release, release_len)
-    right_release = _pad_zeros(right.release, release_len)
-
-    if left_release != right_release:
+    if left._release != right._release:
         return False
 
     return (
@@ -742,13 +796,9 @@ def _version_lt(left, right):
     elif left.epoch < right.epoch:
         return True
 
-    release_len = max(len(left.release), len(right.release))
-    left_release = _pad_zeros(left.release, release_len)
-    right_release = _pad_zeros(right.release, release_len)
-
-    if left_release > right_release:
+    if left._release > right._release:
         return False
-    elif left_release < right_release:
+    elif left._release < right._release:
         return True
 
     # From PEP440, this is not a simple ordering check and we need to check the version
@@ -770,13 +820,9 @@ def _version_gt(left, right):
     elif left.epoch < right.epoch:
         return False
 
-    release_len = max(len(left.release), len(right.release))
-    left_release = _pad_zeros(left.release, release_len)
-    right_release = _pad_zeros(right.release, release_len)
-
-    if left_release > right_release:
+    if left._release > right._release:
         return True
-    elif left_release < right_release:
+    elif left._release < right._release:
         return False
 
     # From PEP440, this is not a simple ordering check and we need to check the version
@@ -801,9 +847,7 @@ def _version_le(left, right):
 
     # PEP440: simple order check
     # https://peps.python.org/pep-0440/#inclusive-ordered-comparison
-    _left = _version_key(left, local = False)
-    _right = _version_key(right, local = False)
-    return _left < _right or _version_eq(left, right)
+    return left._public_key < right._public_key or _version_eq(left, right)
 
 def _version_ge(left, right):
     """>= operator"""
@@ -812,34 +856,34 @@ def _version_ge(left, right):
 
     # PEP440: simple order check
     # https://peps.python.org/pep-0440/#inclusive-ordered-comparison
-    _left = _version_key(left, local = False)
-    _right = _version_key(right, local = False)
-    return _left > _right or _version_eq(left, right)
+    return left._public_key > right._public_key or _version_eq(left, right)
 
 def _version_key(self, *, local = True):
     """This function returns a tuple that can be used in 'sorted' calls.
 
     This implements the PEP440 version sorting.
     """
+    return self._key if local else self._public_key
+
+def _new_key(*, epoch, release, pre, post, dev, local):
     release_key = ("z",)
-    local = self.local if local else []
     local = local or []
 
     return (
-        self.epoch,
-        self.release,
+        epoch,
+        release,
         # PEP440 Within a pre-release, post-release or development release segment with
         # a shared prefix, ordering MUST be by the value of the numeric component.
         # PEP440 release ordering: .devN, aN, bN, rcN, <no suffix>, .postN
         # We choose to first match the pre-release, then post release, then dev and
         # then stable
-        self.pre or self.post or self.dev or release_key,
+        pre or post or dev or release_key,
         # PEP440 local versions go before post versions
         tuple([(type(item) == "int", item) for item in local]),
         # PEP440 - pre-release ordering: .devN, <no suffix>, .postN
-        self.post or self.dev or release_key,
+        post or dev or release_key,
         # PEP440 - post release ordering: .devN, <no suffix>
-        self.dev or release_key,
+        dev or release_key,
     )
 
 version = struct(
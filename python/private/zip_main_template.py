@@ -175,7 +175,91 @@ def create_module_space():
     extract_zip(os.path.dirname(__file__), temp_dir)
     # IMPORTANT: Later code does `rm -fr` on dirname(module_space) -- it's
     # important that deletion code be in sync with this directory structure
-    return os.path.join(temp_dir, "runfiles")
+    module_space = os.path.join(temp_dir, "runfiles")
+    create_python_symlink(module_space)
+    return module_space
+
+
+def create_cached_module_space(extract_root):
+    """Create the runfiles tree in a reusable directory within extract_root.
+
+    The directory is keyed by the zip file's path, size, and modification
+    time, so it is reused until the zip file changes. The zip is extracted
+    to a temporary directory that is then renamed, so concurrent invocations
+    never use a partially extracted tree.
+
+    Args:
+        extract_root: (str) The directory to create the runfiles tree in.
+
+    Returns:
+        (str) The path to the runfiles tree.
+    """
+    import hashlib
+
+    zip_path = os.path.abspath(os.path.dirname(__file__))
+    zip_stat = os.stat(zip_path)
+    key_data = "{}\0{}\0{}".format(zip_path, zip_stat.st_size, zip_stat.st_mtime_ns)
+    key = hashlib.sha256(key_data.encode("utf-8")).hexdigest()[:16]
+    cache_dir = os.path.join(
+        extract_root, "{}-{}".format(os.path.basename(zip_path), key)
+    )
+    module_space = os.path.join(cache_dir, "runfiles")
+    if os.path.isdir(module_space):
+        return module_space
+
+    os.makedirs(extract_root, exist_ok=True)
+    temp_dir = tempfile.mkdtemp("", os.path.basename(cache_dir) + ".", extract_root)
+    try:
+        extract_zip(zip_path, temp_dir)
+        create_python_symlink(os.path.join(temp_dir, "runfiles"))
+        try:
+            os.rename(temp_dir, cache_dir)
+        except OSError:
+            # Another invocation extracted the zip first.
+            if not os.path.isdir(module_space):
+                raise
+    finally:
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir, True)
+    return module_space
+
+
+def create_python_symlink(module_space):
+    """Create the venv's interpreter symlink, which the zip can't contain."""
+    python_program = find_python_binary(module_space)
+    if python_program is None:
+        raise AssertionError("Could not find python binary: " + _PYTHON_BINARY)
+
+    # The python interpreter should always be under runfiles, but double check.
+    # We don't want to accidentally create symlinks elsewhere.
+    if not python_program.startswith(module_space):
+        raise AssertionError(
+            "Program's venv binary not under runfiles: {python_program}"
+        )
+
+    if os.path.isabs(_PYTHON_BINARY_ACTUAL):
+        symlink_to = _PYTHON_BINARY_ACTUAL
+    elif "/" in _PYTHON_BINARY_ACTUAL:
+        # Relative, so that the runfiles tree can be moved.
+        symlink_to = os.path.relpath(
+            os.path.join(module_space, _PYTHON_BINARY_ACTUAL),
+            os.path.dirname(python_program),
+        )
+    else:
+        symlink_to = search_path(_PYTHON_BINARY_ACTUAL)
+        if not symlink_to:
+            raise AssertionError(
+                f"Python interpreter to use not found on PATH: {_PYTHON_BINARY_ACTUAL}"
+            )
+
+    # The bin/ directory may not exist if it is empty.
+    os.makedirs(os.path.dirname(python_program), exist_ok=True)
+    try:
+        os.symlink(symlink_to, python_program)
+    except OSError as e:
+        raise Exception(
+            f"Unable to create venv python interpreter symlink: {python_program} -> {symlink_to}"
+        ) from e
 
 
 def execute_file(
@@ -185,8 +269,9 @@ def execute_file(
     env,
     module_space,
     workspace,
+    delete_module_space,
 ):
-    # type: (str, str, list[str], dict[str, str], str, str|None, str|None) -> ...
+    # type: (str, str, list[str], dict[str, str], str, str|None, bool) -> ...
     """Executes the given Python file using the various environment settings.
 
     This will not return, and acts much like os.execv, except is much
@@ -200,7 +285,11 @@ def execute_file(
       module_space: (str) Path to the module space/runfiles tree directory
       workspace: (str|None) Name of the workspace to execute in. This is expected to be a
           directory under the runfiles tree.
+      delete_module_space: (bool) Whether the module space has to be deleted
+          after the program finishes.
     """
+    argv = [python_program, main_filename] + args
+
     # We want to use os.execv instead of subprocess.call, which causes
     # problems with signal passing (making it difficult to kill
     # Bazel). However, these conditions force us to run via
@@ -209,20 +298,28 @@ def execute_file(
     # - On Windows, os.execv doesn't handle arguments with spaces
     #   correctly, and it actually starts a subprocess just like
     #   subprocess.call.
-    # - When running in a workspace or zip file, we need to clean up the
-    #   workspace after the process finishes so control must return here.
+    # - When the zip file is extracted to a temporary directory, we need to
+    #   clean it up after the process finishes so control must return here.
+    if not is_windows() and not delete_module_space:
+        print_verbose("exec argv:", values=argv)
+        print_verbose("exec env:", mapping=env)
+        print_verbose("exec cwd:", workspace)
+        if workspace:
+            os.chdir(workspace)
+        os.execve(python_program, argv, env)
+
     try:
-        subprocess_argv = [python_program, main_filename] + args
-        print_verbose("subprocess argv:", values=subprocess_argv)
+        print_verbose("subprocess argv:", values=argv)
         print_verbose("subprocess env:", mapping=env)
         print_verbose("subprocess cwd:", workspace)
-        ret_code = subprocess.call(subprocess_argv, env=env, cwd=workspace)
+        ret_code = subprocess.call(argv, env=env, cwd=workspace)
         sys.exit(ret_code)
     finally:
-        # NOTE: dirname() is called because create_module_space() creates a
-        # sub-directory within a temporary directory, and we want to remove the
-        # whole temporary directory.
-        shutil.rmtree(os.path.dirname(module_space), True)
+        if delete_module_space:
+            # NOTE: dirname() is called because create_module_space() creates a
+            # sub-directory within a temporary directory, and we want to remove the
+            # whole temporary directory.
+            shutil.rmtree(os.path.dirname(module_space), True)
 
 
 def main():
@@ -243,7 +340,13 @@ def main():
     if is_windows():
         main_rel_path = main_rel_path.replace("/", os.sep)
 
-    module_space = create_module_space()
+    # When an extract root is given, the extracted files are reused by later
+    # invocations instead of being deleted, so the interpreter can be exec'd.
+    extract_root = os.environ.get("RULES_PYTHON_EXTRACT_ROOT")
+    if extract_root:
+        module_space = create_cached_module_space(extract_root)
+    else:
+        module_space = create_module_space()
     print_verbose("extracted runfiles to:", module_space)
 
     new_env["RUNFILES_DIR"] = module_space
@@ -262,35 +365,6 @@ def main():
     )
 
     python_program = find_python_binary(module_space)
-    if python_program is None:
-        raise AssertionError("Could not find python binary: " + _PYTHON_BINARY)
-
-    # The python interpreter should always be under runfiles, but double check.
-    # We don't want to accidentally create symlinks elsewhere.
-    if not python_program.startswith(module_space):
-        raise AssertionError(
-            "Program's venv binary not under runfiles: {python_program}"
-        )
-
-    if os.path.isabs(_PYTHON_BINARY_ACTUAL):
-        symlink_to = _PYTHON_BINARY_ACTUAL
-    elif "/" in _PYTHON_BINARY_ACTUAL:
-        symlink_to = os.path.join(module_space, _PYTHON_BINARY_ACTUAL)
-    else:
-        symlink_to = search_path(_PYTHON_BINARY_ACTUAL)
-        if not symlink_to:
-            raise AssertionError(
-                f"Python interpreter to use not found on PATH: {_PYTHON_BINARY_ACTUAL}"
-            )
-
-    # The bin/ directory may not exist if it is empty.
-    os.makedirs(os.path.dirname(python_program), exist_ok=True)
-    try:
-        os.symlink(symlink_to, python_program)
-    except OSError as e:
-        raise Exception(
-            f"Unable to create venv python interpreter symlink: {python_program} -> {symlink_to}"
-        ) from e
 
     # Some older Python versions on macOS (namely Python 3.7) may unintentionally
     # leave this environment variable set after starting the interpreter, which
@@ -316,6 +390,7 @@ def main():
         new_env,
         module_space,
         workspace,
+        delete_module_space=not extract_root,
     )
 
 
@@ -19,12 +19,14 @@ load("@rules_testing//lib:analysis_test.bzl", "analysis_test")
 load("@rules_testing//lib:truth.bzl", "matching")
 load("@rules_testing//lib:util.bzl", rt_util = "util")
 load("//python:py_executable_info.bzl", "PyExecutableInfo")
+load("//python:py_library.bzl", "py_library")
+load("//python:py_venv.bzl", "py_venv")
 load("//python/private:reexports.bzl", "BuiltinPyRuntimeInfo")  # buildifier: disable=bzl-visibility
 load("//python/private:util.bzl", "IS_BAZEL_7_OR_HIGHER")  # buildifier: disable=bzl-visibility
 load("//tests/base_rules:base_tests.bzl", "create_base_tests")
 load("//tests/base_rules:util.bzl", "WINDOWS_ATTR", pt_util = "util")
 load("//tests/support:py_executable_info_subject.bzl", "PyExecutableInfoSubject")
-load("//tests/support:support.bzl", "BOOTSTRAP_IMPL", "CC_TOOLCHAIN", "CROSSTOOL_TOP", "LINUX_X86_64", "WINDOWS_X86_64")
+load("//tests/support:support.bzl", "BOOTSTRAP_IMPL", "CC_TOOLCHAIN", "CROSSTOOL_TOP", "LINUX_X86_64", "VENVS_MODULE_INDEX", "VENVS_SITE_PACKAGES", "WINDOWS_X86_64")
 
 _tests = []
 
@@ -115,6 +117,46 @@ def _test_basic_zip_impl(env, target):
 
 _tests.append(_test_basic_zip)
 
+def _test_zip_action_inputs(name, config):
+    if rp_config.enable_pystar:
+        target_compatible_with = select({
+            "@platforms//os:windows": ["@platforms//:incompatible"],
+            "//conditions:default": [],
+        })
+    else:
+        target_compatible_with = ["@platforms//:incompatible"]
+    rt_util.helper_target(
+        config.rule,
+        name = name + "_subject",
+        srcs = ["main.py"],
+        main = "main.py",
+    )
+    analysis_test(
+        name = name,
+        impl = _test_zip_action_inputs_impl,
+        target = name + "_subject",
+        config_settings = {
+            "//command_line_option:build_python_zip": "true",
+            "//command_line_option:cpu": "linux_x86_64",
+            "//command_line_option:crosstool_top": CROSSTOOL_TOP,
+            "//command_line_option:extra_execution_platforms": [LINUX_X86_64],
+            "//command_line_option:extra_toolchains": [CC_TOOLCHAIN],
+            "//command_line_option:platforms": [LINUX_X86_64],
+        },
+        attr_values = {"target_compatible_with": target_compatible_with},
+    )
+
+def _test_zip_action_inputs_impl(env, target):
+    action = env.expect.that_target(target).action_named("PythonZipper")
+    action.inputs().contains_predicate(matching.file_basename_equals("main.py"))
+
+    # The executable is created from the zip, so it must not be an input.
+    action.inputs().not_contains_predicate(matching.file_basename_equals(
+        target.label.name,
+    ))
+
+_tests.append(_test_zip_action_inputs)
+
 def _test_executable_in_runfiles(name, config):
     rt_util.helper_target(
         config.rule,
@@ -393,6 +435,46 @@ def _test_main_module_bootstrap_script_impl(env, target):
 
 _tests.append(_test_main_module_bootstrap_script)
 
+def _test_module_index(name, config):
+    if rp_config.enable_pystar:
+        target_compatible_with = []
+    else:
+        target_compatible_with = ["@platforms//:incompatible"]
+    rt_util.helper_target(
+        config.rule,
+        name = name + "_subject",
+        srcs = [name + "_subject.py"],
+        imports = ["."],
+    )
+    analysis_test(
+        name = name,
+        impl = _test_module_index_impl,
+        target = name + "_subject",
+        config_settings = {
+            BOOTSTRAP_IMPL: "script",
+            VENVS_MODULE_INDEX: "yes",
+            "//command_line_option:extra_execution_platforms": ["@bazel_tools//tools:host_platform", LINUX_X86_64],
+            "//command_line_option:platforms": [LINUX_X86_64],
+        },
+        attr_values = {"target_compatible_with": target_compatible_with},
+    )
+
+def _test_module_index_impl(env, target):
+    env.expect.that_target(target).runfiles().contains(
+        "{workspace}/{package}/_{test_name}_subject.module_index",
+    )
+
+    # The binary's own srcs are indexed for its import paths.
+    action = env.expect.that_target(target).action_generating(
+        "{package}/_{test_name}_subject.module_index",
+    )
+    action.content().split("\n").contains_at_least([
+        env.expect.meta.format_str("{test_name}_subject={workspace}/{package}"),
+        env.expect.meta.format_str("tests={workspace}"),
+    ])
+
+_tests.append(_test_module_index)
+
 def _test_py_runtime_info_provided(name, config):
     rt_util.helper_target(
         config.rule,
@@ -416,6 +498,197 @@ def _test_py_runtime_info_provided_impl(env, target):
 
 _tests.append(_test_py_runtime_info_provided)
 
+def _test_shared_venv(name, config):
+    if rp_config.enable_pystar:
+        target_compatible_with = []
+    else:
+        target_compatible_with = ["@platforms//:incompatible"]
+    rt_util.helper_target(
+        py_venv,
+        name = name + "_venv",
+    )
+    rt_util.helper_target(
+        config.rule,
+        name = name + "_subject",
+        srcs = [name + "_subject.py"],
+        venv = name + "_venv",
+    )
+    analysis_test(
+        name = name,
+        impl = _test_shared_venv_impl,
+        target = name + "_subject",
+        config_settings = {
+            BOOTSTRAP_IMPL: "script",
+            "//command_line_option:extra_execution_platforms": ["@bazel_tools//tools:host_platform", LINUX_X86_64],
+            "//command_line_option:platforms": [LINUX_X86_64],
+        },
+        attr_values = {"target_compatible_with": target_compatible_with},
+    )
+
+def _test_shared_venv_impl(env, target):
+    runfiles = env.expect.that_target(target).runfiles()
+    runfiles.contains_at_least([
+        "{workspace}/{package}/_{test_name}_venv.venv/pyvenv.cfg",
+    ])
+    runfiles.contains_none_of([
+        "{workspace}/{package}/_{test_name}_subject.venv/pyvenv.cfg",
+    ])
+
+_tests.append(_test_shared_venv)
+
+def _test_shared_venv_missing_dep(name, config):
+    if rp_config.enable_pystar:
+        target_compatible_with = []
+    else:
+        target_compatible_with = ["@platforms//:incompatible"]
+    rt_util.helper_target(
+        py_library,
+        name = name + "_lib",
+        srcs = [name + "_lib.py"],
+        imports = ["lib"],
+    )
+    rt_util.helper_target(
+        py_venv,
+        name = name + "_venv",
+    )
+    rt_util.helper_target(
+        config.rule,
+        name = name + "_subject",
+        srcs = [name + "_subject.py"],
+        venv = name + "_venv",
+        deps = [name + "_lib"],
+    )
+    analysis_test(
+        name = name,
+        impl = _test_shared_venv_missing_dep_impl,
+        target = name + "_subject",
+        config_settings = {
+            BOOTSTRAP_IMPL: "script",
+            "//command_line_option:extra_execution_platforms": ["@bazel_tools//tools:host_platform", LINUX_X86_64],
+            "//command_line_option:platforms": [LINUX_X86_64],
+        },
+        attr_values = {"target_compatible_with": target_compatible_with},
+        expect_failure = True,
+    )
+
+def _test_shared_venv_missing_dep_impl(env, target):
+    env.expect.that_target(target).failures().contains_predicate(
+        matching.str_matches("doesn't provide all of the import paths*missing:*/lib"),
+    )
+
+_tests.append(_test_shared_venv_missing_dep)
+
+def _test_shared_venv_extra_dep(name, config):
+    if rp_config.enable_pystar:
+        target_compatible_with = []
+    else:
+        target_compatible_with = ["@platforms//:incompatible"]
+    rt_util.helper_target(
+        py_library,
+        name = name + "_lib",
+        srcs = [name + "_lib/site-packages/extra/__init__.py"],
+        imports = ["{}/{}_lib/site-packages".format(native.package_name(), name)],
+        experimental_venvs_site_packages = VENVS_SITE_PACKAGES,
+    )
+    rt_util.helper_target(
+        py_venv,
+        name = name + "_venv",
+        deps = [name + "_lib"],
+    )
+    rt_util.helper_target(
+        config.rule,
+        name = name + "_subject",
+        srcs = [name + "_subject.py"],
+        venv = name + "_venv",
+    )
+    analysis_test(
+        name = name,
+        impl = _test_shared_venv_extra_dep_impl,
+        target = name + "_subject",
+        config_settings = {
+            BOOTSTRAP_IMPL: "script",
+            VENVS_SITE_PACKAGES: "yes",
+            "//command_line_option:extra_execution_platforms": ["@bazel_tools//tools:host_platform", LINUX_X86_64],
+            "//command_line_option:platforms": [LINUX_X86_64],
+        },
+        attr_values = {"target_compatible_with": target_compatible_with},
+        expect_failure = True,
+    )
+
+def _test_shared_venv_extra_dep_impl(env, target):
+    env.expect.that_target(target).failures().contains_predicate(
+        matching.str_matches("has site-packages entries that*extra:*extra"),
+    )
+
+_tests.append(_test_shared_venv_extra_dep)
+
+def _venvs_site_packages_conflict_test(name, config, impl, deps):
+    if rp_config.enable_pystar:
+        target_compatible_with = []
+    else:
+        target_compatible_with = ["@platforms//:incompatible"]
+
+    # Both libraries install into `foo`, but only the first one has it as an
+    # explicit package, so they produce the `foo` and `foo/bar` entries.
+    for lib, src in [("foo", "foo/__init__.py"), ("foo_bar", "foo/bar/__init__.py")]:
+        rt_util.helper_target(
+            py_library,
+            name = name + "_" + lib,
+            srcs = ["{}_{}/site-packages/{}".format(name, lib, src)],
+            imports = ["{}/{}_{}/site-packages".format(native.package_name(), name, lib)],
+            experimental_venvs_site_packages = VENVS_SITE_PACKAGES,
+        )
+    rt_util.helper_target(
+        config.rule,
+        name = name + "_subject",
+        srcs = [name + "_subject.py"],
+        deps = [name + "_" + lib for lib in deps],
+    )
+    analysis_test(
+        name = name,
+        impl = impl,
+        target = name + "_subject",
+        config_settings = {
+            BOOTSTRAP_IMPL: "script",
+            VENVS_SITE_PACKAGES: "yes",
+            "//command_line_option:extra_execution_platforms": ["@bazel_tools//tools:host_platform", LINUX_X86_64],
+            "//command_line_option:platforms": [LINUX_X86_64],
+        },
+        attr_values = {"target_compatible_with": target_compatible_with},
+    )
+
+def _test_venvs_site_packages_conflict_child_first(name, config):
+    _venvs_site_packages_conflict_test(
+        name,
+        config,
+        impl = _test_venvs_site_packages_conflict_child_first_impl,
+        deps = ["foo_bar", "foo"],
+    )
+
+def _test_venvs_site_packages_conflict_child_first_impl(env, target):
+    # The earlier dependency has precedence, so the parent is dropped.
+    runfiles = env.expect.that_target(target).runfiles()
+    runfiles.contains_predicate(matching.str_endswith("/site-packages/foo/bar"))
+    runfiles.not_contains_predicate(matching.str_endswith("/site-packages/foo"))
+
+_tests.append(_test_venvs_site_packages_conflict_child_first)
+
+def _test_venvs_site_packages_conflict_parent_first(name, config):
+    _venvs_site_packages_conflict_test(
+        name,
+        config,
+        impl = _test_venvs_site_packages_conflict_parent_first_impl,
+        deps = ["foo", "foo_bar"],
+    )
+
+def _test_venvs_site_packages_conflict_parent_first_impl(env, target):
+    # The earlier dependency has precedence, so the child is dropped.
+    runfiles = env.expect.that_target(target).runfiles()
+    runfiles.contains_predicate(matching.str_endswith("/site-packages/foo"))
+    runfiles.not_contains_predicate(matching.str_endswith("/site-packages/foo/bar"))
+
+_tests.append(_test_venvs_site_packages_conflict_parent_first)
+
 # =====
 # You were gonna add a test at the end, weren't you?
 # Nope. Please keep them sorted; put it in its alphabetical location.
@@ -0,0 +1,38 @@
+import sys
+import unittest
+from importlib.machinery import PathFinder
+
+
+class ModuleIndexMainTest(unittest.TestCase):
+    def test_main_module_found_through_index(self):
+        finders = [
+            finder
+            for finder in sys.meta_path
+            if type(finder).__name__ == "_ModuleIndexFinder"
+        ]
+        self.assertEqual(1, len(finders), sys.meta_path)
+
+        # The stage2 bootstrap installs the finder in front of the path
+        # based finder before running the main module.
+        self.assertLess(
+            sys.meta_path.index(finders[0]), sys.meta_path.index(PathFinder)
+        )
+
+        # The top-level package of the main module is in the index.
+        top_level = __spec__.name.partition(".")[0]
+        spec = finders[0].find_spec(top_level)
+        self.assertIsNotNone(spec)
+        self.assertTrue(
+            any(
+                __file__.startswith(location)
+                for location in spec.submodule_search_locations
+            ),
+            f"{__file__} not in {spec.submodule_search_locations}",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
+else:
+    # Guard against running it as a module in a non-main way.
+    sys.exit(f"__name__ should be __main__, got {__name__}")
@@ -0,0 +1,52 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# --- begin runfiles.bash initialization v3 ---
+# Copy-pasted from the Bazel Bash runfiles library v3.
+set -uo pipefail; set +e; f=bazel_tools/tools/bash/runfiles/runfiles.bash
+source "${RUNFILES_DIR:-/dev/null}/$f" 2>/dev/null || \
+  source "$(grep -sm1 "^$f " "${RUNFILES_MANIFEST_FILE:-/dev/null}" | cut -f2- -d' ')" 2>/dev/null || \
+  source "$0.runfiles/$f" 2>/dev/null || \
+  source "$(grep -sm1 "^$f " "$0.runfiles_manifest" | cut -f2- -d' ')" 2>/dev/null || \
+  source "$(grep -sm1 "^$f " "$0.exe.runfiles_manifest" | cut -f2- -d' ')" 2>/dev/null || \
+  { echo>&2 "ERROR: cannot find $f"; exit 1; }; f=; set -e
+# --- end runfiles.bash initialization v3 ---
+set +e
+
+bin=$(rlocation $BIN_RLOCATION)
+if [[ -z "$bin" ]]; then
+  echo "Unable to locate test binary: $BIN_RLOCATION"
+  exit 1
+fi
+
+profile=$TEST_TMPDIR/profile.jsonl
+RULES_PYTHON_BOOTSTRAP_PROFILE=$profile $bin >/dev/null
+RULES_PYTHON_BOOTSTRAP_PROFILE=$profile $bin >/dev/null
+
+num_records=$(wc -l < "$profile")
+if [[ "$num_records" -ne 2 ]]; then
+  echo "Expected 2 profile records, but got $num_records:"
+  cat "$profile"
+  exit 1
+fi
+
+for phase in stage1_start stage1_exec site_init_start site_init_end stage2_start main_start main_end; do
+  if ! grep -q "\"$phase\"" "$profile"; then
+    echo "Profile is missing the $phase timestamp:"
+    cat "$profile"
+    exit 1
+  fi
+done
+
+exit 0
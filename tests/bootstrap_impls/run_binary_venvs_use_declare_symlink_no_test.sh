@@ -52,5 +52,44 @@ venvs_root=$(mktemp -d)
 actual=$(RULES_PYTHON_EXTRACT_ROOT=$venvs_root $bin)
 expect_match "sys.executable:.*$venvs_root" "$actual"
 
+# The venv is reused by later invocations with the same extract root.
+first_executable=$(echo "$actual" | grep "^sys.executable:")
+actual=$(RULES_PYTHON_EXTRACT_ROOT=$venvs_root $bin)
+second_executable=$(echo "$actual" | grep "^sys.executable:")
+if [[ -z "$first_executable" || "$first_executable" != "$second_executable" ]]; then
+  echo "expected the same venv for both runs"
+  echo "first : $first_executable"
+  echo "second: $second_executable"
+  touch EXPECTATION_FAILED
+fi
+
+# Only the published venv symlink and the directory it points to exist, i.e.
+# the second run didn't create another venv.
+venv_entries=$(find "$venvs_root" -name "*.venv-*" -prune | wc -l)
+if [[ "$venv_entries" -ne 2 ]]; then
+  echo "expected 2 venv entries, got $venv_entries:"
+  find "$venvs_root" -name "*.venv-*" -prune
+  touch EXPECTATION_FAILED
+fi
+
+# If the venv the published symlink points to is removed, e.g. by a temp
+# directory cleaner, the next invocation replaces the dangling symlink.
+find "$venvs_root" -name "*.venv-*" -type d -prune -exec rm -fr {} +
+actual=$(RULES_PYTHON_EXTRACT_ROOT=$venvs_root $bin)
+expect_match "sys.executable:.*$venvs_root" "$actual"
+
+# Without an extract root, the venv is shared in a per-user directory of the
+# temp directory.
+tmp_root=$(mktemp -d)
+first_executable=$(TMPDIR=$tmp_root $bin | grep "^sys.executable:")
+second_executable=$(TMPDIR=$tmp_root $bin | grep "^sys.executable:")
+expect_match "sys.executable:.*$tmp_root/rules_python_venvs_$UID/" "$first_executable"
+if [[ "$first_executable" != "$second_executable" ]]; then
+  echo "expected the same venv for both runs without an extract root"
+  echo "first : $first_executable"
+  echo "second: $second_executable"
+  touch EXPECTATION_FAILED
+fi
+
 # Exit if any of the expects failed
 [[ ! -e EXPECTATION_FAILED ]]
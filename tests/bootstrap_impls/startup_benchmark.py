@@ -0,0 +1,66 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the startup time of a py_binary.
+
+Usage:
+
+    bazel run //tests/bootstrap_impls:startup_benchmark -- [--runs=N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from python.runfiles import runfiles
+from tools.bootstrap_profile_report import percentile
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--runs", type=int, default=50, help="Number of times to run the binary."
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=3,
+        help="Number of runs that are not measured, e.g. to warm up the file cache.",
+    )
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    r = runfiles.Create()
+    bin_path = r.Rlocation(os.environ["BIN_RLOCATION"])
+    env = dict(os.environ)
+    env.update(r.EnvVars())
+
+    timings = []
+    for i in range(args.warmup + args.runs):
+        start = time.perf_counter()
+        subprocess.run([bin_path], env=env, check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        if i >= args.warmup:
+            timings.append(elapsed)
+
+    timings.sort()
+    print(f"runs: {len(timings)}")
+    print(f"p50: {percentile(timings, 50) * 1000:.1f}ms")
+    print(f"p99: {percentile(timings, 99) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
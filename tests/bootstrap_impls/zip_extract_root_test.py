@@ -0,0 +1,139 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for extracting a zip file to RULES_PYTHON_EXTRACT_ROOT."""
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+
+from python.runfiles import runfiles
+
+_RUNFILES = runfiles.Create()
+
+
+def _load_zip_main():
+    """Load the zip main template as a module, without running main()."""
+    path = _RUNFILES.Rlocation(os.environ["ZIP_MAIN_RLOCATION"])
+    spec = importlib.util.spec_from_file_location("zip_main", path)
+    module = importlib.util.module_from_spec(spec)
+
+    # The template removes the first sys.path entry when it is loaded.
+    saved_sys_path = list(sys.path)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path[:] = saved_sys_path
+    return module
+
+
+class ZipExtractRootTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.extract_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.extract_root, True)
+
+    def _run_zip(self):
+        zip_path = _RUNFILES.Rlocation(os.environ["ZIP_RLOCATION"])
+        env = dict(os.environ)
+        env["RULES_PYTHON_EXTRACT_ROOT"] = self.extract_root
+        proc = subprocess.Popen(
+            [sys.executable, zip_path],
+            env=env,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        stdout, _ = proc.communicate()
+        self.assertEqual(0, proc.returncode, stdout)
+        lines = dict(line.split(": ", 1) for line in stdout.splitlines())
+        return proc.pid, int(lines["pid"]), lines["file"]
+
+    def test_exec_and_reuse(self):
+        launcher_pid, program_pid, first_file = self._run_zip()
+
+        # The zip main replaces itself with the program's interpreter.
+        self.assertEqual(launcher_pid, program_pid)
+        self.assertTrue(first_file.startswith(self.extract_root), first_file)
+        (cache_dir,) = os.listdir(self.extract_root)
+        cache_dir_stat = os.stat(os.path.join(self.extract_root, cache_dir))
+
+        _, _, second_file = self._run_zip()
+
+        # The second run reuses the extracted files.
+        self.assertEqual(first_file, second_file)
+        self.assertEqual([cache_dir], os.listdir(self.extract_root))
+        self.assertEqual(
+            cache_dir_stat.st_ino,
+            os.stat(os.path.join(self.extract_root, cache_dir)).st_ino,
+        )
+
+
+class CreateCachedModuleSpaceTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.extract_root = os.path.join(self.tmp, "extract_root")
+
+        self.zip_main = _load_zip_main()
+        zip_path = os.path.join(self.tmp, "bin.zip")
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("runfiles/marker", "extracted")
+        self.zip_main.__file__ = os.path.join(zip_path, "__main__.py")
+        self.zip_main.create_python_symlink = lambda module_space: None
+
+    def test_reuses_extracted_files(self):
+        module_space = self.zip_main.create_cached_module_space(self.extract_root)
+        self.assertTrue(os.path.isfile(os.path.join(module_space, "marker")))
+
+        def fail_extract(zip_path, dest_dir):
+            self.fail("the zip was extracted again")
+
+        self.zip_main.extract_zip = fail_extract
+        self.assertEqual(
+            module_space,
+            self.zip_main.create_cached_module_space(self.extract_root),
+        )
+
+    def test_concurrent_extraction_loser(self):
+        extract_zip = self.zip_main.extract_zip
+        temp_dirs = []
+
+        def extract_and_lose_race(zip_path, dest_dir):
+            extract_zip(zip_path, dest_dir)
+            temp_dirs.append(dest_dir)
+
+            # Another invocation renames its extracted files into place first.
+            cache_dir = dest_dir.rpartition(".")[0]
+            os.makedirs(os.path.join(cache_dir, "runfiles"))
+            with open(os.path.join(cache_dir, "runfiles", "winner"), "w"):
+                pass
+
+        self.zip_main.extract_zip = extract_and_lose_race
+        module_space = self.zip_main.create_cached_module_space(self.extract_root)
+
+        # The winner's files are used and the loser's are removed.
+        self.assertTrue(os.path.isfile(os.path.join(module_space, "winner")))
+        self.assertFalse(os.path.exists(os.path.join(module_space, "marker")))
+        self.assertEqual(1, len(temp_dirs))
+        self.assertFalse(os.path.exists(temp_dirs[0]))
+        self.assertEqual(1, len(os.listdir(self.extract_root)))
+
+
+if __name__ == "__main__":
+    unittest.main()
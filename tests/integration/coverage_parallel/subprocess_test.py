@@ -0,0 +1,34 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import unittest
+
+import lib
+
+from python.runfiles import runfiles
+
+
+class SubprocessTest(unittest.TestCase):
+    def test_run_child(self):
+        self.assertEqual(lib.called_by_test(), "test")
+
+        child = runfiles.Create().Rlocation(os.environ["CHILD_RLOCATION"])
+        output = subprocess.check_output([child], text=True)
+        self.assertEqual(output.strip(), "child")
+
+
+if __name__ == "__main__":
+    unittest.main()
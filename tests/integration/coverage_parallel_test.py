@@ -0,0 +1,61 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import re
+import unittest
+
+from tests.integration import runner
+
+
+class CoverageParallelTest(runner.TestCase):
+    def test_subprocess_coverage_is_combined(self):
+        hits = self._coverage_lib_hits("subprocess_test")
+
+        # The test process only calls one function and the child process
+        # only the other, so both are covered only if the data was combined.
+        self.assertGreater(hits[self._lib_line('    return "test"')], 0)
+        self.assertGreater(hits[self._lib_line('    return "child"')], 0)
+
+    def test_sibling_processes_coverage_is_combined(self):
+        hits = self._coverage_lib_hits("sibling_processes_test")
+
+        # Both processes act as the combiner because the test isn't a Python
+        # process, so the second one must not overwrite the first one's data.
+        self.assertGreater(hits[self._lib_line('    return "child"')], 0)
+        self.assertGreater(hits[self._lib_line('    return "sibling"')], 0)
+
+    def _lib_line(self, text):
+        lib_lines = (self.repo_root / "lib.py").read_text().splitlines()
+        return lib_lines.index(text) + 1
+
+    def _coverage_lib_hits(self, test_name):
+        self.run_bazel("coverage", f"//:{test_name}")
+        lcov = (
+            self.repo_root / "bazel-testlogs" / test_name / "coverage.dat"
+        ).read_text()
+        lib_record = re.search(
+            r"^SF:(?:.*/)?lib\.py$(.*?)^end_of_record$", lcov, re.MULTILINE | re.DOTALL
+        )
+        self.assertIsNotNone(lib_record, lcov)
+        hits = collections.defaultdict(int)
+        for line, count in re.findall(
+            r"^DA:(\d+),(\d+)", lib_record.group(1), re.MULTILINE
+        ):
+            hits[int(line)] = int(count)
+        return hits
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1 @@
+whoami = "first"
@@ -0,0 +1,54 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import unittest
+
+
+class ModuleIndexTest(unittest.TestCase):
+    def test_finder_installed(self):
+        self.assertIn(
+            "_ModuleIndexFinder",
+            [type(finder).__name__ for finder in sys.meta_path],
+        )
+
+    def test_earlier_import_path_has_precedence(self):
+        import dup
+
+        # Both import paths provide `dup`, the index must not change which
+        # one is used.
+        import_paths = [
+            p
+            for p in sys.path
+            if os.path.basename(p) in ("first", "second")
+            and os.path.dirname(p).endswith("module_index")
+        ]
+        self.assertEqual(2, len(import_paths), sys.path)
+        self.assertEqual(os.path.basename(import_paths[0]), dup.whoami)
+
+    def test_namespace_package_split_across_import_paths(self):
+        import nspkg.one
+        import nspkg.two
+
+        self.assertEqual("one", nspkg.one.whoami)
+        self.assertEqual("two", nspkg.two.whoami)
+        self.assertEqual(
+            ["first", "second"],
+            sorted(os.path.basename(os.path.dirname(p)) for p in nspkg.__path__),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for computing the top-level module index."""
+
+load("@rules_testing//lib:test_suite.bzl", "test_suite")
+load("//python/private:module_index.bzl", "module_index_mapper", "top_level_module_name")  # buildifier: disable=bzl-visibility
+
+_tests = []
+
+def _test_top_level_module_name_module(env):
+    env.expect.that_str(top_level_module_name(["foo.py"])).equals("foo")
+    env.expect.that_str(top_level_module_name(["foo.pyi"])).equals("foo")
+    env.expect.that_str(top_level_module_name(["foo.cpython-311-x86_64-linux-gnu.so"])).equals("foo")
+
+_tests.append(_test_top_level_module_name_module)
+
+def _test_top_level_module_name_package(env):
+    env.expect.that_str(top_level_module_name(["foo", "__init__.py"])).equals("foo")
+    env.expect.that_str(top_level_module_name(["foo", "bar", "baz.py"])).equals("foo")
+    env.expect.that_str(top_level_module_name(["foo", "__pycache__", "bar.cpython-311.pyc"])).equals("foo")
+
+_tests.append(_test_top_level_module_name_package)
+
+def _test_top_level_module_name_pycache(env):
+    env.expect.that_str(top_level_module_name(["__pycache__", "foo.cpython-311.pyc"])).equals("foo")
+    env.expect.that_str(top_level_module_name(["__pycache__", "foo.cpython-311.opt-1.pyc"])).equals("foo")
+    env.expect.that_str(top_level_module_name(["__pycache__", "__init__.cpython-311.pyc"])).equals(None)
+    env.expect.that_str(top_level_module_name(["__pycache__", "foo", "bar.pyc"])).equals(None)
+
+_tests.append(_test_top_level_module_name_pycache)
+
+def _test_top_level_module_name_not_importable(env):
+    for parts in [
+        ["__init__.py"],
+        ["1foo.py"],
+        ["foo-bar.py"],
+        ["foo-1.0.dist-info", "METADATA"],
+        ["foo.data", "scripts", "bar.py"],
+        [".hidden.py"],
+    ]:
+        env.expect.where(parts = parts).that_str(top_level_module_name(parts)).equals(None)
+
+_tests.append(_test_top_level_module_name_not_importable)
+
+def _test_module_index_mapper(env):
+    mapper = module_index_mapper("_main", depset([
+        "_main/a",
+        "_main/a/b",
+        "+pypi_foo/site-packages",
+    ]))
+
+    env.expect.that_collection(mapper(struct(short_path = "a/b/c.py"))).contains_exactly([
+        "b=_main/a",
+        "c=_main/a/b",
+        "a=_main",
+    ])
+    env.expect.that_collection(mapper(struct(short_path = "a/__pycache__/x.cpython-311.pyc"))).contains_exactly([
+        "x=_main/a",
+        "a=_main",
+    ])
+    env.expect.that_collection(mapper(struct(short_path = "../+pypi_foo/site-packages/foo/__init__.py"))).contains_exactly([
+        "foo=+pypi_foo/site-packages",
+    ])
+
+    # Files outside of the import paths don't provide any modules.
+    env.expect.that_collection(mapper(struct(short_path = "../+pypi_foo/bin/foo.py"))).contains_exactly([])
+
+_tests.append(_test_module_index_mapper)
+
+def module_index_test_suite(name):
+    """Create the test suite.
+
+    Args:
+        name: the name of the test suite
+    """
+    test_suite(name = name, basic_tests = _tests)
@@ -60,12 +60,12 @@ def _mod(*, name, parse = [], override = [], whl_mods = [], is_root = True):
         is_root = is_root,
     )
 
-def _parse_modules(env, **kwargs):
+def _parse_modules(env, enable_pipstar = 0, **kwargs):
     return env.expect.that_struct(
         parse_modules(
             # TODO @aignas 2025-05-11: start integration testing the branch which
             # includes this.
-            enable_pipstar = 0,
+            enable_pipstar = enable_pipstar,
             **kwargs
         ),
         attrs = dict(
@@ -90,6 +90,7 @@ def _parse(
         experimental_index_url = "",
         experimental_requirement_cycles = {},
         experimental_target_platforms = [],
+        experimental_whl_metadata_only = False,
         extra_hub_aliases = {},
         extra_pip_args = [],
         isolated = True,
@@ -118,6 +119,7 @@ def _parse(
         experimental_index_url = experimental_index_url,
         experimental_requirement_cycles = experimental_requirement_cycles,
         experimental_target_platforms = experimental_target_platforms,
+        experimental_whl_metadata_only = experimental_whl_metadata_only,
         extra_hub_aliases = extra_hub_aliases,
         extra_pip_args = extra_pip_args,
         hub_name = hub_name,
@@ -141,7 +143,6 @@ def _parse(
         parallel_download = False,
         experimental_index_url_overrides = {},
         simpleapi_skip = simpleapi_skip,
-        _evaluate_markers_srcs = [],
         **kwargs
     )
 
@@ -929,7 +930,11 @@ git_dep @ git+https://git.server/repo/project@deadbeefdeadbeef
                 index_url = "pypi.org",
                 index_url_overrides = {},
                 netrc = None,
-                sources = ["simple", "pip_fallback", "some_other_pkg"],
+                sources = {
+                    "pip_fallback": struct(sha256s = {}, versions = {"0.0.1": None}),
+                    "simple": struct(sha256s = {"deadb00f": None, "deadbeef": None}, versions = {}),
+                    "some_other_pkg": struct(sha256s = {}, versions = {"0.0.1": None}),
+                },
             ),
             "cache": {},
             "parallel_download": False,
@@ -938,6 +943,124 @@ git_dep @ git+https://git.server/repo/project@deadbeefdeadbeef
 
 _tests.append(_test_simple_get_index)
 
+def _test_whl_metadata_only(env):
+    def mocksimpleapi_download(*_, **__):
+        return {
+            "simple": struct(
+                whls = {
+                    "deadb00f": struct(
+                        yanked = False,
+                        filename = "simple-0.0.1-py3-none-any.whl",
+                        sha256 = "deadb00f",
+                        url = "example.org/simple-0.0.1-py3-none-any.whl",
+                        metadata_sha256 = "deadb11f",
+                        metadata_url = "example.org/simple-0.0.1-py3-none-any.whl.metadata",
+                    ),
+                },
+                sdists = {},
+            ),
+            "other": struct(
+                whls = {
+                    "deadbaaf": struct(
+                        yanked = False,
+                        filename = "other-0.0.1-py3-none-any.whl",
+                        sha256 = "deadbaaf",
+                        url = "example.org/other-0.0.1-py3-none-any.whl",
+                        metadata_sha256 = "",
+                        metadata_url = "",
+                    ),
+                },
+                sdists = {},
+            ),
+        }
+
+    pypi = _parse_modules(
+        env,
+        module_ctx = _mock_mctx(
+            _mod(
+                name = "rules_python",
+                parse = [
+                    _parse(
+                        hub_name = "pypi",
+                        python_version = "3.15",
+                        requirements_lock = "requirements.txt",
+                        experimental_index_url = "pypi.org",
+                        experimental_requirement_cycles = {
+                            "group": ["simple", "other"],
+                        },
+                        experimental_whl_metadata_only = True,
+                    ),
+                ],
+            ),
+            read = lambda x: {
+                "requirements.txt": """
+simple==0.0.1 --hash=sha256:deadb00f
+other==0.0.1 --hash=sha256:deadbaaf
+""",
+            }[x],
+        ),
+        available_interpreters = {
+            "python_3_15_host": "unit_test_interpreter_target",
+        },
+        minor_mapping = {"3.15": "3.15.19"},
+        simpleapi_download = mocksimpleapi_download,
+        enable_pipstar = 1,
+    )
+
+    pypi.hub_whl_map().contains_exactly({
+        "pypi": {
+            "other": {
+                "pypi_315_other_py3_none_any_deadbaaf": [
+                    whl_config_setting(
+                        version = "3.15",
+                        filename = "other-0.0.1-py3-none-any.whl",
+                    ),
+                ],
+            },
+            "simple": {
+                "pypi_315_simple_py3_none_any_deadb00f": [
+                    whl_config_setting(
+                        version = "3.15",
+                        filename = "simple-0.0.1-py3-none-any.whl",
+                    ),
+                ],
+            },
+        },
+    })
+    pypi.whl_libraries().contains_exactly({
+        "pypi_315_other_py3_none_any_deadbaaf": {
+            "dep_template": "@pypi//{name}:{target}",
+            "filename": "other-0.0.1-py3-none-any.whl",
+            "group_deps": ["simple", "other"],
+            "group_name": "group",
+            "python_interpreter_target": "unit_test_interpreter_target",
+            "requirement": "other==0.0.1",
+            "sha256": "deadbaaf",
+            "urls": ["example.org/other-0.0.1-py3-none-any.whl"],
+        },
+        "pypi_315_simple_py3_none_any_deadb00f": {
+            "dep_template": "@pypi//{name}:{target}",
+            "filename": "simple-0.0.1-py3-none-any.whl",
+            "files_repo": "pypi_315_simple_py3_none_any_deadb00f_files",
+            "group_deps": ["simple", "other"],
+            "group_name": "group",
+            "metadata_sha256": "deadb11f",
+            "metadata_url": "example.org/simple-0.0.1-py3-none-any.whl.metadata",
+            "requirement": "simple==0.0.1",
+        },
+        "pypi_315_simple_py3_none_any_deadb00f_files": {
+            "dep_template": "@pypi//{name}:{target}",
+            "filename": "simple-0.0.1-py3-none-any.whl",
+            "files_only": True,
+            "python_interpreter_target": "unit_test_interpreter_target",
+            "requirement": "simple==0.0.1",
+            "sha256": "deadb00f",
+            "urls": ["example.org/simple-0.0.1-py3-none-any.whl"],
+        },
+    })
+
+_tests.append(_test_whl_metadata_only)
+
 def _test_optimum_sys_platform_extra(env):
     pypi = _parse_modules(
         env,
@@ -448,6 +448,43 @@ def _test_git_sources(env):
 
 _tests.append(_test_git_sources)
 
+def _test_cache_large_lockfile(env):
+    # A benchmark-sized lock file that is used for 8 platforms by 4 Python
+    # versions should be parsed only once.
+    contents = "\n".join([
+        "pkg-{i}==0.0.{i} --hash=sha256:deadbeef{i}".format(i = i)
+        for i in range(2000)
+    ])
+    ctx = struct(read = lambda _: contents)
+    platforms = [
+        "{}_{}".format(os, arch)
+        for os in ["linux", "osx", "windows", "freebsd"]
+        for arch in ["aarch64", "x86_64"]
+    ]
+
+    cache = {}
+    for minor in [10, 11, 12, 13]:
+        got = parse_requirements(
+            ctx = ctx,
+            requirements_by_platform = {
+                "requirements_lock": ["cp3{}_{}".format(minor, p) for p in platforms],
+            },
+            cache = cache,
+        )
+
+    want = parse_requirements(
+        ctx = ctx,
+        requirements_by_platform = {
+            "requirements_lock": ["cp313_{}".format(p) for p in platforms],
+        },
+    )
+    env.expect.that_int(len(got)).equals(2000)
+    env.expect.that_bool(got == want).equals(True)
+    env.expect.that_int(len(cache["files"])).equals(1)
+    env.expect.that_int(len(cache["index_sources"])).equals(2000)
+
+_tests.append(_test_cache_large_lockfile)
+
 def parse_requirements_test_suite(name):
     """Create the test suite.
 
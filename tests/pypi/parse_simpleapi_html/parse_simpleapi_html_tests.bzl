@@ -16,7 +16,7 @@
 
 load("@rules_testing//lib:test_suite.bzl", "test_suite")
 load("@rules_testing//lib:truth.bzl", "subjects")
-load("//python/private/pypi:parse_simpleapi_html.bzl", "parse_simpleapi_html")  # buildifier: disable=bzl-visibility
+load("//python/private/pypi:parse_simpleapi_html.bzl", "parse_simpleapi_html", "parse_simpleapi_json")  # buildifier: disable=bzl-visibility
 
 _tests = []
 
@@ -355,6 +355,158 @@ def _test_whls(env):
 
 _tests.append(_test_whls)
 
+def _test_json(env):
+    content = json.encode({
+        "files": [
+            {
+                "filename": "foo-0.0.1.tar.gz",
+                "hashes": {"sha256": "deadbeefasource"},
+                "requires-python": ">=3.7",
+                "url": "https://example.org/full-url/foo-0.0.1.tar.gz",
+                "yanked": False,
+            },
+            {
+                "core-metadata": {"sha256": "deadb00f"},
+                "data-dist-info-metadata": {"sha256": "deadb00f"},
+                "filename": "foo-0.0.2-py3-none-any.whl",
+                "hashes": {"sha256": "deadbeef"},
+                "url": "../../packages/foo-0.0.2-py3-none-any.whl",
+                "yanked": "broken",
+            },
+            {
+                "core-metadata": False,
+                "filename": "foo-0.0.3-py3-none-any.whl",
+                "hashes": {"sha256": "deadbaaf"},
+                "url": "/packages/foo-0.0.3-py3-none-any.whl#sha256=deadbaaf",
+            },
+        ],
+        "meta": {"api-version": "1.1"},
+        "name": "foo",
+    })
+
+    got = parse_simpleapi_json(url = "https://example.org/simple/foo/", content = content)
+    env.expect.that_dict(got.sha256s_by_version).contains_exactly({
+        "0.0.1": ["deadbeefasource"],
+        "0.0.2": ["deadbeef"],
+        "0.0.3": ["deadbaaf"],
+    })
+    env.expect.that_collection(got.sdists).has_size(1)
+    env.expect.that_collection(got.whls).has_size(2)
+
+    # buildifier: disable=unsorted-dict-items
+    wants = [
+        (got.sdists, struct(
+            filename = "foo-0.0.1.tar.gz",
+            metadata_sha256 = "",
+            metadata_url = "",
+            sha256 = "deadbeefasource",
+            url = "https://example.org/full-url/foo-0.0.1.tar.gz",
+            version = "0.0.1",
+            yanked = False,
+        )),
+        (got.whls, struct(
+            filename = "foo-0.0.2-py3-none-any.whl",
+            metadata_sha256 = "deadb00f",
+            metadata_url = "https://example.org/packages/foo-0.0.2-py3-none-any.whl.metadata",
+            sha256 = "deadbeef",
+            url = "https://example.org/packages/foo-0.0.2-py3-none-any.whl",
+            version = "0.0.2",
+            yanked = True,
+        )),
+        (got.whls, struct(
+            filename = "foo-0.0.3-py3-none-any.whl",
+            metadata_sha256 = "",
+            metadata_url = "",
+            sha256 = "deadbaaf",
+            url = "https://example.org/packages/foo-0.0.3-py3-none-any.whl",
+            version = "0.0.3",
+            yanked = False,
+        )),
+    ]
+    for dists, want in wants:
+        actual = env.expect.that_struct(
+            dists[want.sha256],
+            attrs = dict(
+                filename = subjects.str,
+                metadata_sha256 = subjects.str,
+                metadata_url = subjects.str,
+                sha256 = subjects.str,
+                url = subjects.str,
+                yanked = subjects.bool,
+                version = subjects.str,
+            ),
+        )
+        actual.filename().equals(want.filename)
+        actual.metadata_sha256().equals(want.metadata_sha256)
+        actual.metadata_url().equals(want.metadata_url)
+        actual.sha256().equals(want.sha256)
+        actual.url().equals(want.url)
+        actual.yanked().equals(want.yanked)
+        actual.version().equals(want.version)
+
+_tests.append(_test_json)
+
+def _test_want(env):
+    html = _generate_html(
+        struct(
+            attrs = ['href="https://example.org/foo-0.0.1.tar.gz#sha256=deadbeef"'],
+            filename = "foo-0.0.1.tar.gz",
+        ),
+        struct(
+            attrs = ['href="https://example.org/foo-0.0.1-py3-none-any.whl#sha256=deadb00f"'],
+            filename = "foo-0.0.1-py3-none-any.whl",
+        ),
+        struct(
+            attrs = ['href="https://example.org/foo-0.0.2-py3-none-any.whl#sha256=deadbaaf"'],
+            filename = "foo-0.0.2-py3-none-any.whl",
+        ),
+        struct(
+            attrs = ['href="https://example.org/foo-0.0.3-py3-none-any.whl#sha256=deadf00d"'],
+            filename = "foo-0.0.3-py3-none-any.whl",
+        ),
+    )
+    content = json.encode({
+        "files": [
+            {
+                "filename": "foo-0.0.1.tar.gz",
+                "hashes": {"sha256": "deadbeef"},
+                "url": "https://example.org/foo-0.0.1.tar.gz",
+            },
+            {
+                "filename": "foo-0.0.1-py3-none-any.whl",
+                "hashes": {"sha256": "deadb00f"},
+                "url": "https://example.org/foo-0.0.1-py3-none-any.whl",
+            },
+            {
+                "filename": "foo-0.0.2-py3-none-any.whl",
+                "hashes": {"sha256": "deadbaaf"},
+                "url": "https://example.org/foo-0.0.2-py3-none-any.whl",
+            },
+            {
+                "filename": "foo-0.0.3-py3-none-any.whl",
+                "hashes": {"sha256": "deadf00d"},
+                "url": "https://example.org/foo-0.0.3-py3-none-any.whl",
+            },
+        ],
+        "meta": {"api-version": "1.1"},
+    })
+    want = struct(
+        sha256s = {"deadbeef": None},
+        versions = {"0.0.2": None},
+    )
+
+    for got in [
+        parse_simpleapi_html(url = "https://example.org/simple/foo/", content = html, want = want),
+        parse_simpleapi_json(url = "https://example.org/simple/foo/", content = content, want = want),
+    ]:
+        env.expect.that_collection(got.sdists.keys()).contains_exactly(["deadbeef"])
+        env.expect.that_collection(got.whls.keys()).contains_exactly(["deadbaaf"])
+        env.expect.that_dict(got.sha256s_by_version).contains_exactly({
+            "0.0.2": ["deadbaaf"],
+        })
+
+_tests.append(_test_want)
+
 def parse_simpleapi_html_test_suite(name):
     """Create the test suite.
 
@@ -14,8 +14,9 @@
 """Tests for construction of Python version matching config settings."""
 
 load("@rules_testing//lib:test_suite.bzl", "test_suite")
+load("//python/private/pypi:evaluate_markers.bzl", "evaluate_markers")  # buildifier: disable=bzl-visibility
 load("//python/private/pypi:pep508_env.bzl", pep508_env = "env")  # buildifier: disable=bzl-visibility
-load("//python/private/pypi:pep508_evaluate.bzl", "evaluate", "tokenize")  # buildifier: disable=bzl-visibility
+load("//python/private/pypi:pep508_evaluate.bzl", "compile", "eval", "evaluate", "tokenize")  # buildifier: disable=bzl-visibility
 
 _tests = []
 
@@ -52,6 +53,8 @@ def _tokenize_tests(env):
         "python_version <= \"1.0\"": ["python_version", "<=", '"1.0"'],
         "python_version>='1.0.0'": ["python_version", ">=", '"1.0.0"'],
         "python_version~='1.0.0'": ["python_version", "~=", '"1.0.0"'],
+        "('3.8' > python_version)": ["(", '"3.8"', ">", "python_version", ")"],
+        "os_name == 'a(b)'": ["os_name", "==", '"a(b)"'],
     }.items():
         got = tokenize(input)
         env.expect.that_collection(got).contains_exactly(want).in_order()
@@ -309,6 +312,13 @@ _MISC_EXPRESSIONS = [
     _expr_case('python_version ~= "1!2.2"', True, {"python_version": "1!2.7"}),
     _expr_case('python_version ~= "1.2.3"', True, {"python_version": "1.2.4"}),
     _expr_case('python_version ~= "1.2.3"', False, {"python_version": "1.3.2"}),
+    # The 'in' and 'not in' operators use string comparison like 'packaging'
+    _expr_case('python_version in "3.9 3.10"', True, {"python_version": "3.10"}),
+    _expr_case('python_version in "3.9 3.10"', False, {"python_version": "3.11"}),
+    _expr_case('python_version not in "3.9 3.10"', True, {"python_version": "3.11"}),
+    # The extras are normalized
+    _expr_case('extra == "Foo_Bar"', True, {"extra": "foo-bar"}),
+    _expr_case('extra == "foo.bar"', True, {"extra": "foo_bar"}),
 ]
 
 def _misc_expressions(env):
@@ -317,6 +327,93 @@ def _misc_expressions(env):
 
 _tests.append(_misc_expressions)
 
+def _evaluate_markers(env):
+    platforms = [
+        "cp{}_{}".format(abi, platform)
+        for abi in ["39", "311", "313"]
+        for platform in ["linux_aarch64", "linux_x86_64", "osx_aarch64", "windows_x86_64"]
+    ]
+    got = evaluate_markers({
+        'bar==0.0.1 ; python_version < "3.11" and sys_platform == "linux" --hash=sha256:deadb00f': platforms,
+        'baz==0.0.1 ; python_version < "3.11" and sys_platform == "linux"': platforms,
+        'foo==0.0.1 ; platform_machine == "arm64"': platforms,
+    })
+    env.expect.that_dict(got).contains_exactly({
+        'bar==0.0.1 ; python_version < "3.11" and sys_platform == "linux" --hash=sha256:deadb00f': [
+            "cp39_linux_aarch64",
+            "cp39_linux_x86_64",
+        ],
+        'baz==0.0.1 ; python_version < "3.11" and sys_platform == "linux"': [
+            "cp39_linux_aarch64",
+            "cp39_linux_x86_64",
+        ],
+        'foo==0.0.1 ; platform_machine == "arm64"': [
+            "cp39_linux_aarch64",
+            "cp39_osx_aarch64",
+            "cp311_linux_aarch64",
+            "cp311_osx_aarch64",
+            "cp313_linux_aarch64",
+            "cp313_osx_aarch64",
+        ],
+    })
+
+_tests.append(_evaluate_markers)
+
+def _compile_tests(env):
+    got = compile("not os_name == 'osx' and (python_version < '3.11' or extra == 'foo')")
+    env.expect.that_collection(got.vars).contains_exactly([
+        "extra",
+        "os_name",
+        "python_version",
+    ]).in_order()
+    env.expect.that_collection(got.ops).contains_exactly([
+        ("expr", "os_name", "==", '"osx"'),
+        ("not",),
+        ("expr", "python_version", "<", '"3.11"'),
+        ("expr", "extra", "==", '"foo"'),
+        ("or",),
+        ("()",),
+        ("and",),
+    ]).in_order()
+
+    for marker_env, want in [
+        ({"extra": "", "os_name": "posix", "python_version": "3.10"}, True),
+        ({"extra": "foo", "os_name": "posix", "python_version": "3.12"}, True),
+        ({"extra": "", "os_name": "posix", "python_version": "3.12"}, False),
+        ({"extra": "foo", "os_name": "osx", "python_version": "3.10"}, False),
+    ]:
+        env.expect.that_bool(eval(got, env = marker_env)).equals(want)
+
+    env.expect.that_collection(compile("").ops).contains_exactly([])
+    env.expect.that_bool(eval(compile(""), env = {})).equals(True)
+
+_tests.append(_compile_tests)
+
+def _evaluate_cache_tests(env):
+    cache = {}
+    for python_version, want in [("3.10", True), ("3.12", False), ("3.10", True)]:
+        got = evaluate(
+            "python_version < '3.11'",
+            env = {"os_name": "posix", "python_version": python_version},
+            cache = cache,
+        )
+        env.expect.that_bool(got).equals(want)
+
+    # The compiled marker, one result per distinct python_version value and
+    # the parsed versions.
+    env.expect.that_int(len(cache)).equals(4)
+    env.expect.that_dict(cache["_versions"]).keys().contains_exactly([
+        ("3.10", False),
+        ("3.11", False),
+        ("3.12", False),
+    ])
+
+    # The partially evaluated markers are cached separately.
+    got = evaluate("os_name == 'osx' and extra == 'foo'", env = {"extra": "foo"}, strict = False, cache = cache)
+    env.expect.that_str(got).equals('os_name == "osx"')
+
+_tests.append(_evaluate_cache_tests)
+
 def evaluate_test_suite(name):  # buildifier: disable=function-docstring
     test_suite(
         name = name,
@@ -229,6 +229,224 @@ def _test_download_envsubst_url(env):
 
 _tests.append(_test_download_envsubst_url)
 
+def _test_download_json(env):
+    html = """\
+<html><body>
+<a href="https://example.com/bar-0.0.1.tar.gz#sha256=deadbeef">bar-0.0.1.tar.gz</a><br />
+</body></html>
+"""
+    contents = {
+        "path/for/https___example_com_main_simple_bar.html": html,
+        "path/for/https___example_com_main_simple_foo.html": json.encode({
+            "files": [{
+                "filename": "foo-0.0.1.tar.gz",
+                "hashes": {"sha256": "deadbaaf"},
+                "url": "https://example.com/foo-0.0.1.tar.gz",
+            }],
+            "meta": {"api-version": "1.0"},
+            "name": "foo",
+        }),
+    }
+
+    got = simpleapi_download(
+        ctx = struct(
+            os = struct(environ = {}),
+            download = lambda url, output, **kwargs: struct(success = True),
+            read = lambda i: contents[i],
+            path = lambda i: "path/for/" + i,
+        ),
+        attr = struct(
+            index_url_overrides = {},
+            index_url = "https://example.com/main/simple/",
+            extra_index_urls = [],
+            sources = ["foo", "bar"],
+            envsubst = [],
+        ),
+        cache = {},
+        parallel_download = False,
+        get_auth = lambda ctx, urls, ctx_attr: struct(),
+    )
+
+    env.expect.that_collection(got["foo"].sdists.keys()).contains_exactly(["deadbaaf"])
+    env.expect.that_str(got["foo"].sdists["deadbaaf"].url).equals("https://example.com/foo-0.0.1.tar.gz")
+    env.expect.that_collection(got["bar"].sdists.keys()).contains_exactly(["deadbeef"])
+    env.expect.that_str(got["bar"].sdists["deadbeef"].url).equals("https://example.com/bar-0.0.1.tar.gz")
+
+_tests.append(_test_download_json)
+
+def _test_persisted_cache(env):
+    html = """\
+<a href="https://example.com/foo-0.0.1.tar.gz#sha256=deadbeef">foo-0.0.1.tar.gz</a><br />
+<a href="https://example.com/foo-0.0.2.tar.gz#sha256=deadb00f">foo-0.0.2.tar.gz</a><br />
+"""
+    persisted_foo = "/cache/https___example_com_main_simple_foo_{}.simpleapi".format(
+        hash("https://example.com/main/simple/foo/") & 0xffffffff,
+    )
+    persisted_bar = "/cache/https___example_com_main_simple_bar_{}.simpleapi".format(
+        hash("https://example.com/main/simple/bar/") & 0xffffffff,
+    )
+    persisted_baz = "/cache/https___example_com_main_simple_baz_{}.simpleapi".format(
+        hash("https://example.com/main/simple/baz/") & 0xffffffff,
+    )
+    files = {
+        persisted_bar: html.replace("foo", "bar"),
+        persisted_foo: html.split("\n")[0],
+        "https___example_com_main_simple_baz.html": html.replace("foo", "baz"),
+        "https___example_com_main_simple_foo.html": html,
+    }
+    paths = {}
+    downloads = []
+    executes = []
+
+    def download(url, output, **kwargs):
+        _ = kwargs  # buildifier: disable=unused-variable
+        downloads.append(url[0])
+        return struct(success = True)
+
+    def execute(arguments, **kwargs):
+        _ = kwargs  # buildifier: disable=unused-variable
+        executes.append([paths.get(a, a) for a in arguments])
+        return struct(return_code = 0, stdout = "", stderr = "")
+
+    def path(p):
+        ret = struct(path = p, exists = p in files, dirname = "/cache")
+        paths[str(ret)] = p
+        return ret
+
+    got = simpleapi_download(
+        ctx = struct(
+            os = struct(environ = {"RULES_PYTHON_PYPI_SIMPLEAPI_CACHE": "/cache/"}, name = "linux"),
+            download = download,
+            execute = execute,
+            report_progress = lambda _: None,
+            read = lambda p: files[p.path],
+            file = lambda p, content, **kwargs: files.update({p: content}),
+            path = path,
+        ),
+        attr = struct(
+            index_url_overrides = {},
+            index_url = "https://example.com/main/simple/",
+            extra_index_urls = [],
+            sources = {
+                "bar": struct(sha256s = {"deadbeef": None}, versions = {}),
+                "baz": struct(sha256s = {"deadbeef": None}, versions = {}),
+                "foo": struct(sha256s = {}, versions = {"0.0.2": None}),
+            },
+            envsubst = [],
+        ),
+        cache = {},
+        parallel_download = False,
+        get_auth = lambda ctx, urls, ctx_attr: struct(),
+    )
+
+    # bar has all of the pinned hashes in the persisted response, whilst foo
+    # is missing the pinned version and is downloaded and persisted again and
+    # baz is not persisted yet.
+    env.expect.that_collection(downloads).contains_exactly([
+        "https://example.com/main/simple/baz/",
+        "https://example.com/main/simple/foo/",
+    ])
+
+    # All of the downloaded responses are persisted by a single process.
+    env.expect.that_collection(executes).has_size(1)
+    env.expect.that_collection(executes[0][-8:]).contains_exactly([
+        "https___example_com_main_simple_baz.html",
+        persisted_baz,
+        "https___example_com_main_simple_baz.want",
+        persisted_baz + ".want",
+        "https___example_com_main_simple_foo.html",
+        persisted_foo,
+        "https___example_com_main_simple_foo.want",
+        persisted_foo + ".want",
+    ]).in_order()
+    env.expect.that_str(files["https___example_com_main_simple_foo.want"]).equals(
+        json.encode({"sha256s": [], "versions": ["0.0.2"]}),
+    )
+    env.expect.that_collection(got["bar"].sdists.keys()).contains_exactly(["deadbeef"])
+    env.expect.that_collection(got["foo"].sdists.keys()).contains_exactly(["deadb00f"])
+
+_tests.append(_test_persisted_cache)
+
+def _test_persisted_cache_pin_not_on_index(env):
+    persisted = "/cache/https___example_com_main_simple_foo_{}.simpleapi".format(
+        hash("https://example.com/main/simple/foo/") & 0xffffffff,
+    )
+    files = {
+        "https___example_com_main_simple_foo.html": """\
+<a href="https://example.com/foo-0.0.1.tar.gz#sha256=deadbeef">foo-0.0.1.tar.gz</a><br />
+""",
+    }
+    paths = {}
+    downloads = []
+
+    def download(url, output, **kwargs):
+        _ = kwargs  # buildifier: disable=unused-variable
+        downloads.append(url[0])
+        return struct(success = True)
+
+    def execute(arguments, **kwargs):
+        _ = kwargs  # buildifier: disable=unused-variable
+
+        # Copy the persisted files, the arguments after the cache dir are
+        # the source and destination pairs.
+        copies = arguments[5:]
+        for i in range(0, len(copies), 2):
+            files[paths[copies[i + 1]]] = files[paths[copies[i]]]
+        return struct(return_code = 0, stdout = "", stderr = "")
+
+    def path(p):
+        ret = struct(path = p, exists = p in files, dirname = "/cache")
+        paths[str(ret)] = p
+        return ret
+
+    def download_foo(sha256s, cache):
+        return simpleapi_download(
+            ctx = struct(
+                os = struct(environ = {"RULES_PYTHON_PYPI_SIMPLEAPI_CACHE": "/cache"}, name = "linux"),
+                download = download,
+                execute = execute,
+                report_progress = lambda _: None,
+                read = lambda p: files[p.path],
+                file = lambda p, content, **kwargs: files.update({p: content}),
+                path = path,
+            ),
+            attr = struct(
+                index_url_overrides = {},
+                index_url = "https://example.com/main/simple/",
+                extra_index_urls = [],
+                sources = {
+                    "foo": struct(sha256s = {sha256: None for sha256 in sha256s}, versions = {}),
+                },
+                envsubst = [],
+            ),
+            cache = cache,
+            parallel_download = False,
+            get_auth = lambda ctx, urls, ctx_attr: struct(),
+        )
+
+    # The index does not serve deadb00f, e.g. because it is fetched from a
+    # different index, so the fresh download is authoritative for it.
+    cache = {}
+    got = download_foo(["deadbeef", "deadb00f"], cache)
+    env.expect.that_collection(downloads).has_size(1)
+    env.expect.that_collection(got["foo"].sdists.keys()).contains_exactly(["deadbeef"])
+    env.expect.that_bool(persisted in files).equals(True)
+
+    # Another hub with the same pins reuses the in-memory response.
+    download_foo(["deadb00f"], cache)
+    env.expect.that_collection(downloads).has_size(1)
+
+    # The next evaluation reuses the persisted response.
+    got = download_foo(["deadbeef", "deadb00f"], {})
+    env.expect.that_collection(downloads).has_size(1)
+    env.expect.that_collection(got["foo"].sdists.keys()).contains_exactly(["deadbeef"])
+
+    # A pin that the persisted response was not downloaded for is fetched.
+    download_foo(["deadbeef", "deadbaaf"], {})
+    env.expect.that_collection(downloads).has_size(2)
+
+_tests.append(_test_persisted_cache_pin_not_on_index)
+
 def _test_strip_empty_path_segments(env):
     env.expect.that_str(strip_empty_path_segments("no/scheme//is/unchanged")).equals("no/scheme//is/unchanged")
     env.expect.that_str(strip_empty_path_segments("scheme://with/no/empty/segments")).equals("scheme://with/no/empty/segments")
@@ -0,0 +1,176 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for extracting wheels using the repository_ctx API."""
+
+load("@rules_testing//lib:test_suite.bzl", "test_suite")
+load(
+    "//python/private/pypi:whl_extract.bzl",
+    "implicit_namespace_packages",
+    "install_path",
+    "parse_entry_points",
+    "parse_record",
+    "render_record",
+)  # buildifier: disable=bzl-visibility
+
+_tests = []
+
+def _fake_dir(basename, *children):
+    return struct(
+        basename = basename,
+        is_dir = True,
+        readdir = lambda watch = None: list(children),
+    )
+
+def _fake_file(basename):
+    return struct(
+        basename = basename,
+        is_dir = False,
+    )
+
+def _test_parse_entry_points(env):
+    fail_messages = []
+    got = parse_entry_points(
+        """\
+[console_scripts]
+foo = foo.cli:main
+# a comment
+bar=bar:cli.run [extra]
+
+[gui_scripts]
+foo-gui = foo.gui:main
+
+[foo.plugins]
+plugin = foo.plugin:Plugin
+""",
+        logger = struct(fail = fail_messages.append),
+    )
+    env.expect.that_collection(fail_messages).contains_exactly([])
+    env.expect.that_collection(got).contains_exactly([
+        struct(name = "foo", module = "foo.cli", attribute = "main", console = True),
+        struct(name = "bar", module = "bar", attribute = "cli.run", console = True),
+        struct(name = "foo-gui", module = "foo.gui", attribute = "main", console = False),
+    ]).in_order()
+
+_tests.append(_test_parse_entry_points)
+
+def _test_parse_entry_points_not_callable(env):
+    fail_messages = []
+    parse_entry_points(
+        """\
+[console_scripts]
+foo = foo.cli
+""",
+        logger = struct(fail = fail_messages.append),
+    )
+    env.expect.that_collection(fail_messages).contains_exactly([
+        "Entry point 'foo' is not a callable: 'foo.cli'",
+    ])
+
+_tests.append(_test_parse_entry_points_not_callable)
+
+def _test_install_path(env):
+    env.expect.that_str(install_path("foo/__init__.py")).equals("foo/__init__.py")
+    env.expect.that_str(install_path("foo-0.0.1.data/purelib/foo.py")).equals("foo.py")
+    env.expect.that_str(install_path("foo-0.0.1.data/platlib/foo.so")).equals("foo.so")
+    env.expect.that_str(install_path("foo-0.0.1.data/scripts/foo")).equals("../bin/foo")
+    env.expect.that_str(install_path("foo-0.0.1.data/headers/foo.h")).equals("../include/foo.h")
+    env.expect.that_str(install_path("foo-0.0.1.data/data/share/foo")).equals("../data/share/foo")
+
+_tests.append(_test_install_path)
+
+def _test_render_record(env):
+    entries = parse_record("""\
+foo/__init__.py,sha256=47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU,0
+"foo/a,b.txt",sha256=GKw-c0PwFokMUQ6T-TUmEWnZ4_VlQ2Qpgw-vCTT0-OQ,1
+foo-0.0.1.dist-info/METADATA,sha256=avpl2SpJ37VCwtFNqLfAA3kKKPedm1Eq09qlT9LnUd4,70
+foo-0.0.1.data/scripts/foo,sha256=aQQ3zw0aBWviHqGoU7ImzT7woiFWeaCdUBArXbRuKeM,19
+foo-0.0.1.data/purelib/bar.py,sha256=47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU,0
+foo-0.0.1.dist-info/RECORD,,
+""")
+    env.expect.that_collection(entries).contains_exactly([
+        ("foo/__init__.py", "sha256=47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU,0"),
+        ("foo/a,b.txt", "sha256=GKw-c0PwFokMUQ6T-TUmEWnZ4_VlQ2Qpgw-vCTT0-OQ,1"),
+        ("foo-0.0.1.dist-info/METADATA", "sha256=avpl2SpJ37VCwtFNqLfAA3kKKPedm1Eq09qlT9LnUd4,70"),
+        ("foo-0.0.1.data/scripts/foo", "sha256=aQQ3zw0aBWviHqGoU7ImzT7woiFWeaCdUBArXbRuKeM,19"),
+        ("foo-0.0.1.data/purelib/bar.py", "sha256=47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU,0"),
+        ("foo-0.0.1.dist-info/RECORD", ","),
+    ]).in_order()
+
+    got = render_record(
+        entries,
+        dist_info = "foo-0.0.1.dist-info",
+        launchers = ["../bin/foo-cli"],
+        rewritten = {"foo-0.0.1.data/scripts/foo": True},
+    )
+    env.expect.that_str(got).equals("""\
+../bin/foo-cli,,
+foo/__init__.py,sha256=47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU,0
+"foo/a,b.txt",sha256=GKw-c0PwFokMUQ6T-TUmEWnZ4_VlQ2Qpgw-vCTT0-OQ,1
+foo-0.0.1.dist-info/METADATA,sha256=avpl2SpJ37VCwtFNqLfAA3kKKPedm1Eq09qlT9LnUd4,70
+../bin/foo,,
+bar.py,sha256=47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU,0
+foo-0.0.1.dist-info/INSTALLER,sha256=GrS5JfYMYg-1MYMOfZDJAw8qrm1TEKDBdiOTPaIY_P8,45
+foo-0.0.1.dist-info/RECORD,,
+""")
+
+_tests.append(_test_render_record)
+
+def _test_implicit_namespace_packages(env):
+    root = _fake_dir(
+        "",
+        _fake_file("foo-0.0.1-py3-none-any.whl"),
+        _fake_dir(
+            "bin",
+            _fake_file("foo"),
+            _fake_dir("nested", _fake_file("foo.py")),
+        ),
+        _fake_dir(
+            "site-packages",
+            _fake_file("top.py"),
+            _fake_dir(
+                "ns",
+                _fake_dir("sub", _fake_file("mod.py")),
+                _fake_dir("pkg", _fake_file("__init__.py")),
+                _fake_dir("so", _fake_file("_ext.cpython-311-x86_64-linux-gnu.so")),
+                _fake_dir("data", _fake_file("data.txt")),
+            ),
+            _fake_dir(
+                "std",
+                _fake_file("__init__.py"),
+                _fake_dir("ns", _fake_file("mod.pyc")),
+            ),
+            _fake_dir(
+                "foo-0.0.1.dist-info",
+                _fake_file("METADATA"),
+            ),
+        ),
+    )
+
+    got = implicit_namespace_packages(root, ignored_dirnames = ["bin"])
+    env.expect.that_collection(got).contains_exactly([
+        "site-packages",
+        "site-packages/ns",
+        "site-packages/ns/so",
+        "site-packages/ns/sub",
+        "site-packages/std/ns",
+    ])
+
+_tests.append(_test_implicit_namespace_packages)
+
+def whl_extract_test_suite(name):  # buildifier: disable=function-docstring
+    test_suite(
+        name = name,
+        basic_tests = _tests,
+    )
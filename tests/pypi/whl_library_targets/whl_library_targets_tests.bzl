@@ -258,6 +258,64 @@ def _test_whl_and_library_deps_from_requires(env):
 
 _tests.append(_test_whl_and_library_deps_from_requires)
 
+def _test_files_repo(env):
+    filegroup_calls = []
+    py_library_calls = []
+
+    whl_library_targets_from_requires(
+        name = "foo-0-py3-none-any.whl",
+        metadata_name = "Foo",
+        metadata_version = "0",
+        dep_template = "@pypi//{name}:{target}",
+        files_repo = "@pypi_foo_files",
+        requires_dist = ["bar"],
+        include = ["foo", "bar"],
+        native = struct(
+            filegroup = lambda **kwargs: filegroup_calls.append(kwargs),
+            config_setting = lambda **_: None,
+            glob = _glob,
+            select = _select,
+        ),
+        rules = struct(
+            py_library = lambda **kwargs: py_library_calls.append(kwargs),
+            env_marker_setting = lambda **_: None,
+        ),
+    )
+
+    env.expect.that_collection(filegroup_calls).contains_exactly([
+        {
+            "name": "dist_info",
+            "srcs": ["@pypi_foo_files//:dist_info"],
+            "visibility": ["//visibility:public"],
+        },
+        {
+            "name": "data",
+            "srcs": ["@pypi_foo_files//:data"],
+            "visibility": ["//visibility:public"],
+        },
+        {
+            "name": "whl",
+            "srcs": ["@pypi_foo_files//:foo-0-py3-none-any.whl"],
+            "data": ["@pypi//bar:whl"],
+            "visibility": ["//visibility:public"],
+        },
+    ])  # buildifier: @unsorted-dict-items
+    env.expect.that_collection(py_library_calls).contains_exactly([
+        {
+            "name": "pkg",
+            "srcs": [],
+            "pyi_srcs": [],
+            "data": [],
+            "imports": [],
+            "deps": ["@pypi_foo_files//:pkg", "@pypi//bar:pkg"],
+            "tags": ["pypi_name=Foo", "pypi_version=0"],
+            "visibility": ["//visibility:public"],
+            "experimental_venvs_site_packages": Label("//python/config_settings:venvs_site_packages"),
+        },
+    ])  # buildifier: @unsorted-dict-items
+
+_tests.append(_test_files_repo)
+
 def _test_whl_and_library_deps(env):
     filegroup_calls = []
     py_library_calls = []
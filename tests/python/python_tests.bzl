@@ -76,6 +76,7 @@ def _override(
         ignore_root_user_error = True,
         minor_mapping = {},
         netrc = "",
+        precompile_stdlib = False,
         register_all_versions = False):
     return struct(
         auth_patterns = auth_patterns,
@@ -84,6 +85,7 @@ def _override(
         ignore_root_user_error = ignore_root_user_error,
         minor_mapping = minor_mapping,
         netrc = netrc,
+        precompile_stdlib = precompile_stdlib,
         register_all_versions = register_all_versions,
     )
 
@@ -95,7 +97,10 @@ def _single_version_override(
         patches = [],
         strip_prefix = "python",
         distutils_content = "",
-        distutils = None):
+        distutils = None,
+        slim_runtime = False,
+        extra_files_glob_include = [],
+        extra_files_glob_exclude = []):
     if not python_version:
         fail("missing mandatory args: python_version ({})".format(python_version))
 
@@ -108,6 +113,9 @@ def _single_version_override(
         strip_prefix = strip_prefix,
         distutils_content = distutils_content,
         distutils = distutils,
+        slim_runtime = slim_runtime,
+        extra_files_glob_include = extra_files_glob_include,
+        extra_files_glob_exclude = extra_files_glob_exclude,
     )
 
 def _single_version_platform_override(
@@ -498,6 +506,53 @@ def _test_auth_overrides(env):
 
 _tests.append(_test_auth_overrides)
 
+def _test_precompile_stdlib_override(env):
+    py = parse_modules(
+        module_ctx = _mock_mctx(
+            _mod(
+                name = "my_module",
+                toolchain = [_toolchain("3.12")],
+                override = [
+                    _override(precompile_stdlib = True),
+                ],
+            ),
+            _mod(name = "rules_python", toolchain = [_toolchain("3.11")]),
+        ),
+    )
+
+    env.expect.that_dict(py.config.default).contains_at_least({
+        "precompile_stdlib": True,
+    })
+
+_tests.append(_test_precompile_stdlib_override)
+
+def _test_slim_runtime_override(env):
+    py = parse_modules(
+        module_ctx = _mock_mctx(
+            _mod(
+                name = "my_module",
+                toolchain = [_toolchain("3.12")],
+                single_version_override = [
+                    _single_version_override(
+                        python_version = "3.12.4",
+                        slim_runtime = True,
+                        extra_files_glob_exclude = ["lib/python3.12/sqlite3/**"],
+                    ),
+                ],
+            ),
+            _mod(name = "rules_python", toolchain = [_toolchain("3.11")]),
+        ),
+    )
+
+    env.expect.that_dict(py.config.kwargs).contains_exactly({
+        "3.12.4": {
+            "extra_files_glob_exclude": ["lib/python3.12/sqlite3/**"],
+            "slim_runtime": True,
+        },
+    })
+
+_tests.append(_test_slim_runtime_override)
+
 def _test_add_new_version(env):
     py = parse_modules(
         module_ctx = _mock_mctx(
@@ -38,6 +38,8 @@ def _perform_transition_impl(input_settings, attr, base_impl):
         settings["//python/bin:python_src"] = attr.python_src
     if attr.repl_dep:
         settings["//python/bin:repl_dep"] = attr.repl_dep
+    if attr.venvs_module_index:
+        settings["//python/config_settings:venvs_module_index"] = attr.venvs_module_index
     if attr.venvs_use_declare_symlink:
         settings["//python/config_settings:venvs_use_declare_symlink"] = attr.venvs_use_declare_symlink
     if attr.venvs_site_packages:
@@ -49,6 +51,7 @@ _RECONFIG_INPUTS = [
     "//python/bin:python_src",
     "//python/bin:repl_dep",
     "//command_line_option:extra_toolchains",
+    "//python/config_settings:venvs_module_index",
     "//python/config_settings:venvs_use_declare_symlink",
     "//python/config_settings:venvs_site_packages",
 ]
@@ -72,6 +75,7 @@ toolchain.
     ),
     "python_src": attrb.Label(),
     "repl_dep": attrb.Label(),
+    "venvs_module_index": attrb.String(),
     "venvs_site_packages": attrb.String(),
     "venvs_use_declare_symlink": attrb.String(),
 }
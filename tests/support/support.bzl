@@ -42,6 +42,8 @@ PRECOMPILE = str(Label("//python/config_settings:precompile"))
 PRECOMPILE_SOURCE_RETENTION = str(Label("//python/config_settings:precompile_source_retention"))
 PYC_COLLECTION = str(Label("//python/config_settings:pyc_collection"))
 PYTHON_VERSION = str(Label("//python/config_settings:python_version"))
+VENVS_MODULE_INDEX = str(Label("//python/config_settings:venvs_module_index"))
+VENVS_SITE_PACKAGES = str(Label("//python/config_settings:venvs_site_packages"))
 VISIBLE_FOR_TESTING = str(Label("//python/private:visible_for_testing"))
 
 SUPPORTS_BOOTSTRAP_SCRIPT = select({
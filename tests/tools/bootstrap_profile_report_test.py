@@ -0,0 +1,90 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from tools.bootstrap_profile_report import percentile, phase_durations, summarize
+
+
+def _record(target, **timestamps):
+    return {"target": target, "timestamps": timestamps}
+
+
+class BootstrapProfileReportTest(unittest.TestCase):
+    def test_phase_durations(self):
+        record = _record(
+            "//:bin",
+            stage1_start=1.0,
+            stage1_venv_ready=1.5,
+            stage1_exec=1.75,
+            main_start=2.0,
+            main_end=3.0,
+        )
+
+        self.assertEqual(
+            {
+                "stage1_venv": 0.5,
+                "stage1_exec": 0.25,
+                "main": 1.0,
+                "startup": 1.0,
+            },
+            phase_durations(record),
+        )
+
+    def test_phase_durations_missing_timestamps(self):
+        # E.g. the system_python bootstrap doesn't have the stage1 phases.
+        self.assertEqual({}, phase_durations(_record("//:bin", main_start=1.0)))
+
+    def test_summarize(self):
+        records = [
+            _record("//:a", main_start=0.0, main_end=0.001 * (i + 1)) for i in range(10)
+        ] + [_record("//:b", main_start=0.0, main_end=0.5)]
+
+        summary = summarize(records)
+
+        self.assertEqual(["all"], list(summary))
+        self.assertEqual(["main"], list(summary["all"]))
+        stats = summary["all"]["main"]
+        self.assertEqual(11, stats["count"])
+        self.assertAlmostEqual(6.0, stats["p50"])
+        self.assertAlmostEqual(500.0, stats["max"])
+
+    def test_summarize_by_target(self):
+        records = [
+            _record("//:a", main_start=0.0, main_end=0.001),
+            _record("//:b", main_start=0.0, main_end=0.002),
+        ]
+
+        summary = summarize(records, by_target=True)
+
+        self.assertEqual(["//:a", "//:b"], list(summary))
+        self.assertAlmostEqual(1.0, summary["//:a"]["main"]["p99"])
+        self.assertAlmostEqual(2.0, summary["//:b"]["main"]["p99"])
+
+    def test_summarize_no_records(self):
+        self.assertEqual({}, summarize([]))
+
+    def test_percentile(self):
+        values = [float(i) for i in range(101)]
+        self.assertEqual(50.0, percentile(values, 50))
+        self.assertEqual(99.0, percentile(values, 99))
+        self.assertEqual(7.0, percentile([7.0], 99))
+
+    def test_percentile_no_values(self):
+        with self.assertRaises(ValueError):
+            percentile([], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
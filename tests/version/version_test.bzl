@@ -150,6 +150,86 @@ def _test_ordering(env):
 
 _tests.append(_test_ordering)
 
+def _test_release_only(env):
+    for input, want in {
+        " 1.2.3 ": "1.2.3",
+        "0": "0",
+        "2023.07.19": "2023.7.19",
+    }.items():
+        got = version.parse(input, strict = True)
+        env.expect.that_str(got.string).equals(want)
+        env.expect.that_int(got.epoch).equals(0)
+        env.expect.that_bool(got.is_prefix).equals(False)
+        env.expect.that_str(version.normalize(input)).equals(want)
+
+    # The release segments are compared as if they are padded with zeros
+    env.expect.that_bool(version.is_eq(version.parse("1.0"), version.parse("1.0.0"))).equals(True)
+    env.expect.that_bool(version.is_lt(version.parse("1.0"), version.parse("1.0.1"))).equals(True)
+    env.expect.that_bool(version.is_gt(version.parse("1.0.0"), version.parse("1"))).equals(False)
+    env.expect.that_bool(version.is_le(version.parse("1.0.0"), version.parse("1"))).equals(True)
+    env.expect.that_bool(version.is_compatible(version.parse("2.2.0"), version.parse("2.1"))).equals(True)
+
+    # These still go through the full parser
+    env.expect.that_bool(version.parse("1.2.*").is_prefix).equals(True)
+    env.expect.that_str(version.parse("1.2.").string).equals("1.2")
+    env.expect.that_bool(version.parse("1..2") == None).equals(True)
+
+_tests.append(_test_release_only)
+
+def _test_parse_cache(env):
+    cache = {}
+
+    first = version.parse("1.0rc1", cache = cache)
+    env.expect.that_bool(version.parse("1.0rc1", cache = cache) == first).equals(True)
+    env.expect.that_bool(version.parse("foo", cache = cache) == None).equals(True)
+    env.expect.that_bool(version.parse("foo", cache = cache) == None).equals(True)
+    env.expect.that_dict(cache).keys().contains_exactly([
+        ("1.0rc1", False),
+        ("foo", False),
+    ])
+
+_tests.append(_test_parse_cache)
+
+def _test_compare_many(env):
+    # A small benchmark of what the marker evaluation does: a handful of
+    # distinct versions compared with each other many times. The expected
+    # values are computed without the cache.
+    versions = [
+        "{}.{}{}".format(major, minor, suffix)
+        for major in ["1", "2"]
+        for minor in ["0", "0.0", "10"]
+        for suffix in ["", "a1", ".post1", ".dev1", "+local"]
+    ]
+    ops = [
+        version.is_eq,
+        version.is_ge,
+        version.is_gt,
+        version.is_le,
+        version.is_lt,
+        version.is_ne,
+    ]
+    parsed = {v: version.parse(v) for v in versions}
+    want = [
+        op(parsed[left], parsed[right])
+        for left in versions
+        for right in versions
+        for op in ops
+    ]
+
+    cache = {}
+    for _ in range(2):
+        got = [
+            op(version.parse(left, cache = cache), version.parse(right, cache = cache))
+            for left in versions
+            for right in versions
+            for op in ops
+        ]
+        env.expect.that_collection(got).contains_exactly(want).in_order()
+
+    env.expect.that_int(len(cache)).equals(len(versions))
+
+_tests.append(_test_compare_many)
+
 def version_test_suite(name):
     test_suite(
         name = name,
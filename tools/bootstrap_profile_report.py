@@ -0,0 +1,136 @@
+# Copyright 2025 The Bazel Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Summarize the startup profiles written with RULES_PYTHON_BOOTSTRAP_PROFILE.
+
+Each line of a profile file is a JSON record with the timestamps of the startup
+phases of one program run. This prints the percentiles of each phase duration
+over all the runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import json
+import sys
+
+# The phases as (name, start timestamp, end timestamp).
+PHASES = [
+    ("stage1_venv", "stage1_start", "stage1_venv_ready"),
+    ("stage1_exec", "stage1_venv_ready", "stage1_exec"),
+    ("interpreter_startup", "stage1_exec", "site_init_start"),
+    ("site_init", "site_init_start", "site_init_end"),
+    ("stage2_import", "site_init_end", "stage2_start"),
+    ("stage2_setup", "stage2_start", "stage2_setup_end"),
+    ("coverage_setup", "stage2_setup_end", "main_start"),
+    ("main", "main_start", "main_end"),
+    ("startup", "stage1_start", "main_start"),
+    ("total", "stage1_start", "stage2_end"),
+]
+
+
+def phase_durations(record: dict) -> dict[str, float]:
+    """Compute the phase durations, in seconds, of a profile record."""
+    timestamps = record["timestamps"]
+    durations = {}
+    for name, start, end in PHASES:
+        if start in timestamps and end in timestamps:
+            durations[name] = timestamps[end] - timestamps[start]
+    return durations
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of the sorted values."""
+    if not sorted_values:
+        raise ValueError("no values to compute the percentile of")
+    index = round(percent / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def summarize(records, *, by_target=False) -> dict[str, dict[str, dict]]:
+    """Compute the duration statistics of each phase.
+
+    Returns:
+        A mapping of the group (the target, or `all`) to a mapping of the phase
+        name to its statistics, in milliseconds.
+    """
+    groups = collections.defaultdict(lambda: collections.defaultdict(list))
+    for record in records:
+        group = record.get("target", "") if by_target else "all"
+        for name, duration in phase_durations(record).items():
+            groups[group][name].append(duration * 1000)
+
+    summary = {}
+    for group, phases in sorted(groups.items()):
+        summary[group] = {}
+        for name, _, _ in PHASES:
+            values = sorted(phases.get(name, []))
+            if not values:
+                continue
+            summary[group][name] = {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": values[-1],
+            }
+    return summary
+
+
+def read_records(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("profiles", nargs="+", help="The profile files to read.")
+    parser.add_argument(
+        "--by_target",
+        action="store_true",
+        help="Summarize each target separately.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the summary as JSON instead of a table.",
+    )
+    args = parser.parse_args(argv)
+
+    summary = summarize(read_records(args.profiles), by_target=args.by_target)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return 0
+
+    for group, phases in summary.items():
+        print(group)
+        print(
+            f"  {'phase':<20} {'count':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+        )
+        for name, stats in phases.items():
+            print(
+                f"  {name:<20} {stats['count']:>6}"
+                + "".join(
+                    f" {stats[key]:>7.1f}ms" for key in ("p50", "p90", "p99", "max")
+                )
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())